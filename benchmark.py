@@ -0,0 +1,416 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from models import Book
+from storage import JsonStore
+
+# Library sizes benchmarked by default
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Books in a library with covers share this many distinct cover files, each a JPEG of a typical cover size
+COVER_POOL_SIZE = 200
+COVER_SIZE = (600, 900)
+# ISBNs looked up by the bulk import benchmark
+IMPORT_ISBNS = 50
+# Authors shared by the synthetic books and the stub server's works
+AUTHOR_COUNT = 500
+# Seconds to wait for covers to be decoded before giving up
+COVER_TIMEOUT = 120
+PROGRAM_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WORDS = ("the of and a in night dark house river garden winter silent last city road stone light shadow fire "
+    "glass letter king queen daughter island empire song storm sea mountain secret history war children star").split()
+
+def generate_library(directory, size, covers, seed=0):
+    """
+    Writes a synthetic books.json, with the same contents for the same size and seed.
+    Books get random titles, authors, page or chapter counts and progress, and, with covers, a cover image
+    from a pool of COVER_POOL_SIZE generated JPEGs.
+    Args:
+        directory (str): Directory to write books.json (and the covers folder) to.
+        size (int): Number of books.
+        covers (bool): True to give every book a cover image.
+        seed (int): Random seed.
+    Returns:
+        str: Path of the books.json file.
+    """
+    rng = random.Random(seed)
+    cover_paths = _generate_covers(os.path.join(directory, 'covers'), rng) if covers else []
+    authors = [f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}son" for _ in range(AUTHOR_COUNT)]
+    now = time.time()
+    books = []
+    for book_id in range(1, size + 1):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))).title()
+        image_path = cover_paths[book_id % len(cover_paths)] if cover_paths else ''
+        if rng.random() < 0.2:
+            total = rng.randint(10, 300)
+            book = Book(title, rng.choice(authors), image_path, True, None, None, total, rng.randint(0, total))
+        else:
+            total = rng.randint(80, 1200)
+            book = Book(title, rng.choice(authors), image_path, False, total, rng.randint(0, total), None, None)
+        book.updated = now - rng.random() * 365 * 24 * 3600
+        book.id = book_id
+        books.append(book)
+    path = os.path.join(directory, 'books.json')
+    JsonStore(path).save_all(books, {'theme': 'light'})
+    return path
+
+
+def _generate_covers(directory, rng):
+    """
+    Draws COVER_POOL_SIZE cover images: a gradient with random shapes, saved as JPEGs of realistic file size.
+    """
+    from PIL import Image, ImageDraw
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(COVER_POOL_SIZE):
+        top = tuple(rng.randint(0, 255) for _ in range(3))
+        bottom = tuple(rng.randint(0, 255) for _ in range(3))
+        img = Image.new('RGB', COVER_SIZE)
+        draw = ImageDraw.Draw(img)
+        for y in range(COVER_SIZE[1]):
+            t = y / COVER_SIZE[1]
+            draw.line([(0, y), (COVER_SIZE[0], y)], fill=tuple(int(a + (b - a) * t) for a, b in zip(top, bottom)))
+        for _ in range(40):
+            x, y = rng.randint(0, COVER_SIZE[0]), rng.randint(0, COVER_SIZE[1])
+            r = rng.randint(10, 150)
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+        path = os.path.join(directory, f'cover_{i:04d}.jpg')
+        img.save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def measure(function, repeat):
+    """
+    Times a function.
+    Args:
+        function (callable): Called with no arguments.
+        repeat (int): Number of timed runs.
+    Returns:
+        dict: Milliseconds per run: 'min_ms', 'median_ms', 'mean_ms', and every run in 'runs_ms'.
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        runs.append((time.perf_counter() - start) * 1000)
+    return _summarize(runs)
+
+
+def _summarize(runs):
+    return {
+        'min_ms': round(min(runs), 3),
+        'median_ms': round(statistics.median(runs), 3),
+        'mean_ms': round(statistics.fmean(runs), 3),
+        'runs_ms': [round(run, 3) for run in runs],
+    }
+
+
+def bench_core(directory, repeat):
+    """
+    Times loading and saving the collection through the GUI-free core, which needs no display.
+    """
+    from library import Library
+    library = Library(JsonStore(os.path.join(directory, 'books.json')))
+    results = {'library.load': measure(library.load, repeat)}
+    library.store = JsonStore(os.path.join(directory, 'books.copy.json'))
+    results['library.save'] = measure(library.save, repeat)
+    return results
+
+
+def bench_gui(directory, repeat):
+    """
+    Times the app's startup, loading, saving, list refresh and theme switching on a library.
+    The app uses files relative to the working directory, so it is run from the library's directory.
+    Returns:
+        dict: The timings, keyed by method.
+    """
+    import tkinter as tk
+    from main import BookTrackerApp
+    shutil.copytree(os.path.join(PROGRAM_DIR, 'assets'), os.path.join(directory, 'assets'), dirs_exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        root = tk.Tk()
+        start = time.perf_counter()
+        app = BookTrackerApp(root)
+        root.update()
+        results = {'startup': _summarize([(time.perf_counter() - start) * 1000])}
+        # The phases of this startup, the 'import' phase only applies to the first app of the process
+        results['startup_phases_ms'] = {phase: round(seconds * 1000, 3) for phase, seconds in app.startup_phases if phase != 'import'}
+        # Size of the book list, which depends on the card renderer
+        results['book_list_widgets'] = _count_widgets(app.book_canvas) - 1
+        results['book_list_canvas_items'] = len(app.book_canvas.find_all())
+        if any(book.image_path for book in app.books):
+            # Covers of the first screen, decoded from the full-size files
+            results['covers_cold'] = _summarize([_wait_for_covers(app, root)])
+
+        def refresh():
+            app._refresh_book_display()
+            root.update_idletasks()
+
+        def apply_theme():
+            app._apply_theme()
+            root.update_idletasks()
+
+        def save():
+            app._save_data()
+            app.saver.flush()
+
+        results['_load_data'] = measure(app._load_data, repeat)
+        results['_save_data'] = measure(save, repeat)
+        results['_refresh_book_display'] = measure(refresh, repeat)
+        results['_apply_theme'] = measure(apply_theme, repeat)
+        if any(book.image_path for book in app.books):
+            def covers_warm():
+                app.image_cache.clear() # Thumbnails come from the disk cache
+                refresh()
+                _wait_for_covers(app, root)
+            results['covers_warm'] = measure(covers_warm, repeat)
+        app._on_closing()
+        return results
+    finally:
+        os.chdir(cwd)
+
+
+def _count_widgets(widget):
+    """
+    Returns the number of widgets in a widget's tree, including itself.
+    """
+    return 1 + sum(_count_widgets(child) for child in widget.winfo_children())
+
+
+def _wait_for_covers(app, root):
+    """
+    Runs the event loop until every requested cover has been decoded and shown.
+    Returns:
+        float: Milliseconds waited.
+    """
+    start = time.perf_counter()
+    deadline = start + COVER_TIMEOUT
+    while (app.image_loader.jobs or app.image_loader.ready) and time.perf_counter() < deadline:
+        root.update()
+        time.sleep(0.001)
+    root.update_idletasks()
+    return (time.perf_counter() - start) * 1000
+
+
+class StubOpenLibrary:
+    """
+    A local stand-in for the Open Library API that answers every ISBN, with a fixed delay per request
+    to simulate network latency. Each ISBN has its own work, and works share AUTHOR_COUNT authors.
+    """
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately, without this each response waits for a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.requests += 1
+                time.sleep(stub.latency)
+                body = json.dumps(stub.response(self.path)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def response(self, path):
+        kind, key = path.strip('/').split('/', 1)
+        key = key.rsplit('.', 1)[0]
+        if kind == 'isbn':
+            return {'title': f"Book {key}", 'works': [{'key': f'/works/W{key}'}]}
+        if kind == 'works':
+            number = int(key.lstrip('W'))
+            return {'authors': [{'author': {'key': f'/authors/A{number % AUTHOR_COUNT}'}}]}
+        return {'name': f"Author {key}"}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def bench_isbn(directory, repeat, latency):
+    """
+    Times ISBN lookups through the Open Library client against the stub server: a lookup with an empty response
+    cache (edition, work and author requests), a lookup answered by the cache, and a bulk import.
+    """
+    from library import create_metadata_client
+    stub = StubOpenLibrary(latency)
+    cwd = os.getcwd()
+    os.chdir(directory) # The response cache is created in the working directory
+    os.environ['BOOKMARKPY_OPENLIBRARY_URL'] = stub.url
+    client = create_metadata_client()
+    try:
+        isbns = [f"978{n:010d}" for n in range(IMPORT_ISBNS)]
+
+        def lookup_uncached():
+            client.cache.clear()
+            client.lookup_isbn(isbns[0])
+
+        def import_isbns():
+            client.cache.clear()
+            done = threading.Semaphore(0)
+            client.lookup_many(isbns, lambda isbn, info, error: done.release())
+            for _ in isbns:
+                done.acquire()
+
+        results = {
+            'lookup_isbn_uncached': measure(lookup_uncached, repeat),
+            'lookup_isbn_cached': measure(lambda: client.lookup_isbn(isbns[0]), repeat),
+            f'lookup_many_{IMPORT_ISBNS}': measure(import_isbns, repeat),
+        }
+        results['stub_latency_ms'] = latency * 1000
+        return results
+    finally:
+        client.close()
+        stub.close()
+        os.chdir(cwd)
+
+
+def start_virtual_display():
+    """
+    Starts an Xvfb virtual X server if there is no display, so the GUI benchmarks can run on a plain Linux box.
+    Returns:
+        subprocess.Popen or None: The server process, or None if a display is already available.
+    Raises:
+        RuntimeError: If there is no display and Xvfb isn't installed or doesn't start.
+    """
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        return None
+    xvfb = shutil.which('Xvfb')
+    if xvfb is None:
+        raise RuntimeError("no display and Xvfb is not installed (e.g. 'sudo apt install xvfb')")
+    display = next(n for n in range(99, 200) if not os.path.exists(f'/tmp/.X11-unix/X{n}'))
+    process = subprocess.Popen([xvfb, f':{display}', '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(f'/tmp/.X11-unix/X{display}'):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Xvfb did not start on display :{display}")
+        time.sleep(0.05)
+    os.environ['DISPLAY'] = f':{display}'
+    return process
+
+
+def _metadata():
+    """
+    Describes the code and machine the benchmarks ran on, for comparing results across commits.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROGRAM_DIR, capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def _run_benchmarks(args):
+    """
+    Runs the benchmarks chosen on the command line.
+    Returns:
+        dict: The report written by main.
+    """
+    os.environ['BOOKMARKPY_STORAGE'] = 'json'
+    os.environ['BOOKMARKPY_CARDS'] = args.cards
+    os.environ['BOOKMARKPY_LIST'] = args.list
+    os.environ.pop('BOOKMARKPY_ISBN_INDEX', None)
+
+    report = {'metadata': _metadata(), 'settings': vars(args).copy(), 'libraries': [], 'isbn': None}
+    display = None
+    gui_error = None
+    if not args.no_gui:
+        try:
+            display = start_virtual_display()
+        except RuntimeError as e:
+            gui_error = str(e)
+            print(f"Skipping the GUI benchmarks: {gui_error}")
+    try:
+        cover_options = {'both': [False, True], 'with': [True], 'without': [False]}[args.covers]
+        for size in args.sizes:
+            for covers in cover_options:
+                print(f"Benchmarking {size} books {'with' if covers else 'without'} covers...")
+                with tempfile.TemporaryDirectory(prefix='bookmarkpy-bench-') as directory:
+                    generate_library(directory, size, covers, args.seed)
+                    entry = {'books': size, 'covers': covers,
+                        'books_json_bytes': os.path.getsize(os.path.join(directory, 'books.json'))}
+                    entry['core'] = bench_core(directory, args.repeat)
+                    if args.no_gui or gui_error:
+                        entry['gui'] = None
+                    else:
+                        entry['gui'] = bench_gui(directory, args.repeat)
+                    report['libraries'].append(entry)
+        print("Benchmarking ISBN lookups...")
+        with tempfile.TemporaryDirectory(prefix='bookmarkpy-bench-') as directory:
+            report['isbn'] = bench_isbn(directory, args.repeat, args.latency_ms / 1000)
+    finally:
+        if display:
+            display.terminate()
+    report['gui_skipped'] = gui_error if not args.no_gui else "--no-gui"
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BookmarkPy on synthetic libraries and write the results as JSON.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Library sizes, in books.")
+    parser.add_argument('--covers', choices=['both', 'with', 'without'], default='both',
+        help="Benchmark libraries with cover images, without, or both.")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs of each benchmark.")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed of the synthetic libraries.")
+    parser.add_argument('--latency-ms', type=float, default=20, help="Delay of each stub server response.")
+    parser.add_argument('--list', choices=['virtual', 'classic'], default='virtual',
+        help="Book list mode of the GUI benchmarks, see BOOKMARKPY_LIST.")
+    parser.add_argument('--cards', choices=['widgets', 'canvas'], default='widgets',
+        help="Book card renderer of the GUI benchmarks, see BOOKMARKPY_CARDS.")
+    parser.add_argument('--no-gui', action='store_true', help="Skip the benchmarks that need a display.")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file to write, '-' for standard output.")
+    args = parser.parse_args(argv)
+
+    # The app prints while it runs, keep standard output for the results
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        report = _run_benchmarks(args)
+    finally:
+        sys.stdout = real_stdout
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+import math
+import itertools
+from tkinter import ttk
+
+# Height in pixels reserved for each book card (100x150 cover plus padding and border)
+ROW_HEIGHT = 180
+# Layout of the canvas-drawn cards, in pixels from the card's top left corner
+CANVAS_COVER_X, CANVAS_COVER_Y = 12, 12
+CANVAS_TEXT_X = 124
+CANVAS_BUTTON_WIDTH, CANVAS_BUTTON_HEIGHT, CANVAS_BUTTON_GAP = 56, 26, 4
+CANVAS_PROGRESS_BAR_HEIGHT = 10
+PROGRESS_BAR_COLOR = '#4a90d9'
+
+class BookCard:
+    """
+    The widgets that display a single book: cover image, title, author, progress and Edit/Delete buttons.
+    A card is built once and can be re-bound to a different book any number of times.
+    """
+    def __init__(self, parent):
+        self.frame = ttk.Frame(parent, style="BookCard.TFrame") # Use the custom style
+
+        # Configure columns in the card frame
+        self.frame.grid_columnconfigure(0, weight=0) # Image column
+        self.frame.grid_columnconfigure(1, weight=1) # Details column (expands)
+        self.frame.grid_columnconfigure(2, weight=0) # Buttons column
+
+        # Book image display
+        self.image_label = ttk.Label(self.frame)
+        self.image_label.grid(row=0, column=0, rowspan=3, padx=10, pady=5, sticky='n') # Spans 3 rows, alligning to the top
+
+        # Book details (Title, Author, Progress)
+        self.title_label = ttk.Label(self.frame, font=('Arial', 12, 'bold'), style="BookCard.TLabel")
+        self.title_label.grid(row=0, column=1, sticky='w', pady=2)
+
+        self.author_label = ttk.Label(self.frame, font=('Arial', 10), style="BookCard.TLabel")
+        self.author_label.grid(row=1, column=1, sticky='w', pady=2)
+
+        self.progress_label = ttk.Label(self.frame, font=('Arial', 10), style="BookCard.TLabel")
+        self.progress_label.grid(row=2, column=1, sticky='w', pady=2)
+
+        # Edit and delete buttons
+        button_container = ttk.Frame(self.frame, style="BookCard.TFrame")
+        button_container.grid(row=2, column=2, sticky='se', padx=5, pady=5) # Buttons aligned bottom right
+
+        self.edit_btn = ttk.Button(button_container, text="Edit", style="Themed.TButton")
+        self.edit_btn.pack(side='left', padx=2) # Buttons packed side by side
+
+        self.delete_btn = ttk.Button(button_container, text="Delete", style="Themed.TButton")
+        self.delete_btn.pack(side='left', padx=2)
+
+    def bind(self, title, author, progress, photo, on_edit, on_delete, fraction=None):
+        """
+        Fills the card with a book's details.
+        Args:
+            title (str), author (str), progress (str): Text shown on the card.
+            photo (PhotoImage): The cover image to display.
+            on_edit (callable), on_delete (callable): Commands for the Edit and Delete buttons.
+            fraction (float): Completion between 0 and 1, or None. Only drawn by cards with a progress bar (CanvasBookCard).
+        """
+        self.title_label.config(text=f"Title: {title}")
+        self.author_label.config(text=f"Author: {author}")
+        self.progress_label.config(text=f"Progress: {progress}")
+        self.set_image(photo)
+        self.edit_btn.config(command=on_edit)
+        self.delete_btn.config(command=on_delete)
+
+    def set_image(self, photo):
+        """
+        Displays a cover image on the card.
+        """
+        self.image_label.config(image=photo)
+        self.image_label.image = photo # reference to prevent memory from freeing up
+
+
+class VirtualBookList:
+    """
+    A scrollable list of books drawn on a canvas that only builds widgets for the rows in view.
+    A small pool of BookCard widgets, sized to the viewport, is recycled and re-bound to records
+    as the user scrolls, so the number of widgets stays the same however large the list gets.
+    """
+    def __init__(self, canvas, scrollbar, bind_card, release_card=None, row_height=ROW_HEIGHT, padding=5):
+        """
+        Args:
+            canvas (tk.Canvas): The canvas that the cards are placed on.
+            scrollbar (ttk.Scrollbar): The vertical scrollbar attached to the canvas.
+            bind_card (callable): Called as bind_card(card, item, row) to fill a card with a record.
+            release_card (callable): Optional, called as release_card(card) when a card is hidden, e.g. to cancel image loading.
+            row_height (int): Height in pixels of each row.
+            padding (int): Space in pixels around each card.
+        """
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.bind_card = bind_card
+        self.release_card = release_card
+        self.row_height = row_height
+        self.padding = padding
+
+        self.items = [] # Records currently shown, in display order
+        self.slots = [] # Pool of (card, canvas window id), see _create_slot
+        self.slot_rows = [] # Row each pooled card is bound to, None when unbound/hidden
+        self.width = 1
+        self.height = 1
+
+        # Intercept scroll updates so the visible cards are re-bound whenever the view moves
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+
+    def set_items(self, items):
+        """
+        Replaces the records shown in the list and redraws the visible rows.
+        The scroll position is kept where possible.
+        """
+        self.items = list(items)
+        self._update_scrollregion()
+        self.refresh()
+
+    def insert(self, row, item):
+        """
+        Inserts a single record. Only visible cards at or below the new row are re-bound.
+        Args:
+            row (int): The position to insert at.
+            item: The record to insert.
+        """
+        self.items.insert(row, item)
+        self._update_scrollregion()
+        self._invalidate_from(row)
+
+    def insert_many(self, row, items):
+        """
+        Inserts a run of records. Only visible cards at or below the first new row are re-bound.
+        Args:
+            row (int): The position to insert at.
+            items (list): The records to insert.
+        """
+        self.items[row:row] = items
+        self._update_scrollregion()
+        self._invalidate_from(row)
+
+    def update(self, row, item):
+        """
+        Replaces a single record and re-binds its card if it is in view.
+        Args:
+            row (int): The position of the record.
+            item: The new record.
+        """
+        self.items[row] = item
+        for slot, bound_row in enumerate(self.slot_rows):
+            if bound_row == row:
+                self.bind_card(self.slots[slot][0], item, row)
+
+    def remove(self, row):
+        """
+        Removes a single record. Later rows shift up, so visible cards from that row on are re-bound.
+        Args:
+            row (int): The position of the record to remove.
+        """
+        del self.items[row]
+        self._update_scrollregion()
+        self._invalidate_from(row)
+
+    def _invalidate_from(self, row):
+        """
+        Marks every card bound at or below a row as stale and redraws the visible rows.
+        """
+        self.slot_rows = [None if bound_row is not None and bound_row >= row else bound_row
+            for bound_row in self.slot_rows]
+        self._update_visible()
+
+    def refresh(self):
+        """
+        Re-binds every visible card to its record, e.g. after records were changed in place.
+        """
+        self.slot_rows = [None] * len(self.slots)
+        self._update_visible()
+
+    def resize(self, width, height):
+        """
+        Resizes the cards to the canvas width and grows the card pool to cover the viewport height.
+        Args:
+            width (int), height (int): The new canvas size in pixels.
+        """
+        self.width = max(width, 1)
+        self.height = max(height, 1)
+        for slot in range(len(self.slots)):
+            self._resize_slot(slot)
+        self._ensure_pool()
+        self._update_scrollregion()
+        self.refresh()
+
+    def _ensure_pool(self):
+        """
+        Creates enough cards to fill the viewport, plus one for a row that is partly scrolled into view.
+        Cards are never destroyed; unused ones stay hidden.
+        """
+        needed = math.ceil(self.height / self.row_height) + 1
+        while len(self.slots) < needed:
+            self.slots.append(self._create_slot())
+            self.slot_rows.append(None)
+
+    def _card_width(self):
+        return max(self.width - 2 * self.padding, 1)
+
+    def _create_slot(self):
+        """
+        Creates a hidden card for the pool.
+        Returns:
+            tuple: (card, canvas item or tag that shows the card)
+        """
+        card = BookCard(self.canvas)
+        window_id = self.canvas.create_window(self.padding, 0, window=card.frame, anchor='nw',
+            width=self._card_width(), height=self.row_height - self.padding, state='hidden')
+        return card, window_id
+
+    def _resize_slot(self, slot):
+        self.canvas.itemconfig(self.slots[slot][1], width=self._card_width())
+
+    def _show_slot(self, slot, y):
+        """
+        Moves a pooled card to a vertical position on the canvas and makes it visible.
+        """
+        window_id = self.slots[slot][1]
+        self.canvas.coords(window_id, self.padding, y)
+        self.canvas.itemconfig(window_id, state='normal')
+
+    def _hide_slot(self, slot):
+        self.canvas.itemconfig(self.slots[slot][1], state='hidden')
+
+    def _is_slot_hidden(self, slot):
+        return self.canvas.itemcget(self.slots[slot][1], 'state') == 'hidden'
+
+    def _update_scrollregion(self):
+        """
+        Sizes the scroll region to the full height of all rows, so the scrollbar reflects the whole list.
+        """
+        total_height = len(self.items) * self.row_height + self.padding
+        self.canvas.config(scrollregion=(0, 0, self.width, total_height))
+
+    def _on_yscroll(self, first, last):
+        """
+        Called by the canvas whenever its view changes. Updates the scrollbar and the visible cards.
+        """
+        self.scrollbar.set(first, last)
+        self._update_visible()
+
+    def _update_visible(self):
+        """
+        Places the pooled cards on the rows in view and binds any card whose row has changed.
+        Row r always uses pool slot r % pool size, so scrolling by one row only re-binds one card.
+        """
+        pool_size = len(self.slots)
+        if pool_size == 0:
+            return
+        top = max(int(self.canvas.canvasy(0)), 0)
+        first_row = top // self.row_height
+
+        for row in range(first_row, first_row + pool_size):
+            slot = row % pool_size
+            card = self.slots[slot][0]
+            if row >= len(self.items):
+                # No record for this row, hide the card
+                if self.slot_rows[slot] is not None or not self._is_slot_hidden(slot):
+                    self._hide_slot(slot)
+                    self.slot_rows[slot] = None
+                    if self.release_card:
+                        self.release_card(card)
+                continue
+            if self.slot_rows[slot] != row:
+                self.bind_card(card, self.items[row], row)
+                self._show_slot(slot, row * self.row_height + self.padding)
+                self.slot_rows[slot] = row
+
+
+class CanvasBookCard:
+    """
+    A book card drawn directly on a canvas as a handful of canvas items (background, cover, text, progress bar and
+    two drawn buttons) instead of about eight widgets, each with its own geometry management.
+    It has the same bind/set_image interface as BookCard. Clicks are handled by CanvasBookList with hit_test.
+    All items of a card share the tag in 'tag', and items with the same role on every card share a role tag
+    (e.g. 'card_text'), so a theme change recolors every card with one call per role.
+    """
+    _ids = itertools.count()
+
+    def __init__(self, canvas, colors):
+        """
+        Args:
+            canvas (tk.Canvas): The canvas to draw on.
+            colors (dict): The theme's palette, see CanvasBookList.set_colors.
+        """
+        self.canvas = canvas
+        self.tag = f"card{next(self._ids)}"
+        self.x, self.y, self.width, self.height = 0, 0, 1, 1
+        self.fraction = None
+        self.on_edit = None
+        self.on_delete = None
+
+        def create(kind, role, **options):
+            return getattr(canvas, f'create_{kind}')(0, 0, *([0, 0] if kind == 'rectangle' else []),
+                tags=(self.tag, role), state='hidden', **options)
+
+        self.background = create('rectangle', 'card_bg', fill=colors['frame_bg'], outline=colors['button_bg'], width=2)
+        self.image = create('image', 'card_image', anchor='nw')
+        self.title_text = create('text', 'card_text', anchor='nw', font=('Arial', 12, 'bold'), fill=colors['text_color'])
+        self.author_text = create('text', 'card_text', anchor='nw', font=('Arial', 10), fill=colors['text_color'])
+        self.progress_text = create('text', 'card_text', anchor='nw', font=('Arial', 10), fill=colors['text_color'])
+        self.progress_trough = create('rectangle', 'card_trough', fill=colors['canvas_bg'], outline=colors['button_bg'])
+        self.progress_fill = create('rectangle', 'card_progress', fill=PROGRESS_BAR_COLOR, outline='')
+        self.edit_button = create('rectangle', 'card_button', fill=colors['button_bg'], outline='')
+        self.edit_text = create('text', 'card_button_text', text="Edit", font=('Arial', 9), fill=colors['button_fg'])
+        self.delete_button = create('rectangle', 'card_button', fill=colors['button_bg'], outline='')
+        self.delete_text = create('text', 'card_button_text', text="Delete", font=('Arial', 9), fill=colors['button_fg'])
+
+    def bind(self, title, author, progress, photo, on_edit, on_delete, fraction=None):
+        """
+        Fills the card with a book's details, see BookCard.bind.
+        """
+        self.canvas.itemconfig(self.title_text, text=f"Title: {title}")
+        self.canvas.itemconfig(self.author_text, text=f"Author: {author}")
+        self.canvas.itemconfig(self.progress_text, text=f"Progress: {progress}")
+        self.set_image(photo)
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        self.fraction = fraction
+        self._layout_progress()
+
+    def set_image(self, photo):
+        """
+        Displays a cover image on the card.
+        """
+        self.canvas.itemconfig(self.image, image=photo)
+        self.photo = photo # reference to prevent memory from freeing up
+
+    def place(self, x, y, width, height):
+        """
+        Moves and sizes the card's items.
+        """
+        self.x, self.y, self.width, self.height = x, y, width, height
+        coords = self.canvas.coords
+        right, bottom = x + width, y + height
+        coords(self.background, x, y, right, bottom)
+        coords(self.image, x + CANVAS_COVER_X, y + CANVAS_COVER_Y)
+        coords(self.title_text, x + CANVAS_TEXT_X, y + 12)
+        coords(self.author_text, x + CANVAS_TEXT_X, y + 40)
+        coords(self.progress_text, x + CANVAS_TEXT_X, y + 64)
+        for button, text, left in self._button_boxes():
+            coords(button, left, bottom - 10 - CANVAS_BUTTON_HEIGHT, left + CANVAS_BUTTON_WIDTH, bottom - 10)
+            coords(text, left + CANVAS_BUTTON_WIDTH / 2, bottom - 10 - CANVAS_BUTTON_HEIGHT / 2)
+        self._layout_progress()
+
+    def show(self):
+        self.canvas.itemconfig(self.tag, state='normal')
+        self._layout_progress()
+
+    def hide(self):
+        self.canvas.itemconfig(self.tag, state='hidden')
+
+    def is_hidden(self):
+        return self.canvas.itemcget(self.background, 'state') == 'hidden'
+
+    def hit_test(self, x, y):
+        """
+        Returns the command of the button at a canvas position, or None if the position isn't on a button.
+        """
+        bottom = self.y + self.height
+        if not bottom - 10 - CANVAS_BUTTON_HEIGHT <= y <= bottom - 10:
+            return None
+        for (button, text, left), command in zip(self._button_boxes(), (self.on_edit, self.on_delete)):
+            if left <= x <= left + CANVAS_BUTTON_WIDTH:
+                return command
+        return None
+
+    def _button_boxes(self):
+        """
+        Returns (button, label, left edge) of the Edit and Delete buttons, aligned to the bottom right.
+        """
+        delete_left = self.x + self.width - 10 - CANVAS_BUTTON_WIDTH
+        edit_left = delete_left - CANVAS_BUTTON_GAP - CANVAS_BUTTON_WIDTH
+        return [(self.edit_button, self.edit_text, edit_left), (self.delete_button, self.delete_text, delete_left)]
+
+    def _layout_progress(self):
+        """
+        Sizes the progress bar to the book's completion, hiding it when the total is unknown.
+        """
+        left = self.x + CANVAS_TEXT_X
+        right = max(self.x + self.width - 10, left + 1)
+        top = self.y + 92
+        bottom = top + CANVAS_PROGRESS_BAR_HEIGHT
+        self.canvas.coords(self.progress_trough, left, top, right, bottom)
+        self.canvas.coords(self.progress_fill, left, top, left + (right - left) * min(self.fraction or 0, 1), bottom)
+        state = 'hidden' if self.fraction is None or self.is_hidden() else 'normal'
+        self.canvas.itemconfig(self.progress_trough, state=state)
+        self.canvas.itemconfig(self.progress_fill, state=state)
+
+
+class CanvasBookList(VirtualBookList):
+    """
+    A VirtualBookList whose cards are drawn as canvas items (see CanvasBookCard) instead of being widgets.
+    The pool is the same size, but each card is a few canvas items with no geometry management, and the
+    Edit and Delete buttons are handled by hit-testing clicks on the canvas.
+    """
+    def __init__(self, canvas, scrollbar, bind_card, colors, release_card=None, row_height=ROW_HEIGHT, padding=5):
+        """
+        Args:
+            colors (dict): The theme's palette, see set_colors.
+            See VirtualBookList for the other arguments.
+        """
+        self.colors = colors
+        super().__init__(canvas, scrollbar, bind_card, release_card, row_height, padding)
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<Motion>', self._on_motion)
+
+    def set_colors(self, colors):
+        """
+        Recolors every card for a theme. One call per role tag, however many cards there are.
+        Args:
+            colors (dict): The theme's palette, with 'frame_bg', 'text_color', 'canvas_bg', 'button_bg' and 'button_fg'.
+        """
+        self.colors = colors
+        config = self.canvas.itemconfig
+        config('card_bg', fill=colors['frame_bg'], outline=colors['button_bg'])
+        config('card_text', fill=colors['text_color'])
+        config('card_trough', fill=colors['canvas_bg'], outline=colors['button_bg'])
+        config('card_button', fill=colors['button_bg'])
+        config('card_button_text', fill=colors['button_fg'])
+
+    def card_at(self, x, y):
+        """
+        Returns the visible card at a canvas position, or None.
+        """
+        row = int(y // self.row_height)
+        for (card, tag), bound_row in zip(self.slots, self.slot_rows):
+            if bound_row == row:
+                return card
+        return None
+
+    def _on_click(self, event):
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        card = self.card_at(x, y)
+        command = card.hit_test(x, y) if card else None
+        if command:
+            command()
+
+    def _on_motion(self, event):
+        """
+        Shows a hand cursor over the drawn buttons.
+        """
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        card = self.card_at(x, y)
+        cursor = 'hand2' if card and card.hit_test(x, y) else ''
+        if self.canvas.cget('cursor') != cursor:
+            self.canvas.config(cursor=cursor)
+
+    def _create_slot(self):
+        card = CanvasBookCard(self.canvas, self.colors)
+        card.place(self.padding, 0, self._card_width(), self.row_height - self.padding)
+        return card, card.tag
+
+    def _resize_slot(self, slot):
+        card = self.slots[slot][0]
+        card.place(card.x, card.y, self._card_width(), card.height)
+
+    def _show_slot(self, slot, y):
+        card = self.slots[slot][0]
+        card.place(self.padding, y, self._card_width(), self.row_height - self.padding)
+        card.show()
+
+    def _hide_slot(self, slot):
+        self.slots[slot][0].hide()
+
+    def _is_slot_hidden(self, slot):
+        return self.slots[slot][0].is_hidden()
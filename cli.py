@@ -0,0 +1,269 @@
+import sys
+import json
+import argparse
+from models import Book
+from sort_index import BookSorter, SORT_MODES
+from isbn import read_isbn_file, normalize_isbn, is_valid_isbn
+from library import (Library, BookValidationError, parse_book, with_progress, export_books, lookup_isbns,
+    describe_lookup_error, open_default_store, create_metadata_client, open_default_isbn_index, open_reading_history,
+    IMPORT_WORKERS, IMPORT_REQUESTS_PER_SECOND)
+
+def main(argv=None):
+    """
+    Runs a command on the collection. The command line uses the same data files and core (library.py) as the GUI,
+    without importing tkinter or Pillow, so it works without a display, e.g. from scheduled jobs.
+    Args:
+        argv (list): The arguments, defaults to sys.argv[1:].
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(prog='cli.py', description="Manage the BookmarkPy collection from the command line.")
+    parser.add_argument('--storage', choices=['json', 'journal', 'sqlite', 'indexed'],
+        help="Storage backend, defaults to the BOOKMARKPY_STORAGE environment variable or 'json'.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help="List the books in the collection.")
+    list_parser.add_argument('--search', help="Only list books whose title or author words start with these words.")
+    list_parser.add_argument('--sort', default='added', choices=list(SORT_MODES), help="Sort order, defaults to the order books were added in.")
+    list_parser.add_argument('--desc', action='store_true', help="Reverse the sort order.")
+    list_parser.add_argument('--json', action='store_true', help="Print the books as JSON.")
+    list_parser.set_defaults(run=list_books)
+
+    add_parser = commands.add_parser('add', help="Add a book.")
+    add_parser.add_argument('title', nargs='?', default='', help="Title, can be left out with --isbn.")
+    add_parser.add_argument('author', nargs='?', default='', help="Author, can be left out with --isbn.")
+    add_parser.add_argument('--isbn', help="Look up the title and author from an ISBN.")
+    add_parser.add_argument('--pages', default='', help="Total pages.")
+    add_parser.add_argument('--current', default='', help="Current page.")
+    add_parser.add_argument('--chapters', default=None, help="Total chapters, tracks progress by chapters.")
+    add_parser.add_argument('--current-chapter', default='', help="Current chapter, tracks progress by chapters.")
+    add_parser.add_argument('--image', default='', help="Path of a cover image.")
+    add_parser.set_defaults(run=add_book)
+
+    progress_parser = commands.add_parser('progress', help="Update the progress of a book, in the unit it is tracked by.")
+    progress_parser.add_argument('book_id', type=int, help="ID of the book, as shown by 'list'.")
+    progress_parser.add_argument('current', type=int, help="The current page or chapter.")
+    progress_parser.add_argument('--total', type=int, help="Also change the total pages or chapters.")
+    progress_parser.set_defaults(run=update_progress)
+
+    import_parser = commands.add_parser('import', help="Add books from a text or CSV file of ISBNs.")
+    import_parser.add_argument('file', help="The file of ISBNs.")
+    import_parser.set_defaults(run=import_isbns)
+
+    export_parser = commands.add_parser('export', help="Write the collection to a JSON or CSV file.")
+    export_parser.add_argument('file', help="The file to write, as CSV if it ends in .csv, otherwise as JSON.")
+    export_parser.set_defaults(run=export_collection)
+
+    stats_parser = commands.add_parser('stats', help="Show reading statistics.")
+    stats_parser.add_argument('--json', action='store_true', help="Print the statistics as JSON.")
+    stats_parser.set_defaults(run=show_stats)
+
+    args = parser.parse_args(argv)
+    library = Library(open_default_store(args.storage))
+    try:
+        try:
+            library.load()
+        except (json.JSONDecodeError, OSError, ValueError) as e:
+            print(f"Error: could not read the collection from {library.store.path}: {e}", file=sys.stderr)
+            return 1
+        return args.run(library, args)
+    except BookValidationError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        library.close()
+
+
+def list_books(library, args):
+    """
+    Prints the books, optionally filtered by the search words and sorted.
+    """
+    books = library.books
+    if args.sort != 'added':
+        sorter = BookSorter()
+        sorter.add_many(books)
+        books = sorter.sorted_books(args.sort, args.desc)
+    elif args.desc:
+        books = books[::-1]
+    if args.search:
+        from search_index import SearchIndex
+        index = SearchIndex()
+        index.add_many(library.books)
+        matches = index.search(args.search)
+        if matches is not None:
+            books = [book for book in books if book.id in matches]
+
+    if args.json:
+        json.dump([book.to_dict() for book in books], sys.stdout, indent=4)
+        print()
+        return 0
+    for book in books:
+        print(f"{book.id:>5}  {book.title} by {book.author}  [{book.progress_string}]")
+    return 0
+
+
+def add_book(library, args):
+    """
+    Adds a book, looking up its title and author first if an ISBN was given.
+    """
+    title, author = args.title, args.author
+    if args.isbn:
+        info = _lookup_isbn(args.isbn)
+        if info is None:
+            return 1
+        title = title or info['title']
+        author = author or info['author']
+    track_chapters = args.chapters is not None or bool(args.current_chapter)
+    book = parse_book(title, author, args.image, track_chapters,
+        args.pages, args.current, args.chapters or '', args.current_chapter)
+    library.add_book(book)
+    library.save_books([book])
+    _record_progress(book, previous=Book(book.title, book.author)) # A new book has no earlier progress
+    print(f"Added book {book.id}: {book.title} by {book.author}")
+    return 0
+
+
+def update_progress(library, args):
+    """
+    Sets the current page or chapter of a book.
+    """
+    book = library.get_book(args.book_id)
+    if book is None:
+        print(f"Error: there is no book with ID {args.book_id}", file=sys.stderr)
+        return 1
+    updated = with_progress(book, args.current, args.total)
+    library.replace_book(book.id, updated)
+    library.save_books([updated])
+    _record_progress(updated, previous=book)
+    print(f"{updated.title}: {updated.progress_string}")
+    return 0
+
+
+def import_isbns(library, args):
+    """
+    Looks up every ISBN in a file and adds the books that were found, in the order of the file, with one save.
+    """
+    try:
+        isbns, invalid = read_isbn_file(args.file)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error: could not read {args.file}: {e}", file=sys.stderr)
+        return 1
+    for value in invalid:
+        print(f"{value}: invalid, wrong length or check digit")
+
+    found = {}
+
+    def on_result(isbn, info, error):
+        if info:
+            found[isbn] = info
+            print(f"{isbn}: {info['title']} by {info['author']}")
+        else:
+            print(f"{isbn}: {describe_lookup_error(error)}")
+
+    clients = [] # The one client, created only if some ISBNs have to be looked up online
+
+    def get_client():
+        if not clients:
+            clients.append(create_metadata_client(requests_per_second=IMPORT_REQUESTS_PER_SECOND))
+        return clients[0]
+
+    isbn_index = open_default_isbn_index()
+    try:
+        for future in lookup_isbns(isbns, on_result, get_client, isbn_index, max_workers=IMPORT_WORKERS):
+            future.result()
+    finally:
+        for client in clients:
+            client.close()
+        if isbn_index:
+            isbn_index.close()
+
+    new_books = [Book(found[isbn]['title'], found[isbn]['author']) for isbn in isbns if isbn in found]
+    if new_books:
+        library.add_books(new_books)
+        library.save_books(new_books)
+    print(f"Added {len(new_books)} books. {len(isbns) - len(new_books) + len(invalid)} ISBNs could not be imported.")
+    return 0
+
+
+def export_collection(library, args):
+    export_books(library.books, args.file)
+    print(f"Exported {len(library.books)} books to {args.file}")
+    return 0
+
+
+def show_stats(library, args):
+    """
+    Prints the same statistics as the Statistics panel. This is the only command that imports NumPy.
+    """
+    from library_stats import LibraryStats
+    stats = LibraryStats()
+    stats.add_many(library.books)
+    summary = stats.snapshot().summary()
+    history = open_reading_history()
+    if history:
+        summary['pace'] = history.library_pace()
+        history.close()
+    if args.json:
+        json.dump(summary, sys.stdout, indent=4)
+        print()
+        return 0
+    print(f"Books: {summary['books']} ({summary['finished']} finished, {summary['in_progress']} in progress, "
+        f"{summary['not_started']} not started)")
+    print(f"Pages read: {summary['pages_read']} of {summary['total_pages']}")
+    print(f"Chapters read: {summary['chapters_read']} of {summary['total_chapters']}")
+    if summary.get('pace'):
+        print(f"Reading pace: {summary['pace']['pages']:.1f} pages and {summary['pace']['chapters']:.1f} chapters per day")
+    print("Completion:")
+    for i, count in enumerate(summary['histogram']):
+        print(f"  {i * 10:>3}-{i * 10 + 10}%: {count}")
+    if summary['authors']:
+        print("Authors:")
+        for author, count, average in summary['authors']:
+            print(f"  {author}: {count} books, {average:.0f}% complete on average")
+    return 0
+
+
+def _lookup_isbn(isbn):
+    """
+    Looks up one ISBN, in the offline index first.
+    Returns:
+        dict or None: {'title': ..., 'author': ...}, or None after printing why it wasn't found.
+    """
+    isbn = normalize_isbn(isbn)
+    if not is_valid_isbn(isbn):
+        print(f"Error: {isbn} is not a valid ISBN", file=sys.stderr)
+        return None
+    isbn_index = open_default_isbn_index()
+    info = isbn_index.lookup_isbn(isbn) if isbn_index else None
+    if isbn_index:
+        isbn_index.close()
+    if info:
+        return info
+    client = create_metadata_client()
+    try:
+        info = client.lookup_isbn(isbn)
+    except Exception as e:
+        print(f"Error: {describe_lookup_error(e)}", file=sys.stderr)
+        return None
+    finally:
+        client.close()
+    if info is None:
+        print(f"Error: book not found for ISBN {isbn}", file=sys.stderr)
+    return info
+
+
+def _record_progress(book, previous=None):
+    """
+    Adds a progress change to the reading history. The previous progress is compared instead of the history,
+    so the history file is only appended to, not read.
+    """
+    if book.units()[0] is None:
+        return
+    history = open_reading_history()
+    if history:
+        history.record(book, previous=previous)
+        history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
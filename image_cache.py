@@ -0,0 +1,92 @@
+from collections import OrderedDict
+
+class PhotoImageCache:
+    """
+    In-memory cache of decoded Tk images, shared by every book card.
+    Entries are evicted in least recently used order once their total size goes over a byte budget.
+    Tk images can only be used from the main thread, so this cache is not thread-safe.
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Memory budget in bytes. Image size is estimated as width * height * 4.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # key -> (photo, size in bytes), oldest first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Looks up a cached image and marks it as recently used.
+        Args:
+            key (hashable): The cache key, e.g. (path, (width, height), mtime).
+        Returns:
+            PhotoImage or None: The cached image, or None if it isn't cached.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, photo):
+        """
+        Adds an image to the cache, evicting the least recently used images if the budget is exceeded.
+        Args:
+            key (hashable): The cache key.
+            photo (PhotoImage): The image to cache.
+        """
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        size = photo.width() * photo.height() * 4 # RGBA bytes
+        self.entries[key] = (photo, size)
+        self.total_bytes += size
+        # Evict oldest entries, but always keep the one just added
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+
+    def get_or_create(self, key, create):
+        """
+        Returns a cached image, or creates and caches it on a miss.
+        Args:
+            key (hashable): The cache key.
+            create (callable): Called with no arguments to build the image on a miss.
+        Returns:
+            PhotoImage: The cached or newly created image.
+        """
+        photo = self.get(key)
+        if photo is None:
+            photo = create()
+            self.put(key, photo)
+        return photo
+
+    def clear(self):
+        """
+        Removes every image from the cache. Statistics are kept.
+        """
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        """
+        Returns the cache statistics.
+        Returns:
+            dict: hits, misses, evictions, hit_rate, entries, bytes and max_bytes.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes
+        }
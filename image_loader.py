@@ -0,0 +1,132 @@
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tracing import tracer
+
+class AsyncImageLoader:
+    """
+    Decodes and resizes cover images on a pool of worker threads, so a slow or huge image never blocks the UI.
+    Decoded thumbnails are handed back to the Tk main thread in batches through root.after, where they are
+    converted to PhotoImages, stored in the shared PhotoImageCache and passed to whoever requested them.
+    Requests are made on behalf of an owner (e.g. a book card). Each owner waits for at most one image, and a
+    request is cancelled when its owner asks for a different image or is released.
+    All methods except the worker function must be called from the main thread.
+    """
+    def __init__(self, root, thumbnail_cache, photo_cache, max_workers=4, batch_delay=15):
+        """
+        Args:
+            root (tk.Tk): The root window, used to schedule work on the main thread.
+            thumbnail_cache (ThumbnailCache): Produces the resized thumbnails from the image files.
+            photo_cache (PhotoImageCache): Receives the finished PhotoImages.
+            max_workers (int): Number of decoding threads.
+            batch_delay (int): Milliseconds to wait for more results before handing a batch to the main thread.
+        """
+        self.root = root
+        self.thumbnail_cache = thumbnail_cache
+        self.photo_cache = photo_cache
+        self.batch_delay = batch_delay
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cover-loader')
+
+        self.jobs = {} # key -> (job token, Future) for decodes in progress
+        self.key_owners = {} # key -> {owner: on_ready} waiting for that image
+        self.owner_keys = {} # owner -> key it is waiting for
+
+        self.lock = threading.Lock() # Guards ready and flush_scheduled, shared with the workers
+        self.ready = [] # (key, job token, PIL image or None) waiting to be handed to the main thread
+        self.flush_scheduled = False
+
+    def load(self, owner, key, image_path, on_ready):
+        """
+        Requests an image in the background. Replaces any earlier request by the same owner.
+        Identical requests from several owners share one decode.
+        Args:
+            owner (hashable): Whoever the image is for, e.g. a book card.
+            key (hashable): The PhotoImageCache key for the image.
+            image_path (str): Path to the image file.
+            on_ready (callable): Called on the main thread with the PhotoImage when it is ready.
+        """
+        self.cancel(owner)
+        self.owner_keys[owner] = key
+        self.key_owners.setdefault(key, {})[owner] = on_ready
+        if key not in self.jobs:
+            job = object() # Unique token, so results of cancelled jobs can be told apart from a newer job
+            future = self.executor.submit(self._decode, key, job, image_path)
+            self.jobs[key] = (job, future)
+
+    def cancel(self, owner):
+        """
+        Cancels the pending request of an owner, e.g. when its row is scrolled away or deleted.
+        The decode itself is cancelled once no other owner is waiting for the same image.
+        """
+        key = self.owner_keys.pop(owner, None)
+        if key is None:
+            return
+        owners = self.key_owners.get(key, {})
+        owners.pop(owner, None)
+        if not owners:
+            self.key_owners.pop(key, None)
+            job = self.jobs.pop(key, None)
+            if job:
+                job[1].cancel() # Only stops jobs that haven't started, running ones are ignored when they finish
+
+    def cancel_all(self):
+        """
+        Cancels every pending request.
+        """
+        for job, future in self.jobs.values():
+            future.cancel()
+        self.jobs = {}
+        self.key_owners = {}
+        self.owner_keys = {}
+
+    def shutdown(self):
+        """
+        Cancels every pending request and stops the worker threads without waiting for them.
+        """
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _decode(self, key, job, image_path):
+        """
+        Worker thread function that produces the thumbnail and queues it for the main thread.
+        """
+        try:
+            with tracer.span('decode cover', 'image', {'path': image_path}):
+                img = self.thumbnail_cache.get(image_path)
+        except Exception as e:
+            print(f"Error loading image {image_path}: {e}")
+            img = None
+        with self.lock:
+            self.ready.append((key, job, img))
+            if self.flush_scheduled:
+                return # Already waiting to hand over a batch
+            self.flush_scheduled = True
+        try:
+            self.root.after(self.batch_delay, self._flush)
+        except (RuntimeError, tk.TclError):
+            pass # The window has been closed
+
+    def _flush(self):
+        """
+        Hands a batch of decoded thumbnails to their owners on the main thread.
+        """
+        from PIL import ImageTk # Already loaded by the worker that decoded the thumbnails
+        with self.lock:
+            ready, self.ready = self.ready, []
+            self.flush_scheduled = False
+
+        for key, job, img in ready:
+            current = self.jobs.get(key)
+            if current is None or current[0] is not job:
+                continue # Cancelled, or superseded by a newer request
+            del self.jobs[key]
+            owners = self.key_owners.pop(key, {})
+            for owner in owners:
+                self.owner_keys.pop(owner, None)
+            if img is None:
+                continue # Failed to load, owners keep their placeholder
+            with tracer.span('PhotoImage', 'image'):
+                photo = ImageTk.PhotoImage(img) # Tk images must be created on the main thread
+            self.photo_cache.put(key, photo)
+            for on_ready in owners.values():
+                on_ready(photo)
@@ -0,0 +1,74 @@
+import re
+
+# Separators allowed inside an ISBN, e.g. 978-0-14-032872-1
+ISBN_SEPARATORS = re.compile(r'[\s-]')
+# Delimiters between values in a line of text, CSV or TSV
+VALUE_DELIMITERS = re.compile(r'[,;\s]+')
+# A value that looks like an ISBN: digits with optional hyphens, ISBN-10s may end in X
+ISBN_CANDIDATE = re.compile(r'[0-9][0-9-]{8,16}[0-9Xx]')
+
+def normalize_isbn(text):
+    """
+    Removes hyphens and spaces from an ISBN and upper-cases a trailing 'x'.
+    """
+    return ISBN_SEPARATORS.sub('', text).upper()
+
+def is_valid_isbn(isbn):
+    """
+    Checks that an ISBN has 10 or 13 digits and a correct check digit.
+    Args:
+        isbn (str): A normalized ISBN (see normalize_isbn).
+    Returns:
+        bool: True if the ISBN is valid.
+    """
+    if len(isbn) == 10:
+        # ISBN-10: weights 10 down to 1, the check digit may be 'X' (10)
+        if not isbn[:9].isdigit() or not (isbn[9].isdigit() or isbn[9] == 'X'):
+            return False
+        digits = [int(c) for c in isbn[:9]] + [10 if isbn[9] == 'X' else int(isbn[9])]
+        return sum(weight * digit for weight, digit in zip(range(10, 0, -1), digits)) % 11 == 0
+    if len(isbn) == 13:
+        # ISBN-13: alternating weights 1 and 3
+        if not isbn.isdigit():
+            return False
+        return sum((3 if i % 2 else 1) * int(c) for i, c in enumerate(isbn)) % 10 == 0
+    return False
+
+def read_isbn_file(path):
+    """
+    Reads ISBNs from a text or CSV file, e.g. a barcode scanner dump.
+    Every ISBN-like value in the file is collected, whether one per line or separated by commas, semicolons,
+    tabs or spaces. Only hyphens are allowed inside an ISBN, so values next to each other are never joined.
+    Duplicates are dropped, keeping the first occurrence.
+    Args:
+        path (str): The file to read.
+    Returns:
+        tuple: (list of valid normalized ISBNs, list of invalid values as found in the file).
+    Raises:
+        OSError: If the file can't be read.
+    """
+    valid, invalid = [], []
+    seen = set()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            for value in VALUE_DELIMITERS.split(line):
+                candidate = value.strip('"\'')
+                if not ISBN_CANDIDATE.fullmatch(candidate):
+                    continue
+                isbn = normalize_isbn(candidate)
+                if isbn in seen:
+                    continue
+                seen.add(isbn)
+                if is_valid_isbn(isbn):
+                    valid.append(isbn)
+                else:
+                    invalid.append(candidate)
+    return valid, invalid
+
+def isbn10_to_isbn13(isbn):
+    """
+    Converts a valid ISBN-10 to the equivalent ISBN-13 (with the 978 prefix).
+    """
+    body = '978' + isbn[:9]
+    check = (10 - sum((3 if i % 2 else 1) * int(c) for i, c in enumerate(body)) % 10) % 10
+    return body + str(check)
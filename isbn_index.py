@@ -0,0 +1,281 @@
+import os
+import sys
+import gzip
+import json
+import mmap
+import shutil
+import sqlite3
+import struct
+import tempfile
+from functools import lru_cache
+from isbn import normalize_isbn, is_valid_isbn, isbn10_to_isbn13
+
+# Layout of an index file:
+#     magic bytes | entry count (u64) | entries: ISBN-13 as u64, record offset as u64, sorted by ISBN | records
+# Each record is a u16 byte length followed by "title\x1fauthor" in UTF-8
+INDEX_MAGIC = b'BMKISBN\x01'
+INDEX_HEADER = struct.Struct('<Q')
+INDEX_ENTRY = struct.Struct('<QQ')
+RECORD_LENGTH = struct.Struct('<H')
+ENTRIES_START = len(INDEX_MAGIC) + INDEX_HEADER.size
+FIELD_SEPARATOR = '\x1f'
+
+# Rows written to the build database per transaction
+BUILD_BATCH_SIZE = 10000
+
+class IsbnIndex:
+    """
+    Offline ISBN lookups from an index file built from the Open Library data dumps (see build_isbn_index).
+    The file is memory mapped and searched in place with a binary search over the sorted ISBNs, so opening it
+    is instant, lookups take microseconds, and only the pages that are touched are read from disk.
+    """
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path of the index file.
+        Raises:
+            OSError: If the file can't be opened.
+            ValueError: If the file isn't an ISBN index.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.mm.close()
+            raise ValueError(f"{path} is not an ISBN index file")
+        self.count = INDEX_HEADER.unpack_from(self.mm, len(INDEX_MAGIC))[0]
+        self.records_start = ENTRIES_START + self.count * INDEX_ENTRY.size
+
+    def __len__(self):
+        return self.count
+
+    def lookup_isbn(self, isbn):
+        """
+        Finds the title and author(s) of a book, in the same form as OpenLibraryClient.lookup_isbn.
+        Args:
+            isbn (str): A 10 or 13 digit ISBN.
+        Returns:
+            dict or None: {'title': ..., 'author': ...}, or None if the ISBN isn't in the index.
+        """
+        key = isbn_key(isbn)
+        if key is None:
+            return None
+        mm, unpack_from, entry_size = self.mm, INDEX_ENTRY.unpack_from, INDEX_ENTRY.size
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, offset = unpack_from(mm, ENTRIES_START + mid * entry_size)
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                return self._read_record(self.records_start + offset)
+        return None
+
+    def close(self):
+        self.mm.close()
+
+    def _read_record(self, position):
+        length = RECORD_LENGTH.unpack_from(self.mm, position)[0]
+        start = position + RECORD_LENGTH.size
+        title, author = self.mm[start:start + length].decode('utf-8').split(FIELD_SEPARATOR, 1)
+        return {'title': title, 'author': author}
+
+
+def isbn_key(isbn):
+    """
+    Returns the integer key of an ISBN in the index, its ISBN-13 form, or None if the ISBN isn't valid.
+    ISBN-10s and ISBN-13s of the same book have the same key.
+    """
+    isbn = normalize_isbn(isbn)
+    if not is_valid_isbn(isbn):
+        return None
+    if len(isbn) == 10:
+        isbn = isbn10_to_isbn13(isbn)
+    return int(isbn)
+
+
+def open_isbn_index(path):
+    """
+    Opens an ISBN index if the file exists.
+    Returns:
+        IsbnIndex or None: The index, or None if there is no usable index file.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return IsbnIndex(path)
+    except (OSError, ValueError) as e:
+        print(f"Could not open ISBN index {path}: {e}")
+        return None
+
+
+def build_isbn_index(editions_path, works_path, authors_path, index_path, temp_dir=None, cache_mb=64):
+    """
+    Builds an ISBN index from Open Library dump files (https://openlibrary.org/developers/dumps).
+    The dumps are streamed line by line into a temporary SQLite database that does the joins on disk, so memory
+    use stays bounded by the SQLite page cache however large the dumps are. Titles and authors are resolved the
+    same way as the online lookup: the edition's title, and the authors of its work (or of the edition itself).
+    Args:
+        editions_path, works_path, authors_path (str): The editions, works and authors dumps, optionally gzipped.
+        index_path (str): Path of the index file to write. It is replaced atomically when complete.
+        temp_dir (str): Directory for the temporary build files, which can be a few GB for the full dumps.
+        cache_mb (int): Size of the SQLite page cache in MB.
+    Returns:
+        int: The number of ISBNs in the index.
+    """
+    with tempfile.TemporaryDirectory(dir=temp_dir) as work_dir:
+        db = sqlite3.connect(os.path.join(work_dir, 'build.db'))
+        db.execute(f"PRAGMA cache_size = -{cache_mb * 1024}") # Negative sizes are in KB
+        db.execute("PRAGMA journal_mode = OFF") # A failed build is thrown away, no need for crash safety
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute("PRAGMA temp_store = FILE")
+        db.execute("CREATE TABLE editions (isbn INTEGER NOT NULL, title TEXT, work TEXT, authors TEXT)")
+        db.execute("CREATE TABLE works (key TEXT PRIMARY KEY, authors TEXT) WITHOUT ROWID")
+        db.execute("CREATE TABLE authors (key TEXT PRIMARY KEY, name TEXT) WITHOUT ROWID")
+
+        _load_dump(db, authors_path, "INSERT OR REPLACE INTO authors VALUES (?, ?)", _author_rows)
+        _load_dump(db, works_path, "INSERT OR REPLACE INTO works VALUES (?, ?)", _work_rows)
+        _load_dump(db, editions_path, "INSERT INTO editions VALUES (?, ?, ?, ?)", _edition_rows)
+        print("Sorting ISBNs...")
+        db.execute("CREATE INDEX idx_editions_isbn ON editions (isbn)")
+
+        @lru_cache(maxsize=100000)
+        def author_name(key):
+            row = db.execute("SELECT name FROM authors WHERE key = ?", (key,)).fetchone()
+            return row[0] if row and row[0] else "Unknown Author"
+
+        # Entries and records go to separate files first, then are joined behind the header
+        entries_path = os.path.join(work_dir, 'entries')
+        records_path = os.path.join(work_dir, 'records')
+        count = 0
+        offset = 0
+        previous_isbn = None
+        rows = db.execute("""
+            SELECT e.isbn, e.title, e.authors, w.authors FROM editions e LEFT JOIN works w ON w.key = e.work
+            ORDER BY e.isbn""")
+        with open(entries_path, 'wb') as entries, open(records_path, 'wb') as records:
+            for isbn, title, edition_authors, work_authors in rows:
+                if isbn == previous_isbn:
+                    continue # Several editions with the same ISBN, keep the first
+                previous_isbn = isbn
+                author_keys = json.loads(work_authors if work_authors is not None else edition_authors)
+                author_names = [author_name(key) if key else "Unknown Author" for key in author_keys]
+                author = ", ".join(author_names) if author_names else "Unknown Author"
+                title = title or 'Unknown Title'
+                if title == 'Unknown Title' and author == 'Unknown Author':
+                    continue # Nothing useful, the online lookup would give no result either
+                record = _clean(title).encode('utf-8') + FIELD_SEPARATOR.encode() + _clean(author).encode('utf-8')
+                record = record[:0xFFFF].decode('utf-8', 'ignore').encode('utf-8') # Cut at a character boundary
+                entries.write(INDEX_ENTRY.pack(isbn, offset))
+                records.write(RECORD_LENGTH.pack(len(record)) + record)
+                offset += RECORD_LENGTH.size + len(record)
+                count += 1
+        db.close()
+
+        temp_path = index_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(INDEX_MAGIC + INDEX_HEADER.pack(count))
+            for part in (entries_path, records_path):
+                with open(part, 'rb') as source:
+                    shutil.copyfileobj(source, f, 1024 * 1024)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, index_path)
+    print(f"Wrote {count} ISBNs to {index_path}")
+    return count
+
+
+def _open_dump(path):
+    """
+    Opens a dump file for reading text, decompressing it on the fly if it is gzipped.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def _load_dump(db, path, insert_sql, make_rows):
+    """
+    Streams the records of a dump file into the build database in batches.
+    Dump lines are tab separated: type, key, revision, last modified, JSON record.
+    Args:
+        make_rows (callable): Called as make_rows(key, record) and returns the rows to insert for a record.
+    """
+    print(f"Reading {path}...")
+    batch = []
+    lines = 0
+    with _open_dump(path) as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t', 4)
+            if len(fields) != 5:
+                continue
+            try:
+                record = json.loads(fields[4])
+            except json.JSONDecodeError:
+                continue # Skip damaged records rather than failing a multi-hour build
+            batch.extend(make_rows(fields[1], record))
+            if len(batch) >= BUILD_BATCH_SIZE:
+                with db:
+                    db.executemany(insert_sql, batch)
+                batch = []
+            lines += 1
+            if lines % 1000000 == 0:
+                print(f"  {lines} records")
+    if batch:
+        with db:
+            db.executemany(insert_sql, batch)
+
+
+def _author_keys(authors_data):
+    """
+    Extracts author keys from the 'authors' list of an edition or work. Entries without a key give None.
+    """
+    author_keys = []
+    for author_entry in authors_data or []:
+        if not isinstance(author_entry, dict):
+            continue
+        author = author_entry.get('author')
+        author_key = author.get('key') if isinstance(author, dict) else None
+        author_keys.append(author_key or author_entry.get('key'))
+    return author_keys
+
+
+def _author_rows(key, record):
+    return [(key, record.get('name'))]
+
+
+def _work_rows(key, record):
+    return [(key, json.dumps(_author_keys(record.get('authors'))))]
+
+
+def _edition_rows(key, record):
+    """
+    Returns a row per valid ISBN of an edition, keyed by its ISBN-13 form.
+    """
+    works = record.get('works') or []
+    work_key = works[0].get('key') if works and isinstance(works[0], dict) else None
+    authors = json.dumps(_author_keys(record.get('authors')))
+    keys = set()
+    for isbn in (record.get('isbn_13') or []) + (record.get('isbn_10') or []):
+        key = isbn_key(isbn) if isinstance(isbn, str) else None
+        if key is not None:
+            keys.add(key)
+    return [(key, record.get('title'), work_key, authors) for key in keys]
+
+
+def _clean(text):
+    """
+    Removes characters that are used to separate fields in the index records.
+    """
+    return ' '.join(str(text).replace(FIELD_SEPARATOR, ' ').split())
+
+
+if __name__ == "__main__":
+    # Usage: python isbn_index.py build ol_dump_editions.txt.gz ol_dump_works.txt.gz ol_dump_authors.txt.gz isbn_index.bin
+    if len(sys.argv) == 6 and sys.argv[1] == 'build':
+        build_isbn_index(*sys.argv[2:6])
+    else:
+        print("Usage: python isbn_index.py build <editions dump> <works dump> <authors dump> <isbn_index.bin>")
+        sys.exit(1)
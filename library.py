@@ -0,0 +1,403 @@
+import os
+import csv
+import json
+import time
+from models import Book, BOOK_FIELDS
+from storage import open_store, write_json_atomic
+
+# Data files, relative to the working directory
+JSON_PATH = 'books.json'
+SQLITE_PATH = 'books.db'
+INDEXED_PATH = 'books.bmk'
+HISTORY_PATH = 'reading_history.bin'
+OPENLIBRARY_CACHE_PATH = 'openlibrary_cache.db'
+ISBN_INDEX_PATH = 'isbn_index.bin'
+# Bulk ISBN imports look up this many ISBNs at a time, sending at most IMPORT_REQUESTS_PER_SECOND requests per second
+IMPORT_WORKERS = 4
+IMPORT_REQUESTS_PER_SECOND = 5
+
+class BookValidationError(ValueError):
+    """
+    Raised when the details entered for a book are invalid. The message is meant to be shown to the user.
+    """
+
+
+def open_default_store(kind=None):
+    """
+    Opens the storage backend used by both the GUI and the command line.
+    Args:
+        kind (str): 'json', 'journal', 'sqlite' or 'indexed', see storage.open_store.
+            Defaults to the BOOKMARKPY_STORAGE environment variable, or 'json'.
+    Returns:
+        The storage backend. Falls back to books.json if the kind is unknown.
+    """
+    kind = kind or os.environ.get('BOOKMARKPY_STORAGE', 'json')
+    try:
+        return open_store(kind, json_path=JSON_PATH, sqlite_path=SQLITE_PATH, indexed_path=INDEXED_PATH)
+    except ValueError as e:
+        print(f"{e}. Using {JSON_PATH} instead.")
+        return open_store('json', json_path=JSON_PATH)
+
+
+def create_metadata_client(requests_per_second=None):
+    """
+    Creates the Open Library client for ISBN lookups, with its responses cached in openlibrary_cache.db.
+    The server can be changed with BOOKMARKPY_OPENLIBRARY_URL (e.g. a local test server).
+    The client and the requests package are only imported when a client is needed.
+    Args:
+        requests_per_second (float): Limit on the request rate, or None for no limit.
+    Returns:
+        OpenLibraryClient: The client. Call close() when done.
+    """
+    from openlibrary import OpenLibraryClient
+    from response_cache import ResponseCache
+    return OpenLibraryClient(os.environ.get('BOOKMARKPY_OPENLIBRARY_URL', 'https://openlibrary.org'),
+        cache=ResponseCache(OPENLIBRARY_CACHE_PATH), requests_per_second=requests_per_second)
+
+
+def open_default_isbn_index():
+    """
+    Opens the offline ISBN index named by BOOKMARKPY_ISBN_INDEX (default isbn_index.bin), if it exists.
+    The index module (and SQLite, gzip and mmap with it) is only imported when there is an index file.
+    Returns:
+        IsbnIndex or None: The index, or None if there is no usable index file.
+    """
+    path = os.environ.get('BOOKMARKPY_ISBN_INDEX', ISBN_INDEX_PATH)
+    if not path or not os.path.exists(path):
+        return None
+    from isbn_index import open_isbn_index
+    return open_isbn_index(path)
+
+
+def open_reading_history():
+    """
+    Opens the reading history file.
+    Returns:
+        ReadingHistory or None: The history, or None if the file can't be used.
+    """
+    from reading_history import ReadingHistory
+    try:
+        return ReadingHistory(HISTORY_PATH)
+    except (OSError, ValueError) as e:
+        print(f"Reading history is not available: {e}")
+        return None
+
+
+def lookup_isbns(isbns, on_result, get_client, isbn_index=None, max_workers=4):
+    """
+    Looks up the title and author of several ISBNs. ISBNs in the offline index are resolved right away on the
+    calling thread, the rest are looked up online a few at a time.
+    Args:
+        isbns (list): Valid ISBNs.
+        on_result (callable): Called as on_result(isbn, info, error) for each ISBN, on the calling thread for
+            offline results and on a worker thread for online ones. See OpenLibraryClient.lookup_many.
+        get_client (callable): Returns the OpenLibraryClient for online lookups. Only called if some ISBNs
+            aren't in the offline index, so the client isn't created when it isn't needed.
+        isbn_index (IsbnIndex): The offline index, or None.
+        max_workers (int): Number of concurrent online lookups.
+    Returns:
+        list: Futures of the online lookups, which can be cancelled.
+    """
+    online_isbns = []
+    for isbn in isbns:
+        info = isbn_index.lookup_isbn(isbn) if isbn_index else None
+        if info:
+            on_result(isbn, info, None)
+        else:
+            online_isbns.append(isbn)
+    if not online_isbns:
+        return []
+    return get_client().lookup_many(online_isbns, on_result, max_workers=max_workers)
+
+
+def describe_lookup_error(error):
+    """
+    Returns a short explanation of why an ISBN lookup found nothing.
+    Args:
+        error (Exception or None): The exception raised by the lookup, or None if it returned no book.
+    """
+    if error is None:
+        return "Book not found for this ISBN."
+    if isinstance(error, json.JSONDecodeError):
+        return "Could not parse API response (invalid JSON)."
+    import requests # Loaded with the metadata client that raised the error
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None and error.response.status_code == 404:
+        return "Book not found for this ISBN."
+    if isinstance(error, requests.exceptions.Timeout):
+        return "API request timed out."
+    if isinstance(error, requests.exceptions.RequestException):
+        return f"Network Error: {error}"
+    return f"An unexpected error occured: {error}"
+
+
+def parse_book(title, author, image_path, track_chapters, total_pages_str, current_progress_str, total_chapters_str, current_chapter_str):
+    """
+    Creates a book from the text entered for it, checking that it is valid.
+    Only the counts of the unit being tracked are used, empty counts are unknown.
+    Args:
+        title (str), author(str), image_path(str): basic book details
+        track_chapters (bool): True when tracking progress by chapters, False when tracking progress by pages.
+        total_pages_str (str), current_progress_str (str): String values of page counts.
+        total_chapters_str (str), current_chapter_str (str): String values of chapter counts.
+    Returns:
+        Book: The new book, without an ID.
+    Raises:
+        BookValidationError: If a detail is missing or a count isn't valid.
+    """
+    # Validate required fields (title and author)
+    if not title.strip() or not author.strip(): # Removing leading and trailing whitespace
+        raise BookValidationError("Title and Author cannot be empty.")
+
+    # Initialize numeric progress variables to None. Populate if valid.
+    total_pages = None
+    current_progress = None
+    total_chapters = None
+    current_chapter = None
+
+    try:
+        if not track_chapters: # Processing for page tracking
+            if total_pages_str.strip(): # Only precess when string isn't empty
+                total_pages = int(total_pages_str)
+            if current_progress_str.strip():
+                current_progress = int(current_progress_str)
+        else: # Procesing for chapter tracking
+            if total_chapters_str.strip():
+                total_chapters = int(total_chapters_str)
+            if current_chapter_str.strip():
+                current_chapter = int(current_chapter_str)
+    except ValueError:
+        raise BookValidationError("Page/Chapter counts must be valid numbers (or left empty).")
+
+    validate_counts(track_chapters, total_pages, current_progress, total_chapters, current_chapter)
+    return Book(title.strip(), author.strip(), image_path, track_chapters,
+        total_pages, current_progress, total_chapters, current_chapter)
+
+
+def validate_counts(track_chapters, total_pages, current_progress, total_chapters, current_chapter):
+    """
+    Checks that counts are not negative and that current progress doesn't exceed the total.
+    Raises:
+        BookValidationError: If a count isn't valid.
+    """
+    if (total_pages is not None and total_pages < 0) or \
+       (current_progress is not None and current_progress < 0) or \
+       (total_chapters is not None and total_chapters < 0) or \
+       (current_chapter is not None and current_chapter < 0):
+        raise BookValidationError("Counts cannot be negative.")
+
+    # Validate current progress against total count, ensuring current <= total
+    if not track_chapters:
+        if current_progress is not None and total_pages is not None and current_progress > total_pages:
+            raise BookValidationError("Current page cannot exceed total pages.")
+    else:
+        if current_chapter is not None and total_chapters is not None and current_chapter > total_chapters:
+            raise BookValidationError("Current chapter cannot exceed total chapters.")
+
+
+def with_progress(book, current, total=None):
+    """
+    Returns a copy of a book with new progress in the unit it is tracked by.
+    Args:
+        book (Book): The book.
+        current (int): The new current page or chapter.
+        total (int): The new total, or None to keep the current total.
+    Returns:
+        Book: The updated copy, with the same ID.
+    Raises:
+        BookValidationError: If the progress isn't valid.
+    """
+    updated = Book.from_dict(book.to_dict())
+    if book.track_chapters:
+        updated.current_chapter = current
+        if total is not None:
+            updated.total_chapters = total
+    else:
+        updated.current_progress = current
+        if total is not None:
+            updated.total_pages = total
+    validate_counts(updated.track_chapters, updated.total_pages, updated.current_progress,
+        updated.total_chapters, updated.current_chapter)
+    return updated
+
+
+def export_books(books, path):
+    """
+    Writes books to a file, as CSV if the file name ends in .csv and as JSON otherwise.
+    Args:
+        books (list): The Book objects to export.
+        path (str): The file to write.
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['id'] + BOOK_FIELDS)
+            writer.writeheader()
+            for book in books:
+                writer.writerow(book.to_dict())
+    else:
+        write_json_atomic(path, {'books': [book.to_dict() for book in books]})
+
+
+class Library:
+    """
+    The book collection and its storage, without any user interface.
+    Used directly by the command line, and by the GUI, which adds its own display, indexes and background saving.
+    Books are kept in 'books' in the order they were added, and each has a stable integer ID.
+    IDs are never reused, even after the book with the highest ID is deleted: the next ID is saved with the
+    settings as 'next_book_id', because other data, such as the reading history, is keyed by book ID.
+    The 'books' list is only ever changed in place, so references to it stay valid.
+    """
+    def __init__(self, store):
+        """
+        Args:
+            store: The storage backend, see open_default_store.
+        """
+        self.store = store
+        self.books = []
+        self.settings = {} # settings saved alongside the books, e.g. the theme
+        self.next_book_id = 1 # stable ID given to the next new book
+        self.stored_max_id = 0 # highest book ID in the store, including books not loaded yet
+
+    def load(self, limit=None):
+        """
+        Loads the books and settings from the store, if it has been saved before, and gives every book an ID.
+        Args:
+            limit (int): With a store that supports lazy loading, only load this many books.
+                The rest can be read with store.iter_chunks. None loads every book.
+        Returns:
+            int: The number of books that weren't loaded.
+        Raises:
+            json.JSONDecodeError, OSError, ValueError: If the store can't be read.
+        """
+        remaining = 0
+        if self.store.exists():
+            if limit is not None and self.store.supports_lazy_load:
+                books, settings, total, self.stored_max_id = self.store.load_head(limit)
+                remaining = total - len(books)
+            else:
+                books, settings = self.store.load()
+            self.books[:] = books
+            self.settings = settings
+            stored_next_id = settings.get('next_book_id')
+            if isinstance(stored_next_id, int):
+                self.next_book_id = max(self.next_book_id, stored_next_id)
+        self.assign_ids()
+        return remaining
+
+    def assign_ids(self):
+        """
+        Makes sure every book has a stable integer 'id', used to find a book regardless of its list position.
+        Books loaded from files saved before IDs existed are numbered after the highest existing ID.
+        """
+        existing_ids = [book.id for book in self.books if isinstance(book.id, int)]
+        self.next_book_id = max(existing_ids + [self.stored_max_id, self.next_book_id - 1]) + 1
+        for book in self.books:
+            if not isinstance(book.id, int):
+                book.id = self.new_book_id()
+
+    def new_book_id(self):
+        """
+        Returns a new unique book ID.
+        """
+        book_id = self.next_book_id
+        self.next_book_id += 1
+        return book_id
+
+    def find_book_index(self, book_id):
+        """
+        Finds the position of a book in the 'books' list.
+        Args:
+            book_id (int): The stable ID of the book.
+        Returns:
+            int or None: The index of the book, or None if no book has that ID.
+        """
+        for i, book in enumerate(self.books):
+            if book.id == book_id:
+                return i
+        return None
+
+    def get_book(self, book_id):
+        """
+        Returns the book with an ID, or None if there is none.
+        """
+        index = self.find_book_index(book_id)
+        return None if index is None else self.books[index]
+
+    def add_book(self, book):
+        """
+        Adds a new book to the end of the collection, giving it an ID and marking it as updated now.
+        Returns:
+            int: The index of the book.
+        """
+        self.add_books([book])
+        return len(self.books) - 1
+
+    def add_books(self, books):
+        """
+        Adds several new books to the end of the collection.
+        Returns:
+            int: The index of the first added book.
+        """
+        index = len(self.books)
+        now = time.time()
+        for book in books:
+            book.id = self.new_book_id()
+            book.updated = now
+        self.books.extend(books)
+        return index
+
+    def replace_book(self, book_id, book):
+        """
+        Replaces a book with its edited version, which gets the same ID and is marked as updated now.
+        Returns:
+            int or None: The index of the book, or None if no book has that ID.
+        """
+        index = self.find_book_index(book_id)
+        if index is None:
+            return None
+        book.id = book_id
+        book.updated = time.time()
+        self.books[index] = book
+        return index
+
+    def delete_book(self, book_id):
+        """
+        Removes a book from the collection.
+        Returns:
+            int or None: The index the book had, or None if no book has that ID.
+        """
+        index = self.find_book_index(book_id)
+        if index is not None:
+            del self.books[index]
+        return index
+
+    def save(self):
+        """
+        Writes the whole collection and settings to the store.
+        """
+        self.settings['next_book_id'] = self.next_book_id
+        self.store.save_all(self.books, self.settings)
+
+    def save_books(self, books):
+        """
+        Writes added or edited books to the store. Backends without per-record writes save the whole collection.
+        """
+        if not self.store.supports_record_writes:
+            self.save()
+            return
+        for book in books:
+            self.store.upsert_book(book)
+
+    def save_deleted_book(self, book_id):
+        """
+        Removes a deleted book from the store. Backends without per-record writes save the whole collection.
+        The next book ID is saved too, so the deleted book's ID isn't given to a new book after a restart.
+        """
+        if not self.store.supports_record_writes:
+            self.save()
+            return
+        self.store.delete_book(book_id)
+        self.settings['next_book_id'] = self.next_book_id
+        self.store.save_settings({'next_book_id': self.next_book_id})
+
+    def close(self):
+        self.store.close()
@@ -0,0 +1,202 @@
+import numpy as np
+
+# Completion histogram bins, in percent: 0-10, 10-20, ..., 90-100
+HISTOGRAM_BINS = np.linspace(0, 100, 11)
+
+class LibraryStats:
+    """
+    Reading statistics for the whole collection, computed with NumPy over columnar arrays.
+    Each book is one row in a set of arrays (pages read, total pages, chapters read, total chapters, ...), so
+    totals, counts and distributions are single vectorized operations instead of a Python loop over the books.
+    A changed book only rewrites its own row, and a deleted book's row is filled with the last row, so the
+    columns never need rebuilding. Unknown counts are stored as NaN.
+    """
+    def __init__(self, capacity=1024):
+        self.size = 0 # Number of rows in use
+        self.row_by_id = {} # book ID -> row
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.track_chapters = np.zeros(capacity, dtype=bool)
+        self.current_pages = np.zeros(capacity)
+        self.total_pages = np.zeros(capacity)
+        self.current_chapters = np.zeros(capacity)
+        self.total_chapters = np.zeros(capacity)
+        self.author_codes = np.zeros(capacity, dtype=np.int32)
+        self.author_names = [] # author code -> name
+        self.author_code_by_name = {}
+
+    def __len__(self):
+        return self.size
+
+    def add(self, book):
+        """
+        Adds a book, or updates its row if it is already included.
+        """
+        row = self.row_by_id.get(book.id)
+        if row is None:
+            self._grow(self.size + 1)
+            row = self.size
+            self.size += 1
+            self.row_by_id[book.id] = row
+            self.ids[row] = book.id
+        self.track_chapters[row] = book.track_chapters
+        self.current_pages[row] = _number(book.current_progress)
+        self.total_pages[row] = _number(book.total_pages)
+        self.current_chapters[row] = _number(book.current_chapter)
+        self.total_chapters[row] = _number(book.total_chapters)
+        self.author_codes[row] = self._author_code(book.author)
+
+    def add_many(self, books):
+        """
+        Adds several books. New books are written to the columns in one vectorized step.
+        """
+        new_books = []
+        for book in books:
+            if book.id in self.row_by_id:
+                self.add(book)
+            else:
+                new_books.append(book)
+        if not new_books:
+            return
+        start = self.size
+        end = start + len(new_books)
+        self._grow(end)
+        for row, book in enumerate(new_books, start):
+            self.row_by_id[book.id] = row
+        self.ids[start:end] = [book.id for book in new_books]
+        self.track_chapters[start:end] = [book.track_chapters for book in new_books]
+        self.current_pages[start:end] = [_number(book.current_progress) for book in new_books]
+        self.total_pages[start:end] = [_number(book.total_pages) for book in new_books]
+        self.current_chapters[start:end] = [_number(book.current_chapter) for book in new_books]
+        self.total_chapters[start:end] = [_number(book.total_chapters) for book in new_books]
+        self.author_codes[start:end] = [self._author_code(book.author) for book in new_books]
+        self.size = end
+
+    def remove(self, book_id):
+        """
+        Removes a book. The last row is moved into its place. Unknown IDs are ignored.
+        """
+        row = self.row_by_id.pop(book_id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            for column in self._columns():
+                column[row] = column[last]
+            self.row_by_id[int(self.ids[row])] = row
+        self.size = last
+
+    def snapshot(self):
+        """
+        Copies the rows in use, so the statistics can be computed on another thread while books keep changing.
+        Returns:
+            LibraryStatsSnapshot: The copied columns.
+        """
+        n = self.size
+        return LibraryStatsSnapshot(
+            self.track_chapters[:n].copy(), self.current_pages[:n].copy(), self.total_pages[:n].copy(),
+            self.current_chapters[:n].copy(), self.total_chapters[:n].copy(), self.author_codes[:n].copy(),
+            list(self.author_names))
+
+    def _author_code(self, author):
+        code = self.author_code_by_name.get(author)
+        if code is None:
+            code = len(self.author_names)
+            self.author_code_by_name[author] = code
+            self.author_names.append(author)
+        return code
+
+    def _columns(self):
+        return (self.ids, self.track_chapters, self.current_pages, self.total_pages,
+            self.current_chapters, self.total_chapters, self.author_codes)
+
+    def _grow(self, needed):
+        """
+        Doubles the capacity of the columns until 'needed' rows fit.
+        """
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.ids, self.track_chapters, self.current_pages, self.total_pages, \
+            self.current_chapters, self.total_chapters, self.author_codes = [
+                np.resize(column, capacity) for column in self._columns()]
+
+
+class LibraryStatsSnapshot:
+    """
+    A copy of the statistics columns at one point in time, see LibraryStats.snapshot.
+    """
+    def __init__(self, track_chapters, current_pages, total_pages, current_chapters, total_chapters, author_codes, author_names):
+        self.track_chapters = track_chapters
+        self.current_pages = current_pages
+        self.total_pages = total_pages
+        self.current_chapters = current_chapters
+        self.total_chapters = total_chapters
+        self.author_codes = author_codes
+        self.author_names = author_names
+
+    def summary(self, top_authors=10):
+        """
+        Computes the statistics shown in the statistics panel.
+        Progress is measured in the unit each book is tracked by, the same way as the progress shown on its card.
+        Args:
+            top_authors (int): Number of authors to include, those with the most books first.
+        Returns:
+            dict: With the keys
+                'books': number of books,
+                'pages_read', 'total_pages': pages over the books tracked by pages,
+                'chapters_read', 'total_chapters': chapters over the books tracked by chapters,
+                'not_started', 'in_progress', 'finished': number of books in each state,
+                'histogram': number of books in each 10% completion bin, for books with a known total,
+                'authors': list of (author, number of books, average completion in percent) for books with a known total.
+        """
+        by_pages = ~self.track_chapters
+        by_chapters = self.track_chapters
+        # Progress in the tracked unit of each book
+        current = np.where(by_chapters, self.current_chapters, self.current_pages)
+        total = np.where(by_chapters, self.total_chapters, self.total_pages)
+        current = np.nan_to_num(current) # Unknown progress counts as not started, like on the cards
+        known_total = total > 0 # False for NaN and zero
+
+        percentage = np.zeros_like(total)
+        np.divide(current, total, out=percentage, where=known_total)
+        percentage = np.clip(percentage * 100, 0, 100)
+
+        finished = known_total & (current >= total)
+        not_started = current <= 0
+        in_progress = ~finished & ~not_started
+
+        histogram, _ = np.histogram(percentage[known_total], bins=HISTOGRAM_BINS)
+
+        # Average completion per author with bincount: sum of percentages / number of books, per author code
+        codes = self.author_codes[known_total]
+        book_counts = np.bincount(codes, minlength=len(self.author_names))
+        percentage_sums = np.bincount(codes, weights=percentage[known_total], minlength=len(self.author_names))
+        authors = []
+        if codes.size:
+            top = np.argsort(-book_counts, kind='stable')[:top_authors]
+            for code in top:
+                if book_counts[code] == 0:
+                    break
+                authors.append((self.author_names[code], int(book_counts[code]), float(percentage_sums[code] / book_counts[code])))
+
+        return {
+            'books': int(current.size),
+            'pages_read': int(np.nansum(self.current_pages[by_pages])),
+            'total_pages': int(np.nansum(self.total_pages[by_pages])),
+            'chapters_read': int(np.nansum(self.current_chapters[by_chapters])),
+            'total_chapters': int(np.nansum(self.total_chapters[by_chapters])),
+            'not_started': int(np.count_nonzero(not_started)),
+            'in_progress': int(np.count_nonzero(in_progress)),
+            'finished': int(np.count_nonzero(finished)),
+            'histogram': histogram.tolist(),
+            'authors': authors,
+        }
+
+
+def _number(value):
+    """
+    Converts a count that may be None to a float, with None as NaN.
+    """
+    return np.nan if value is None else float(value)
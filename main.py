@@ -1,13 +1,51 @@
+import time
+# When the program started, the start of the 'import' phase of the startup timing report
+STARTUP_TIME = time.perf_counter()
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk, ImageDraw, ImageFont
 import os
 import json
-import requests
 import threading
+import queue
+from concurrent.futures import wait
+from book_list import BookCard, VirtualBookList, CanvasBookList
+from thumbnail_cache import ThumbnailCache
+from image_cache import PhotoImageCache
+from image_loader import AsyncImageLoader
+from save_queue import BackgroundSaver
+from models import Book
+from library import (Library, BookValidationError, parse_book, lookup_isbns, describe_lookup_error, open_default_store,
+    create_metadata_client, open_default_isbn_index, open_reading_history, IMPORT_WORKERS, IMPORT_REQUESTS_PER_SECOND)
+from isbn import read_isbn_file
+from search_index import SearchIndex
+from sort_index import BookSorter, SORT_MODES
+from tracing import tracer, traced, TRACE_PATH
+from stall_monitor import StallMonitor, format_stack
+from themes import load_theme_files, THEMES_DIR
+
+# Number of books loaded before the window is shown when the store supports lazy loading
+FIRST_SCREEN_BOOKS = 20
+# Milliseconds to wait after the last keystroke in the search box before filtering the list
+SEARCH_DELAY_MS = 150
+# Milliseconds to wait after a change before recomputing the statistics panel
+STATS_DELAY_MS = 200
+# Days of reading history used to calculate reading pace
+PACE_WINDOW_DAYS = 14
+# Milliseconds to wait after the last resize of the book list before laying out the cards again
+RESIZE_DELAY_MS = 50
+# Prebuilt 'No Image' placeholder, drawn with Pillow and saved here if it is missing
+NO_IMAGE_PATH = './assets/no_image.png'
+NO_IMAGE_SIZE = (100, 150)
+# The main thread counts as stalled when the event loop is blocked for longer than this many milliseconds
+STALL_THRESHOLD_MS = 200
+# Number of stalls listed in the diagnostics window
+DIAGNOSTICS_STALLS = 20
 
 class BookTrackerApp:
     def __init__(self, root):
+        # (phase, seconds) for the startup timing report, printed once the window has been drawn
+        self.startup_phases = [('import', time.perf_counter() - STARTUP_TIME)]
+        self.startup_start = time.perf_counter()
         self.root = root
         # set window title
         self.root.title('BookmarkPy')
@@ -19,12 +57,70 @@ class BookTrackerApp:
         self.current_theme = 'light'
         self._define_themes()
 
-        # data files
-        self.data_file = 'books.json'
-        self.books = []
+        # book list display mode: virtual only builds cards for visible rows, classic builds a card for every book
+        # classic is chosen by setting BOOKMARKPY_LIST to 'classic', e.g. for comparing the two
+        self.virtual_list = os.environ.get('BOOKMARKPY_LIST') != 'classic'
+        # in virtual list mode, cards are drawn as canvas items instead of widgets when BOOKMARKPY_CARDS is 'canvas'
+        self.canvas_cards = self.virtual_list and os.environ.get('BOOKMARKPY_CARDS') == 'canvas'
+        self.resize_after_id = None # pending batched resize of the book list
+        self.canvas_size = None # latest (width, height) of the book list canvas
+
+        # the collection and its data files, stored as 'json' (books.json), 'journal' (books.json plus a change journal),
+        # 'sqlite' (books.db) or 'indexed' (books.bmk), set by the BOOKMARKPY_STORAGE environment variable
+        # the same core is used by the command line (cli.py), the app adds the display and background saving
+        self.library = Library(open_default_store())
+        self.store = self.library.store
+        self.data_file = self.store.path
+        # writes changes on a background thread, coalescing bursts of changes into one write
+        self.saver = BackgroundSaver(self.store, delay=0.5)
+        # stores that support lazy loading only load the first screenful of books at startup,
+        # the rest are streamed in the background after the window is shown
+        self.books_to_stream = 0
+        self.save_after_load = False # a save was requested while books were still streaming in
+        self.partial_load = False # not every book could be loaded, so saving would lose books
+        # list order, one of SORT_MODES, saved with the theme
+        self.sort_mode = 'added'
+        self.sort_descending = False
 
         # load existing books
-        self._load_data() # attempt to load books on startup
+        self._time_startup_phase('_load_data', self._load_data) # attempt to load books on startup, books from older files are given a stable ID
+
+        # word index over titles and authors for the search box, and sorted indexes for each sort mode,
+        # updated as books are added, edited and deleted
+        self.search_index = SearchIndex()
+        self.book_sorter = BookSorter()
+        # columnar progress data for the statistics panel, updated the same way once the panel has been opened
+        # NumPy is only loaded then
+        self.library_stats = None
+        self.stats_window = None
+        self.diagnostics_window = None # stalls of the main thread, see _open_diagnostics_window
+        self.stats_after_id = None # pending debounced statistics refresh
+        self.stats_generation = 0 # incremented for each refresh, so results of older ones are ignored
+        self._index_books(self.books)
+        self.search_matches = None # IDs of the books matching the search box, None when not searching
+        self.search_after_id = None # pending debounced search
+
+        # every progress change, for reading pace and finish estimates
+        self.reading_history = open_reading_history()
+
+        # book cards in classic mode, keyed by book ID
+        self.book_cards = {}
+
+        # disk cache of ready-to-display cover thumbnails
+        self.thumbnail_cache = ThumbnailCache('thumbnail_cache', size=(100, 150))
+        # in-memory cache of decoded cover images shared across refreshes, limited to 32 MB
+        self.image_cache = PhotoImageCache(max_bytes=32 * 1024 * 1024)
+        # decodes covers on background threads, cards show the placeholder until their cover is ready
+        self.image_loader = AsyncImageLoader(self.root, self.thumbnail_cache, self.image_cache)
+
+        # Open Library client for ISBN lookups, the server can be changed with BOOKMARKPY_OPENLIBRARY_URL (e.g. a local test server)
+        # Responses are cached in openlibrary_cache.db, so repeat lookups and shared authors don't need the network
+        # Requests are rate limited so bulk imports don't flood the server
+        # Created by _get_metadata_client on the first lookup, so the requests package isn't loaded at startup
+        self.metadata_client = None
+        # Optional offline ISBN index built from the Open Library data dumps (see isbn_index.py), set by BOOKMARKPY_ISBN_INDEX
+        # ISBNs found in it are resolved locally, the rest are looked up online
+        self.isbn_index = open_default_isbn_index()
 
         # load icon Windows
         try:
@@ -38,64 +134,264 @@ class BookTrackerApp:
         except tk.TclError:
             print("Linux icon file not found")
 
-        self._load_default_images() # pre-load book image placeholder
-        self._create_widgets() # build main app UI
-        self._apply_theme() # apply initial theme and refresh the book list display
+        self._time_startup_phase('_load_default_images', self._load_default_images) # pre-load book image placeholder
+        self._time_startup_phase('_create_widgets', self._create_widgets) # build main app UI
+        self._time_startup_phase('_apply_theme', self._apply_theme) # apply initial theme
+        self._time_startup_phase('_refresh_book_display', self._refresh_book_display) # show the first screen of books
+        self._start_background_load() # stream in the rest of the books, if not all are loaded yet
 
         # bind window close function to save function
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+        # idle callbacks run after the pending redraws, so this runs once the window has been drawn
+        self.root.after_idle(self._report_startup_time)
+        # watches for freezes of the event loop and samples what the main thread was doing, see the Diagnostics window
+        self.stall_monitor = StallMonitor(self.root, threshold=STALL_THRESHOLD_MS)
+        self.stall_monitor.start()
+
+    def _time_startup_phase(self, phase, function):
+        """
+        Runs a startup step and adds its duration to the startup timing report.
+        """
+        start = time.perf_counter()
+        function()
+        self.startup_phases.append((phase, time.perf_counter() - start))
+
+    def _report_startup_time(self):
+        """
+        Prints how long it took to show the window, broken down into the startup phases.
+        Time not spent in a timed phase (opening caches, icons, indexes, the first paint) is reported as 'other'.
+        """
+        startup_end = time.perf_counter()
+        timed = sum(seconds for phase, seconds in self.startup_phases[1:])
+        self.startup_phases.append(('other', startup_end - self.startup_start - timed))
+        total = startup_end - STARTUP_TIME
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.startup_phases)
+        print(f"Window shown {total * 1000:.0f} ms after start: {phases}")
+
+    @property
+    def books(self):
+        """
+        The books in the collection, in the order they were added. The list is changed in place, never replaced.
+        """
+        return self.library.books
 
     def _on_closing(self):
         """
         Handles window closing.
         Saves current book data to file before destroying the window.
         """
-        self._save_data()
+        self.stall_monitor.stop() # Saving and closing may block, which isn't worth reporting
+        self._finish_background_load() # Make sure the whole collection is saved
+        # With per-record writes the books are already saved as they change, only the settings are left
+        self._save_settings()
+        self.saver.close() # Wait for pending changes to be written
+        self.store.close()
+        self.image_loader.shutdown()
+        if self.metadata_client:
+            self.metadata_client.close()
+        if self.isbn_index:
+            self.isbn_index.close()
+        if self.reading_history:
+            self.reading_history.close()
+        if TRACE_PATH:
+            count = tracer.export(TRACE_PATH)
+            print(f"Wrote {count} trace spans to {TRACE_PATH}")
+        stats = self.image_cache.stats()
+        print(f"Image cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), "
+            f"{stats['evictions']} evictions, {stats['bytes'] / 1024:.0f} KB in {stats['entries']} images")
         self.root.destroy() # Close Tkinter application properly
 
+    @traced(category='io')
     def _load_data(self):
         """
-        Loads book data and theme selection from the JSON file.
+        Loads book data and theme selection from the data file.
         If the file doesn't exist or is invalid, an empty list is initialized.
         """
-        if os.path.exists(self.data_file):
+        if self.store.exists():
             try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.books = data.get('books', [])
-                    self.current_theme = data.get('theme', 'light')
+                # Stores that support lazy loading only read as many books as fit on the first screen
+                self.books_to_stream = self.library.load(FIRST_SCREEN_BOOKS)
+                settings = self.library.settings
+                self.current_theme = settings.get('theme', 'light')
+                if self.current_theme not in self.themes: # e.g. a user-defined theme whose file was removed
+                    self.current_theme = 'light'
+                self.sort_mode = settings.get('sort_mode', 'added')
+                if self.sort_mode not in SORT_MODES:
+                    self.sort_mode = 'added'
+                self.sort_descending = bool(settings.get('sort_descending', False))
                 print(f"Loaded {len(self.books)} books and theme '{self.current_theme}' from {self.data_file}")
             except json.JSONDecodeError as e:
                 print(f"Error decoding JSON from {self.data_file}: {e}. Starting with empty book list and default theme.")
-                self.books = [] # Reset if file is corrupted
+                self.books.clear() # Reset if file is corrupted
                 self.current_theme = 'light'
             except Exception as e:
                 print(f"An unexpected error occurred while loading books: {e}. Starting with empty book list and default theme.")
-                self.books = []
+                self.books.clear()
                 self.current_theme = 'light'
         else:
             print(f"no data file found at {self.data_file}. Starting with an empty book list and default theme.")
-            self.books = [] # Initialize empty list if file doesn't exist
+            # The list starts empty if the file doesn't exist
             self.current_theme = 'light'
 
+    @traced(category='io')
     def _save_data(self):
         """
-        Saves current book data and theme selection to the JSON file.
+        Queues a save of the current book data and theme selection to the data file.
+        The file is written on a background thread, call self.saver.flush() to wait for it.
+        While books are still streaming in, the save is held back until they have all loaded.
+        """
+        if self.books_to_stream:
+            self.save_after_load = True
+            return
+        if self.partial_load:
+            print(f"Not saving to {self.data_file} because not all books could be loaded")
+            return
+        self.saver.save_all(self.books, self._settings())
+
+    def _settings(self):
+        """
+        Returns the settings saved alongside the books.
+        """
+        return {'theme': self.current_theme, 'sort_mode': self.sort_mode, 'sort_descending': self.sort_descending,
+            'next_book_id': self.library.next_book_id}
+
+    def _save_book_record(self, book):
+        """
+        Queues a save of a single added or edited book.
+        Storage backends without per-record writes save the whole collection instead.
+        Args:
+            book (Book): The book that changed.
+        """
+        if not self.store.supports_record_writes:
+            self._save_data()
+            return
+        self.saver.upsert_book(book)
+
+    def _delete_book_record(self, book_id):
+        """
+        Queues the removal of a single deleted book from storage.
+        Storage backends without per-record writes save the whole collection instead.
+        Args:
+            book_id (int): The ID of the deleted book.
+        """
+        if not self.store.supports_record_writes:
+            self._save_data()
+            return
+        self.saver.delete_book(book_id)
+        # The deleted book's ID mustn't be given to a new book after a restart, see Library
+        self._save_settings()
+
+    def _save_settings(self):
+        """
+        Queues a save of the settings, e.g. after the theme or sort order changed.
+        Storage backends without per-record writes save the whole collection instead.
+        """
+        if not self.store.supports_record_writes:
+            self._save_data()
+            return
+        self.saver.save_settings(self._settings())
+
+    def _start_background_load(self):
+        """
+        Starts streaming the books that weren't loaded at startup on a background thread,
+        and shows a progress bar until they have all been added to the list.
+        """
+        if not self.books_to_stream:
+            return
+        self.loaded_count = len(self.books) # Streamed books go after the ones loaded so far
+        self.load_queue = queue.Queue()
+        self.load_thread = threading.Thread(target=self._background_load_thread, args=(self.loaded_count,), daemon=True)
+        self.load_thread.start()
+
+        # Progress indicator at the bottom of the button column
+        self.load_progress_label = ttk.Label(self.button_frame, text="Loading books...", font=('Arial', 9, 'italic'))
+        self.load_progress_label.pack(side='bottom', pady=(0, 10), padx=5)
+        self.load_progress = ttk.Progressbar(self.button_frame, mode='determinate', maximum=self.loaded_count + self.books_to_stream, value=self.loaded_count)
+        self.load_progress.pack(side='bottom', pady=5, padx=5, fill='x')
+        self.root.after(50, self._poll_background_load)
+
+    def _background_load_thread(self, start):
+        """
+        Reads the remaining books in chunks and queues them for the main thread.
+        A None entry marks the end of the stream.
         """
         try:
-            data_to_save = {
-                'books': self.books,
-                'theme': self.current_theme
-            }
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, indent=4)
-            print(f"Saved {len(self.books)} books and theme '{self.current_theme}' to {self.data_file}")
+            for chunk in self.store.iter_chunks(start):
+                self.load_queue.put(chunk)
         except Exception as e:
-                print(f"Error saving books to {self.data_file}: {e}")
+            print(f"Error loading books from {self.data_file}: {e}")
+            self.load_queue.put(e)
+        self.load_queue.put(None)
+
+    def _poll_background_load(self):
+        """
+        Adds the chunks of books read so far to the list and updates the progress bar.
+        Reschedules itself until all books are loaded.
+        """
+        if self._drain_load_queue():
+            self.root.after(50, self._poll_background_load)
+
+    def _drain_load_queue(self, block=False):
+        """
+        Adds queued chunks of streamed books to 'self.books' and the display.
+        Args:
+            block (bool): True to wait for the loading thread until every book has arrived.
+        Returns:
+            bool: True if more books are still to come.
+        """
+        while True:
+            try:
+                chunk = self.load_queue.get(block=block)
+            except queue.Empty:
+                return True
+            if chunk is None:
+                self._end_background_load()
+                return False
+            if isinstance(chunk, Exception):
+                # Not every book could be read. Don't let a save overwrite the file with a partial collection.
+                messagebox.showerror("Load Error", f"Not all books could be loaded from {self.data_file}:\n{chunk}\nChanges won't be saved.")
+                self.partial_load = True
+                continue
+            # Insert before any books that were added while loading, keeping the saved order
+            self.books[self.loaded_count:self.loaded_count] = chunk
+            self._index_books(chunk)
+            self._insert_book_cards(self.loaded_count, len(chunk))
+            self.loaded_count += len(chunk)
+            self.load_progress.config(value=self.loaded_count)
+
+    def _end_background_load(self):
+        """
+        Removes the progress indicator and runs any save that was held back while loading.
+        """
+        self.books_to_stream = 0
+        self.load_progress.destroy()
+        self.load_progress_label.destroy()
+        print(f"Loaded all {len(self.books)} books from {self.data_file}")
+        if self.save_after_load:
+            self.save_after_load = False
+            self._save_data()
+
+    def _finish_background_load(self):
+        """
+        Waits for books that are still streaming in, e.g. before the window closes.
+        """
+        if self.books_to_stream:
+            self._drain_load_queue(block=True)
+
+    def _find_book_index(self, book_id):
+        """
+        Finds the position of a book in the 'self.books' list.
+        Args:
+            book_id (int): The stable ID of the book.
+        Returns:
+            int or None: The index of the book, or None if no book has that ID.
+        """
+        return self.library.find_book_index(book_id)
 
     def _define_themes(self):
         """
-        Defines the color palettes for light and dark themes.
+        Defines the color palettes for the built-in light and dark themes, followed by any user-defined themes
+        from the JSON files in the 'themes' folder (see themes.py).
         """
         self.themes = {
             'light': {
@@ -125,17 +421,19 @@ class BookTrackerApp:
                 'dialog_frame_bg': '#2e2e2e'
             }
         }
+        self.themes.update(load_theme_files(THEMES_DIR, self.themes, self.root))
     
+    @traced(category='ui')
     def _apply_theme(self):
         """
         Applies the current theme to all relevant widgets.
+        Only the ttk styles and the colors of the few plain Tk widgets are changed, existing book cards and
+        their cover images are left as they are and pick up the new styles, so this takes the same time
+        however many books there are.
         """
         theme_colors = self.themes[self.current_theme]
         style = ttk.Style()
 
-        # 'clam' style allows button backgrounds to be colored fully.
-        style.theme_use('clam')
-
         # Root window background
         self.root.config(bg=theme_colors['root_bg'])
 
@@ -178,31 +476,49 @@ class BookTrackerApp:
             foreground=[('active', theme_colors['text_color'])])
 
         self.book_canvas.config(bg=theme_colors['canvas_bg'])
-        
-        # Re-apply theme to existing book entries
-        self._refresh_book_display()
-    
+        if self.canvas_cards:
+            self.book_list.set_colors(theme_colors) # Canvas items don't use the ttk styles
+
+        # Plain Tk widgets of open windows don't use the ttk styles
+        for window in (self.stats_window, self.diagnostics_window):
+            if window is not None:
+                window.config(bg=theme_colors['dialog_bg'])
+        if self.stats_window is not None:
+            self.stats_histogram.config(bg=theme_colors['canvas_bg'])
+            self._schedule_stats_refresh() # Redraws the histogram labels in the new text color
+        if self.diagnostics_window is not None:
+            self.stall_stacks_text.config(bg=theme_colors['entry_bg'], fg=theme_colors['entry_fg'])
+
     def _toggle_theme(self):
         """
-        Switches between light and dark themes.
+        Switches to the next theme: light, dark, then any user-defined themes, and back to light.
         """
-        if self.current_theme == 'light':
-            self.current_theme = 'dark'
-        else:
-            self.current_theme = 'light'
+        names = list(self.themes)
+        self.current_theme = names[(names.index(self.current_theme) + 1) % len(names)]
         self._apply_theme()
+        self._save_settings()
 
     def _load_default_images(self):
         """
         Loads a default placeholder image.
         When a book doesn't have a selected image, or its file can't be found, a placeholder will be displayed.
         """ 
+        if not os.path.exists(NO_IMAGE_PATH):
+            self._draw_placeholder_image()
         try:
-            """if os.path.exists('./assets/no_image.png'): # Attempt to load pre-existing 'no_image.png' from assets folder
-                img = Image.open('./assets/no_image.png')
-            else:"""
-            # Attempt to draw a 'No Image' placeholder image
-            img = Image.new('RGB', (100, 150), color = (200, 200, 200))
+            # Tk reads PNG files itself, so Pillow isn't needed for the placeholder
+            self.no_image_photo = tk.PhotoImage(file=NO_IMAGE_PATH) # Held here for the life of the app, not cached
+        except tk.TclError as e:
+            print(f"Error loading 'no image' placeholder: {e}")
+            self.no_image_photo = tk.PhotoImage(width=1, height=1)
+
+    def _draw_placeholder_image(self):
+        """
+        Draws the 'No Image' placeholder with Pillow and saves it to NO_IMAGE_PATH, for when the prebuilt asset is missing.
+        """
+        try:
+            from PIL import Image, ImageDraw, ImageFont
+            img = Image.new('RGB', NO_IMAGE_SIZE, color = (200, 200, 200))
             d = ImageDraw.Draw(img)
 
             font = None
@@ -228,12 +544,9 @@ class BookTrackerApp:
                 y = (100 - text_height) / 2
                 d.text((x, y), "No Image", fill=(50, 50, 50), font=font)
 
-            self.no_image_photo = ImageTk.PhotoImage(img) # Convert PIL Image to Tkinter Photoimage
+            img.save(NO_IMAGE_PATH)
         except Exception as e:
             print(f"Error creating 'no image' placeholder: {e}")
-            self.no_image_photo = tk.PhotoImage(width=1, height=1)
-
-
 
     
     def _create_widgets(self):
@@ -242,6 +555,9 @@ class BookTrackerApp:
         """
         # Configure a custom style for the book entry frames
         style = ttk.Style()
+        # 'clam' style allows button backgrounds to be colored fully.
+        # Set once here, switching the ttk theme restyles every widget, which theme changes don't need
+        style.theme_use('clam')
         # Define a generic style for frames configured by theme
         style.configure("Themed.TFrame", background=self.themes[self.current_theme]['root_bg'])
         # Style for frame inside canvas
@@ -265,170 +581,387 @@ class BookTrackerApp:
         add_isbn_btn = ttk.Button(self.button_frame, text="Add from ISBN", command=self._open_isbn_dialog, style="Themed.TButton")
         add_isbn_btn.pack(pady=5, padx=5, fill='x') # Pack below 'Add Book'
 
-        # Light/Dark mode toggle button
-        theme_toggle_btn = ttk.Button(self.button_frame, text="Light/Dark Mode", command=self._toggle_theme, style="Themed.TButton")
+        # Import a file of ISBNs, e.g. a barcode scanner dump
+        import_isbn_btn = ttk.Button(self.button_frame, text="Import ISBNs", command=self._open_bulk_import_dialog, style="Themed.TButton")
+        import_isbn_btn.pack(pady=5, padx=5, fill='x')
+
+        # Theme button, cycles through light, dark and user-defined themes
+        theme_toggle_btn = ttk.Button(self.button_frame, text="Change Theme", command=self._toggle_theme, style="Themed.TButton")
         theme_toggle_btn.pack(pady=5, padx=5, fill='x')
 
+        # Reading statistics panel
+        stats_btn = ttk.Button(self.button_frame, text="Statistics", command=self._open_stats_window, style="Themed.TButton")
+        stats_btn.pack(pady=5, padx=5, fill='x')
+
+        # Main-thread stalls recorded by the watchdog
+        diagnostics_btn = ttk.Button(self.button_frame, text="Diagnostics", command=self._open_diagnostics_window, style="Themed.TButton")
+        diagnostics_btn.pack(pady=5, padx=5, fill='x')
+
         # Right Column: Book List Container
         self.books_list_container = ttk.Frame(self.root, relief=tk.GROOVE, borderwidth=1, style="Themed.TFrame")
         self.books_list_container.grid(row=0, column=1, sticky='nsew', padx=5, pady=5) # 'nsew' fills all directions
-        self.books_list_container.grid_rowconfigure(0, weight=1) # Allow the canvas row to expand
+        self.books_list_container.grid_rowconfigure(1, weight=1) # Allow the canvas row to expand
         self.books_list_container.grid_columnconfigure(0, weight=1) # Allow the canvas column to expand
 
+        # Search box above the list, filters by title and author while typing
+        search_frame = ttk.Frame(self.books_list_container, style="Themed.TFrame")
+        search_frame.grid(row=0, column=0, columnspan=2, sticky='ew', padx=5, pady=5)
+        search_frame.grid_columnconfigure(1, weight=1) # Search entry expands horizontally
+        ttk.Label(search_frame, text="Search:", font=('Arial', 10)).grid(row=0, column=0, sticky='w', padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', self._on_search_changed)
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, font=('Arial', 10))
+        search_entry.grid(row=0, column=1, sticky='ew')
+        self.search_count_label = ttk.Label(search_frame, text="", font=('Arial', 9, 'italic'))
+        self.search_count_label.grid(row=0, column=2, sticky='e', padx=(5, 0))
+
+        # Sort order of the list
+        ttk.Label(search_frame, text="Sort:", font=('Arial', 10)).grid(row=0, column=3, sticky='w', padx=(10, 5))
+        self.sort_var = tk.StringVar(value=SORT_MODES[self.sort_mode])
+        sort_menu = ttk.Combobox(search_frame, textvariable=self.sort_var, values=list(SORT_MODES.values()),
+            state='readonly', width=16, font=('Arial', 10))
+        sort_menu.grid(row=0, column=4, sticky='e')
+        sort_menu.bind('<<ComboboxSelected>>', self._on_sort_changed)
+        self.sort_direction_btn = ttk.Button(search_frame, text=self._sort_direction_text(), width=5,
+            command=self._toggle_sort_direction, style="Themed.TButton")
+        self.sort_direction_btn.grid(row=0, column=5, sticky='e', padx=(5, 0))
+
         # Canvas for scrollable content
         self.book_canvas = tk.Canvas(self.books_list_container, bg=self.themes[self.current_theme]['canvas_bg'])
-        self.book_canvas.grid(row=0, column=0, sticky='nsew')
+        self.book_canvas.grid(row=1, column=0, sticky='nsew')
 
         # Vertical Scrollbar for the canvas
         self.book_scrollbar = ttk.Scrollbar(self.books_list_container, orient="vertical", command=self.book_canvas.yview)
-        self.book_scrollbar.grid(row=0, column=1, sticky='ns')
+        self.book_scrollbar.grid(row=1, column=1, sticky='ns')
         self.book_canvas.configure(yscrollcommand=self.book_scrollbar.set)
 
-        # Create a frame inside the canvas to hold all individual book entries
-        # The canvas will draw this frame as a scrollable window
-        self.book_list_frame = ttk.Frame(self.book_canvas, style="CanvasFrame.TFrame")
-        self.book_canvas.create_window((0,0), window=self.book_list_frame, anchor='nw') #anchor top left
+        if self.canvas_cards:
+            # Recycle a small pool of cards drawn as canvas items, with clicks hit-tested on the canvas
+            self.book_list = CanvasBookList(self.book_canvas, self.book_scrollbar, self._bind_book_card,
+                self.themes[self.current_theme], release_card=self.image_loader.cancel)
+        elif self.virtual_list:
+            # Recycle a small pool of book cards placed directly on the canvas
+            self.book_list = VirtualBookList(self.book_canvas, self.book_scrollbar, self._bind_book_card,
+                release_card=self.image_loader.cancel)
+        else:
+            # Create a frame inside the canvas to hold all individual book entries
+            # The canvas will draw this frame as a scrollable window
+            self.book_list_frame = ttk.Frame(self.book_canvas, style="CanvasFrame.TFrame")
+            self.book_canvas.create_window((0,0), window=self.book_list_frame, anchor='nw') #anchor top left
 
-        # Bind events to update the canvas scroll region and the inner frame's width, ensuring proper scrolling and that entries fill width
-        self.book_list_frame.bind("<Configure>", lambda e: self.book_canvas.configure(scrollregion=self.book_canvas.bbox("all"))) # lamda used to wrap function with arguments
+            # Bind events to update the canvas scroll region and the inner frame's width, ensuring proper scrolling and that entries fill width
+            self.book_list_frame.bind("<Configure>", lambda e: self.book_canvas.configure(scrollregion=self.book_canvas.bbox("all"))) # lamda used to wrap function with arguments
         self.book_canvas.bind("<Configure>", self._on_canvas_configure)
 
     def _on_canvas_configure(self, event):
         """
         Callback function executed when the main canvas has been resized.
+        Dragging the window edge sends a stream of resizes, so only the latest size is laid out,
+        once resizing pauses (see _resize_book_list).
+        """
+        first_resize = self.canvas_size is None
+        self.canvas_size = (event.width, event.height)
+        if self.resize_after_id is not None:
+            self.root.after_cancel(self.resize_after_id)
+            self.resize_after_id = None
+        if first_resize:
+            self._resize_book_list() # Shown right away when the window first appears
+        else:
+            self.resize_after_id = self.root.after(RESIZE_DELAY_MS, self._resize_book_list)
+
+    def _resize_book_list(self):
+        """
+        Lays out the book list for the latest canvas size.
         This updates the width of the inner book list frame to match the canvas width,
         ensuring that book entries expand correctly and horizontal scrollbars are not needed.
+        In virtual list mode the card pool is resized to the new canvas size instead.
         """
-        canvas_width = event.width
+        self.resize_after_id = None
+        width, height = self.canvas_size
+        if self.virtual_list:
+            self.book_list.resize(width, height)
+            return
         # Get the ID of the window item embedded within the canvas (book_list_frame)
         canvas_window_id = self.book_canvas.find_all()[-1]
-        self.book_canvas.itemconfig(canvas_window_id, width=canvas_width)
+        self.book_canvas.itemconfig(canvas_window_id, width=width)
+
+    def _on_search_changed(self, *args):
+        """
+        Called on every change to the search box. Filters the list once typing pauses.
+        """
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DELAY_MS, self._apply_search)
+
+    def _apply_search(self):
+        """
+        Looks up the books matching the search box and shows only those.
+        """
+        self.search_after_id = None
+        self.search_matches = self.search_index.search(self.search_var.get())
+        if self.search_matches is None:
+            self.search_count_label.config(text="")
+        else:
+            self.search_count_label.config(text=f"{len(self.search_matches)} of {len(self.books)} books")
+        self._refresh_book_display()
+
+    def _visible_books(self):
+        """
+        Returns the books to display in the chosen sort order: all of them, or only the ones matching the search box.
+        """
+        if self.sort_mode == 'added':
+            books = self.books[::-1] if self.sort_descending else self.books
+        else:
+            # Read from an index that is kept sorted, no sorting needed here
+            books = self.book_sorter.sorted_books(self.sort_mode, self.sort_descending)
+        if self.search_matches is None:
+            return books
+        matches = self.search_matches
+        return [book for book in books if book.id in matches]
+
+    def _is_list_in_book_order(self):
+        """
+        Returns True if every book is displayed, in the order of 'self.books', so list rows match book indexes.
+        """
+        return self.search_matches is None and self.sort_mode == 'added' and not self.sort_descending
+
+    def _on_sort_changed(self, event=None):
+        """
+        Called when a sort mode is chosen from the sort menu.
+        """
+        labels = list(SORT_MODES.values())
+        mode = list(SORT_MODES)[labels.index(self.sort_var.get())]
+        if mode == self.sort_mode:
+            return
+        self.sort_mode = mode
+        if mode == 'updated':
+            # Recently updated books are the ones worth seeing first
+            self.sort_descending = True
+            self.sort_direction_btn.config(text=self._sort_direction_text())
+        self._refresh_book_display()
+        self._save_settings()
+
+    def _toggle_sort_direction(self):
+        """
+        Switches between ascending and descending order.
+        """
+        self.sort_descending = not self.sort_descending
+        self.sort_direction_btn.config(text=self._sort_direction_text())
+        self._refresh_book_display()
+        self._save_settings()
+
+    def _sort_direction_text(self):
+        return "Desc" if self.sort_descending else "Asc"
+
+    def _index_books(self, books):
+        """
+        Adds new books to the search, sort and statistics indexes, or updates edited ones.
+        """
+        self.search_index.add_many(books)
+        self.book_sorter.add_many(books)
+        if self.library_stats is not None:
+            self.library_stats.add_many(books)
+        self._schedule_stats_refresh()
 
+    def _unindex_book(self, book_id):
+        """
+        Removes a deleted book from the search, sort and statistics indexes.
+        """
+        self.search_index.remove(book_id)
+        self.book_sorter.remove(book_id)
+        if self.library_stats is not None:
+            self.library_stats.remove(book_id)
+        self._schedule_stats_refresh()
+
+    @traced(category='ui')
     def _refresh_book_display(self):
         """
         Clears all existing book entry widgets from the display and redraws them based on
         the current state of the 'self.books' list.
         Called after adding, editing, or deleting a book.
+        In virtual list mode only the cards for the visible rows are re-bound.
+        While searching, only the matching books are shown.
         """
+        visible_books = self._visible_books()
+        if self.virtual_list:
+            self.book_list.set_items(visible_books)
+            return
 
         # Destroy all existing widfets within the book_list_frame
+        self.image_loader.cancel_all() # Cancel cover loading for cards that are about to be destroyed
         for widget in self.book_list_frame.winfo_children():
             widget.destroy()
+        self.book_cards = {}
         
-        # Iterate through 'self.books' list and display each book
-        for i, book in enumerate(self.books):
+        # Iterate through the displayed books and display each book
+        for i, book in enumerate(visible_books):
             self._display_book_entry(book, i)
         
         # After rendering widgets, update the canvas scroll reguib to ensure the scrollbar reflects the total height of the content.
-        self.root.update_idletasks() # Ensures geometry calculations are complete before getting bbox.
-        self.book_canvas.config(scrollregion=self.book_canvas.bbox("all"))
+        self._update_classic_scrollregion()
 
+    @traced(category='ui')
     def _display_book_entry(self, book, index):
         """
         Creates and displays a single book entry row within the book list.
         Args:
-            book (dict): A dictionary containing the book's data (title, author, progress, etc.)
-            index (int): The index of the book in the 'self.books' list, identifying which book to edit/delete when requested
+            book (Book): The book's data (title, author, progress, etc.)
+            index (int): The index of the book in the 'self.books' list, used as its grid row
         """
-        book_frame = ttk.Frame(self.book_list_frame, style="BookCard.TFrame") # Use the custom style
-        book_frame.grid(row=index, column=0, sticky='ew', padx=5, pady=5)
+        card = BookCard(self.book_list_frame)
+        card.frame.grid(row=index, column=0, sticky='ew', padx=5, pady=5)
         self.book_list_frame.grid_columnconfigure(0, weight=1) # Expands column with book_frame
+        self.book_cards[book.id] = card
+        self._bind_book_card(card, book, index)
 
-        # Configure columns in the individual book_frame
-        book_frame.grid_columnconfigure(0, weight=0) # Image column
-        book_frame.grid_columnconfigure(1, weight=1) # Details column (expands)
-        book_frame.grid_columnconfigure(0, weight=2) # Buttons column
+    def _add_book_card(self, index):
+        """
+        Shows a newly added book without rebuilding the rest of the list.
+        Args:
+            index (int): The index of the new book in the 'self.books' list.
+        """
+        if not self._is_list_in_book_order():
+            self._apply_search() # Rows don't line up with 'self.books' while searching or sorting
+            return
+        book = self.books[index]
+        if self.virtual_list:
+            self.book_list.insert(index, book)
+            return
+        self._display_book_entry(book, index)
+        self._update_classic_scrollregion()
 
-        # Book image display
-        image_label = ttk.Label(book_frame)
-        image_label.grid(row=0, column=0, rowspan=3, padx=10, pady=5, sticky='n') # Spans 3 rows, alligning to the top
+    def _insert_book_cards(self, index, count):
+        """
+        Shows a run of books inserted into the 'self.books' list, e.g. streamed in at startup.
+        Args:
+            index (int): The index of the first inserted book.
+            count (int): The number of inserted books.
+        """
+        if not self._is_list_in_book_order():
+            self._apply_search()
+            return
+        if self.virtual_list:
+            self.book_list.insert_many(index, self.books[index:index + count])
+            return
+        for row in range(index, index + count):
+            self._display_book_entry(self.books[row], row)
+        # Books after the inserted ones have moved down
+        for row in range(index + count, len(self.books)):
+            self.book_cards[self.books[row].id].frame.grid(row=row)
+        self._update_classic_scrollregion()
+
+    def _update_book_card(self, index):
+        """
+        Patches the card of an edited book in place.
+        Args:
+            index (int): The index of the edited book in the 'self.books' list.
+        """
+        if not self._is_list_in_book_order():
+            self._apply_search() # The edited book may no longer match, or may have moved
+            return
+        book = self.books[index]
+        if self.virtual_list:
+            self.book_list.update(index, book)
+            return
+        self._bind_book_card(self.book_cards[book.id], book, index)
+
+    def _remove_book_card(self, book_id, index):
+        """
+        Removes the card of a deleted book and shifts the cards below it up one row.
+        Args:
+            book_id (int): The ID of the deleted book.
+            index (int): The index the book had in the 'self.books' list before it was deleted.
+        """
+        if not self._is_list_in_book_order():
+            self._apply_search()
+            return
+        if self.virtual_list:
+            self.book_list.remove(index)
+            return
+        card = self.book_cards.pop(book_id, None)
+        if card:
+            self.image_loader.cancel(card)
+            card.frame.destroy()
+        # Books after the deleted one have moved up one position in 'self.books'
+        for row in range(index, len(self.books)):
+            self.book_cards[self.books[row].id].frame.grid(row=row)
+        self._update_classic_scrollregion()
+
+    def _update_classic_scrollregion(self):
+        """
+        Updates the canvas scroll region to the height of the classic mode book list frame.
+        """
+        self.root.update_idletasks() # Ensures geometry calculations are complete before getting bbox.
+        self.book_canvas.config(scrollregion=self.book_canvas.bbox("all"))
 
-        # Load and display images
-        image_path = book.get('image_path', '')
+    @traced(category='ui')
+    def _bind_book_card(self, card, book, index):
+        """
+        Fills a book card with the details and cover image of a book.
+        Used for new cards in classic mode and for recycled cards in virtual list mode.
+        Args:
+            card (BookCard): The card to fill.
+            book (Book): The book's data (title, author, progress, etc.)
+            index (int): The index of the book in the 'self.books' list
+        """
+        # Callbacks capture the stable book ID, not the index, so they stay correct when rows shift
+        card.bind(
+            book.title, book.author,
+            self._get_progress_string(book), # Get formatted progress string
+            self._load_book_photo(book, card),
+            on_edit=lambda book_id=book.id: self._open_edit_book_dialog(book_id),
+            on_delete=lambda book_id=book.id: self._confirm_delete_book(book_id),
+            fraction=book.fraction # Drawn as a progress bar by canvas cards
+        )
+
+    @traced(category='image')
+    def _load_book_photo(self, book, card):
+        """
+        Gets the cover image of a book, resized to fit within 100x150.
+        Covers that have already been decoded are returned right away. Otherwise the cover is decoded
+        in the background and shown on the card when ready, and the placeholder is returned in the meantime.
+        Args:
+            book (Book): The book's data.
+            card (BookCard): The card the cover is for.
+        Returns:
+            PhotoImage: The cover image, or the 'No Image' placeholder if it isn't loaded (yet).
+        """
+        self.image_loader.cancel(card) # The card may still be waiting for the cover of a previous book
+        image_path = book.image_path
         if image_path and os.path.exists(image_path):
             try:
-                img = Image.open(image_path)
-                # Thumbnail resizes image proportionally to fit within 100x150
-                img.thumbnail((100, 150), Image.LANCZOS) # LANCZOS image rescale
-                photo = ImageTk.PhotoImage(img)
-                image_label.config(image=photo)
-                image_label.image = photo # reference to prevent memory from freeing up
-            except Exception as e:
+                # Reuse the decoded image unless the file has changed since it was cached
+                cache_key = (image_path, (100, 150), os.stat(image_path).st_mtime_ns)
+            except OSError as e:
                 print(f"Error loading image {image_path}: {e}")
-                # Fallback to "No Image" if there is an error loading the image at the given path
-                image_label.config(image=self.no_image_photo)
-                image_label.image = self.no_image_photo
-        else:
-            # Display the placeholder image if no path or file doesn't exist
-            image_label.config(image=self.no_image_photo)
-            image_label.image = self.no_image_photo
-
-        # Book details (Title, Author, Progress)
-        title_label = ttk.Label(book_frame, text=f"Title: {book['title']}", font=('Arial', 12, 'bold'), style="BookCard.TLabel")
-        title_label.grid(row=0, column=1, sticky='w', pady=2)
-
-        author_label = ttk.Label(book_frame, text=f"Author: {book['author']}", font=('Arial', 10), style="BookCard.TLabel")
-        author_label.grid(row=1, column=1, sticky='w', pady=2)
-
-        progress_str = self._get_progress_string(book) # Get formatted progress string
-        progress_label = ttk.Label(book_frame, text=f"Progress: {progress_str}", font=('Arial', 10), style="BookCard.TLabel")
-        progress_label.grid(row=2, column=1, sticky='w', pady=2)
-
-        # Edit and delete buttons
-        button_container = ttk.Frame(book_frame, style="BookCard.TFrame")
-        button_container.grid(row=2, column=2, sticky='se', padx=5, pady=5) # Buttons aligned bottom right
-
-        edit_btn = ttk.Button(button_container, text="Edit", command=lambda b=book, i=index: self._open_edit_book_dialog(b, i), style="Themed.TButton")
-        edit_btn.pack(side='left', padx=2) # Buttons packed side by side
-
-        delete_btn = ttk.Button(button_container, text="Delete", command=lambda i=index: self._confirm_delete_book(i), style="Themed.TButton")
-        delete_btn.pack(side='left', padx=2)
+                return self.no_image_photo
+            photo = self.image_cache.get(cache_key)
+            if photo is not None:
+                return photo
+            # Cached thumbnail resized proportionally to fit within 100x150, decoded off the main thread
+            self.image_loader.load(card, cache_key, image_path, card.set_image)
+        # Display the placeholder image if no path, file doesn't exist or cover is still loading
+        return self.no_image_photo
 
     def _get_progress_string(self, book):
         """
-        Calculates and formats the progress string for a book.
+        Returns the formatted progress string for a book.
+        The string is cached on the book until its progress changes.
         Args:
-            book (dict): A dictionary containing the book's data (title, author, progress, etc.)
+            book (Book): The book to describe.
         Returns:
             str: The formatted progress string.
         """
-        if book['track_chapters']:
-            total_units = book['total_chapters']
-            current_units = book['current_chapter']
-            unit_name = "chapters"
-        else:
-            total_units = book['total_pages']
-            current_units = book['current_progress']
-            unit_name = "pages"
-        
-        # Hande cases where total_units is None or zero to avoid dividing by zero
-        if total_units is None or total_units == 0:
-            return "N/A"
-        if current_units is None:
-            current_units = 0 # Treat None as 0
-
-        # Calculate percentage
-        if total_units > 0:
-            percentage = (current_units / total_units) * 100
-        else:
-            percentage = 0
-        return f"{current_units}/{total_units} ({percentage:.0f}%) {unit_name}"
+        return book.progress_string
 
     def add_book_entry(self, title, author, total_pages, current_progress, image_path, track_chapters, total_chapters, current_chapter):
         """
-        Method to add a new book dictionary to the 'self.books' list.
-        """
-        new_book = {
-            'title': title,
-            'author': author,
-            'image_path': image_path,
-            'track_chapters': track_chapters,
-            'total_pages': total_pages,
-            'current_progress': current_progress,
-            'total_chapters': total_chapters,
-            'current_chapter': current_chapter
-        }
-        self.books.append(new_book)
+        Method to add a new book to the 'self.books' list.
+        """
+        new_book = Book(title, author, image_path, track_chapters, total_pages, current_progress,
+            total_chapters, current_chapter)
+        self.library.add_book(new_book)
+        self._index_books([new_book])
     
     def _open_add_book_dialog(self, initial_title="", initial_author=""):
         """
@@ -439,22 +972,24 @@ class BookTrackerApp:
         """
         self._open_book_dialog(is_edit=False, initial_title=initial_title, initial_author=initial_author)
 
-    def _open_edit_book_dialog(self, book_data, index):
+    def _open_edit_book_dialog(self, book_id):
         """
         Opens the dialog for editing an existing book.
         Args:
-            book_data (dict): Dictionary of the book to be edited.
-            index (int): index of the book in the 'self.books' list to update.
+            book_id (int): ID of the book in the 'self.books' list to update.
         """
-        self._open_book_dialog(is_edit=True, book_data=book_data, index=index)
+        index = self._find_book_index(book_id)
+        if index is None:
+            return # Book no longer exists
+        self._open_book_dialog(is_edit=True, book_data=self.books[index], book_id=book_id)
     
-    def _open_book_dialog(self, is_edit, book_data=None, index=None, initial_title="", initial_author=""):
+    def _open_book_dialog(self, is_edit, book_data=None, book_id=None, initial_title="", initial_author=""):
         """
         Function to create and manage the Add/Edit Book dialog window.
         Args:
             is_edit (bool): True if the window is for editing, False for adding.
-            book_data (dict): The data of a book to pre-fill if in edit mode.
-            index (int): The list index of the book in edit mode.
+            book_data (Book): The book to pre-fill if in edit mode.
+            book_id (int): The ID of the book in edit mode.
             initial_title (str): Pre-fill for the title field.
             initial_author (str): Pre-fill for the author field.
         """
@@ -513,10 +1048,10 @@ class BookTrackerApp:
 
         # Populate fields if in edit mode
         if is_edit and book_data:
-            title_entry.insert(0, book_data['title'])
-            author_entry.insert(0, book_data['author'])
-            image_path_var.set(book_data.get('image_path', ''))
-            track_chapters_var.set(book_data['track_chapters'])
+            title_entry.insert(0, book_data.title)
+            author_entry.insert(0, book_data.author)
+            image_path_var.set(book_data.image_path)
+            track_chapters_var.set(book_data.track_chapters)
 
             # Initial call to _toggle_chapter_inputs. Sets visibility of page/chapter inputs.
             self._toggle_chapter_inputs(
@@ -526,12 +1061,12 @@ class BookTrackerApp:
             )
 
             # Populate chapter/page fields and handle None values
-            if book_data['track_chapters']:
-                total_chapters_entry.insert(0, str(book_data['total_chapters']) if book_data['total_chapters'] is not None else "")
-                current_chapter_entry.insert(0, str(book_data['current_chapter']) if book_data['current_chapter'] is not None else "")
+            if book_data.track_chapters:
+                total_chapters_entry.insert(0, str(book_data.total_chapters) if book_data.total_chapters is not None else "")
+                current_chapter_entry.insert(0, str(book_data.current_chapter) if book_data.current_chapter is not None else "")
             else:
-                total_pages_entry.insert(0, str(book_data['total_pages']) if book_data['total_pages'] is not None else "")
-                current_progress_entry.insert(0, str(book_data['current_progress']) if book_data['current_progress'] is not None else "")
+                total_pages_entry.insert(0, str(book_data.total_pages) if book_data.total_pages is not None else "")
+                current_progress_entry.insert(0, str(book_data.current_progress) if book_data.current_progress is not None else "")
         elif initial_title or initial_author: # Fill title and/or author fields with initial data from ISBN search
             title_entry.insert(0, initial_title)
             author_entry.insert(0, initial_author)
@@ -550,13 +1085,19 @@ class BookTrackerApp:
                 total_chapters_label, total_chapters_entry, current_chapter_label, current_chapter_entry
             )  
 
+        # Reading pace and estimated finish from the book's progress history
+        if is_edit and book_data:
+            pace_text = self._describe_reading_pace(book_data)
+            if pace_text:
+                ttk.Label(dialog_frame, text=pace_text, font=('Arial', 9, 'italic'), justify='left').grid(row=6, column=0, columnspan=2, sticky='w', pady=5)
+
         # Save and cancel buttons
         button_frame = ttk.Frame(dialog_frame, style="Themed.TFrame")
-        button_frame.grid(row=6, column=0, columnspan=2, pady=10) # Positioned after input fields
+        button_frame.grid(row=7, column=0, columnspan=2, pady=10) # Positioned after input fields
 
         # Define the command for the save Button
         save_command = lambda: self._save_book_data(
-            dialog, is_edit, index,
+            dialog, is_edit, book_id,
             title_entry.get(), author_entry.get(), image_path_var.get(),
             track_chapters_var.get(),
             total_pages_entry.get(), current_progress_entry.get(),
@@ -568,6 +1109,26 @@ class BookTrackerApp:
         # Make the second column of the dialog_frame expandable
         dialog_frame.grid_columnconfigure(1, weight=1)
     
+    def _describe_reading_pace(self, book):
+        """
+        Describes how fast a book is being read and when it will be finished at that pace.
+        Args:
+            book (Book): The book.
+        Returns:
+            str: The description, or an empty string if there is no reading history.
+        """
+        if not self.reading_history:
+            return ""
+        pace = self.reading_history.pace(book.id, PACE_WINDOW_DAYS)
+        if pace is None:
+            return f"No reading progress in the last {PACE_WINDOW_DAYS} days."
+        units_per_day, unit_name = pace
+        text = f"Reading pace: {units_per_day:.1f} {unit_name} per day over the last {PACE_WINDOW_DAYS} days."
+        finish = self.reading_history.estimate_finish(book, PACE_WINDOW_DAYS)
+        if finish is not None:
+            text += f"\nEstimated finish: {time.strftime('%d %b %Y', time.localtime(finish))}"
+        return text
+
     def _select_image_file(self, image_path_var):
         """
         Opens a file dialog to select an image.
@@ -623,108 +1184,80 @@ class BookTrackerApp:
             current_chapter_entry.grid_forget()
 
     
-    def _save_book_data(self, dialog, is_edit, index, title, author, image_path, track_chapters, total_pages_str, current_progress_str, total_chapters_str, current_chapter_str):
+    def _save_book_data(self, dialog, is_edit, book_id, title, author, image_path, track_chapters, total_pages_str, current_progress_str, total_chapters_str, current_chapter_str):
         """
         Saves or updates book data based on the inputs from the Add/Edit Book dialog.
         Validates input values.
         Args:
             dialog (tk.Toplevel): The dialog window to destroy after saving
             is_edit (bool): True when updating an existing book, False when adding a neew book.
-            index (int): The list index of the book in edit mode.
+            book_id (int): The ID of the book in edit mode.
             title (str), author(str), image_path(str): basic book details
             track_chapters (bool): True when tracking progress by chapters, False when tracking progress by pages.
             total_pages_str (str), current_progress_str (str): String values of page counts.
             total_chapters_str (str), current_chapter (str): String values of chapter counts.
         """
-        # Validate required fields (title and author)
-        if not title.strip() or not author.strip(): # Removing leading and trailing whitespace
-            messagebox.showerror("Input Error", "Title and Author cannot be empty.")
-            return
-        
-        # Initialize numeric progress variables to None. Populate if valid.
-        total_pages = None
-        current_progress = None
-        total_chapters = None
-        current_chapter = None
-
         try:
-            if not track_chapters: # Processing for page tracking
-                if total_pages_str.strip(): # Only precess when string isn't empty
-                    total_pages = int(total_pages_str)
-                if current_progress_str.strip():
-                    current_progress = int(current_progress_str)
-            else: # Procesing for chapter tracking
-                if total_chapters_str.strip():
-                    total_chapters = int(total_chapters_str)
-                if current_chapter_str.strip():
-                    current_chapter = int(current_chapter_str)
-        except ValueError:
-            messagebox.showerror("Input Error", "Page/Chapter counts must be valid numbers (or left empty).")
+            book_data = parse_book(title, author, image_path, track_chapters,
+                total_pages_str, current_progress_str, total_chapters_str, current_chapter_str)
+        except BookValidationError as e:
+            messagebox.showerror("Input Error", str(e))
             return
 
-        # Validate that counts are not negative
-        if (total_pages is not None and total_pages < 0) or \
-           (current_progress is not None and current_progress < 0) or \
-           (total_chapters is not None and total_chapters < 0) or \
-           (current_chapter is not None and current_chapter < 0):
-            messagebox.showerror("Input Error", "Counts cannot be negative.")
-            return
-
-        # Validate current progress against total count, ensuring current <= total
-        if not track_chapters:
-            if current_progress is not None and total_pages is not None and current_progress > total_pages:
-                messagebox.showerror("Input Error", "Current page cannot exceed total pages.")
+        previous = Book(book_data.title, book_data.author) # A new book has no earlier progress
+        if is_edit:
+            previous = self.library.get_book(book_id)
+            index = self.library.replace_book(book_id, book_data) # Update existing book entry
+            if index is None:
+                messagebox.showerror("Edit Error", "This book no longer exists.")
+                dialog.destroy()
                 return
         else:
-            if current_chapter is not None and total_chapters is not None and current_chapter > total_chapters:
-                messagebox.showerror("Inpur Error", "Current chapter cannot exceed total chapters.")
-                return
+            index = self.library.add_book(book_data) # Add new book entry
         
-        # COnstruct the book data entry
-        book_data = {
-            'title': title.strip(),
-            'author': author.strip(),
-            'image_path': image_path,
-            'track_chapters': track_chapters,
-            'total_pages': total_pages,
-            'current_progress': current_progress,
-            'total_chapters': total_chapters,
-            'current_chapter': current_chapter
-        }
-
+        dialog.destroy() # Close dialog window
+        self._save_book_record(book_data) # Save updated data to file
+        if self.reading_history:
+            # Keep the progress change, the book only has the latest progress
+            # Comparing with the previous progress means the history's index isn't needed on the main thread
+            self.reading_history.record(book_data, previous=previous)
+        self._index_books([book_data]) # Replaces the entries of an edited book
+        # Update only the affected card
         if is_edit:
-            self.books[index] = book_data # Update existing book entry
+            self._update_book_card(index)
         else:
-            self.books.append(book_data) # Add new book entry
-        
-        dialog.destroy() # Close dialog window
-        self._save_data() # Save updated data to file
-        self._refresh_book_display() # Refresh display for changes
+            self._add_book_card(index)
 
 
-    def _confirm_delete_book(self, index):
+    def _confirm_delete_book(self, book_id):
         """
         Displays a confirmation message box before deleting a book
         Args:
-            index (int): The index of the book to be deleted
+            book_id (int): The ID of the book to be deleted
         """
-        book_title = self.books[index]['title']
+        index = self._find_book_index(book_id)
+        if index is None:
+            return # Book no longer exists
+        book_title = self.books[index].title
         # Message box returns True or False for 'Yes' or 'No' selected respectively
         if messagebox.askyesno(
             "Confirm Delete",
             f"Are you sure you want to delete '{book_title}'?\nThis action cannot be undone."
         ):
-            self._delete_book(index) # Proceed with deletion
+            self._delete_book(book_id) # Proceed with deletion
 
-    def _delete_book(self, index):
+    def _delete_book(self, book_id):
         """
-        Deletes a book from the list and refreshes the display
+        Deletes a book from the list and removes its card from the display
         Args:
-            index (int): The index of the book to be deleted
+            book_id (int): The ID of the book to be deleted
         """
-        del self.books[index] # Removes the book from the list
-        self._save_data() # Update the data for the file
-        self._refresh_book_display() # Update the UI to reflect the deletion
+        index = self.library.delete_book(book_id) # Removes the book from the list
+        if index is None:
+            return
+        self._unindex_book(book_id)
+        self._delete_book_record(book_id) # Update the data for the file
+        self._remove_book_card(book_id, index) # Update the UI to reflect the deletion
     
     def _open_isbn_dialog(self):
         """
@@ -772,13 +1305,21 @@ class BookTrackerApp:
         if not isbn.isdigit() or (len(isbn) != 10 and len(isbn) != 13):
             status_label.config(text="Invalid ISBN. Please enter 10 or 13 digits.", foreground='red')
             return
-        
+
+        # The offline index answers in microseconds, no need for a thread
+        book_info = self.isbn_index.lookup_isbn(isbn) if self.isbn_index else None
+        if book_info:
+            self._process_isbn_results(book_info, isbn_dialog, status_label)
+            return
+
         status_label.config(text="Searching Open Library...", foreground=self.themes[self.current_theme]['text_color'])
+        self._get_metadata_client() # Created here, the worker thread only uses it
         # Start a new thread for the API call
         thread = threading.Thread(target=self._fetch_book_data_thread, args=(isbn, isbn_dialog, status_label))
         thread.daemon = True # Allow the main program to exit even if this thread is running
         thread.start()
 
+    @traced(category='http')
     def _fetch_book_data_thread(self, isbn, isbn_dialog, status_label):
         """
         Fetches book data from Open Libray API in a separate thread.
@@ -788,73 +1329,14 @@ class BookTrackerApp:
             status_label (ttk.Label): The label to update with status messages.
         """
         try:
-            url = f"https://openlibrary.org/isbn/{isbn}.json"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status() # Raise HTTPError for bad responses
-            edition_data = response.json()
-
-            book_info = None
-            title = edition_data.get('title', 'Unknown Title')
-
-            # Extract works key and data
-            work_key = None
-            works_list = edition_data.get('works')
-            if works_list:
-                # Assuming the first work in the list is the primary one
-                work_key = works_list[0].get('key')
-
-            authors_data = []
-            if work_key:
-                work_url = f"https://openlibrary.org{work_key}.json"
-                work_response = requests.get(work_url, timeout = 10)
-                work_response.raise_for_status()
-                work_data = work_response.json()
-                authors_data = work_data.get('authors', [])
-            else:
-                # If no key found, try to get authors from edition_data
-                authors_data = edition_data.get('authors', [])
-
-            author_names = []
-            for author_entry in authors_data:
-                author_key = author_entry.get('author', {}).get('key')
-                if not author_key:
-                    author_key = author_entry.get('key')
-                if author_key:
-                    try:
-                        author_url = f"https://openlibrary.org{author_key}.json"
-                        author_response = requests.get(author_url, timeout=5)
-                        author_response.raise_for_status()
-                        author_data = author_response.json()
-                        author_name = author_data.get('name', 'Unknown Author')
-                        author_names.append(author_name)
-                    except requests.exceptions.RequestException as e:
-                        print(f"Error fetching author data for {author_key}: {e}")
-                        author_names.append("Unknown Author") # 'Unknown Author' for failed author lookup
-                    except json.JSONDecodeError:
-                        print(f"Could not parse author API response for {author_key}")
-                        author_names.append("Unknown Author")
-                else:
-                    # No key present
-                    author_names.append("Unknown Author")
-
-            final_author_string = ", ".join(author_names) if author_names else "Unknown Author"
-
-            book_info = None
-            if title != 'Unknown Title' or final_author_string != 'Unknown Author':
-                book_info = {'title': title, 'author': final_author_string}
+            # Edition, work and author records are fetched through the pooled client, authors concurrently
+            book_info = self.metadata_client.lookup_isbn(isbn)
 
             # Schedule the result processing on the main Tkinter thread
             self.root.after(0, self._process_isbn_results, book_info, isbn_dialog, status_label)
-        
-        except requests.exceptions.Timeout:
-            self.root.after(0, status_label.config, {"text": "API request times out.", "foreground": "red"})
-        except requests.exceptions.RequestException as e:
-            self.root.after(0, status_label.config, {"text": f"Network Error: {e}", "foreground": "red"})
-        except json.JSONDecodeError:
-            self.root.after(0, status_label.config, {"text": "Could not parse API response (invalid JSON).", "foreground": "red"})
         except Exception as e:
-            self.root.after(0, status_label.config, {"text": f"An unexpected error occured: {e}", "foreground": "red"})
-    
+            self.root.after(0, status_label.config, {"text": describe_lookup_error(e), "foreground": "red"})
+
     def _process_isbn_results(self, book_info, isbn_dialog, status_label):
         """
         Processes the results of the ISBN search on the main Tkinter thread.
@@ -869,6 +1351,348 @@ class BookTrackerApp:
         else:
             status_label.config(text="Book not found for this ISBN.", foreground='red')
 
+    def _open_bulk_import_dialog(self):
+        """
+        Imports books from a text or CSV file of ISBNs.
+        ISBNs are checked (length and check digit), looked up a few at a time on a rate limited worker pool, and
+        the result of each lookup is shown as it arrives. When every lookup has finished, the books that were
+        found are added to the collection in one batch. Cancelling offers to add the books found so far.
+        The import has its own rate limited client, so single ISBN lookups aren't slowed down by it.
+        """
+        file_path = filedialog.askopenfilename(
+            title="Select ISBN List",
+            filetypes=[("ISBN lists", "*.txt *.csv"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            isbns, invalid = read_isbn_file(file_path)
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Import Error", f"Could not read {file_path}:\n{e}")
+            return
+        if not isbns and not invalid:
+            messagebox.showinfo("Import ISBNs", "No ISBNs were found in this file.")
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Import ISBNs")
+        dialog.transient(self.root)
+        dialog.grab_set() # Books can't be edited while the import may still add them
+        dialog.config(bg=self.themes[self.current_theme]['dialog_bg'])
+
+        dialog_frame = ttk.Frame(dialog, padding="15", style="Themed.TFrame")
+        dialog_frame.pack(fill='both', expand=True)
+
+        status_label = ttk.Label(dialog_frame, text=f"Looking up {len(isbns)} ISBNs...", font=('Arial', 10))
+        status_label.grid(row=0, column=0, columnspan=2, sticky='w', pady=5)
+        progress = ttk.Progressbar(dialog_frame, mode='determinate', maximum=max(len(isbns), 1))
+        progress.grid(row=1, column=0, columnspan=2, sticky='ew', pady=5)
+
+        # One row per ISBN, updated as its lookup finishes
+        results_view = ttk.Treeview(dialog_frame, columns=('isbn', 'status', 'details'), show='headings', height=12)
+        results_view.heading('isbn', text="ISBN")
+        results_view.heading('status', text="Status")
+        results_view.heading('details', text="Details")
+        results_view.column('isbn', width=120, stretch=False)
+        results_view.column('status', width=80, stretch=False)
+        results_view.column('details', width=320)
+        results_view.grid(row=2, column=0, sticky='nsew')
+        results_scrollbar = ttk.Scrollbar(dialog_frame, orient='vertical', command=results_view.yview)
+        results_scrollbar.grid(row=2, column=1, sticky='ns')
+        results_view.configure(yscrollcommand=results_scrollbar.set)
+        for isbn in isbns:
+            results_view.insert('', 'end', iid=isbn, values=(isbn, "Waiting", ""))
+        for value in invalid:
+            results_view.insert('', 'end', values=(value, "Invalid", "Wrong length or check digit"))
+
+        close_btn = ttk.Button(dialog_frame, text="Cancel", style="Themed.TButton")
+        close_btn.grid(row=3, column=0, columnspan=2, pady=10)
+        dialog_frame.grid_rowconfigure(2, weight=1)
+        dialog_frame.grid_columnconfigure(0, weight=1)
+
+        # Lookups report back through a queue that the main thread polls, one batch of rows per poll
+        results = queue.Queue()
+        found = {} # ISBN -> {'title': ..., 'author': ...}
+        finished = [0]
+        cancelled = [False]
+        import_clients = [] # Created only if some ISBNs have to be looked up online
+
+        def get_import_client():
+            if not import_clients:
+                import_clients.append(create_metadata_client(requests_per_second=IMPORT_REQUESTS_PER_SECOND))
+            return import_clients[0]
+
+        # ISBNs in the offline index are resolved right away, the rest go to Open Library
+        futures = lookup_isbns(isbns, lambda isbn, info, error: results.put((isbn, info, error)),
+            get_import_client, self.isbn_index, max_workers=IMPORT_WORKERS)
+
+        def close_import_client():
+            for client in import_clients:
+                client.close()
+
+        def close():
+            if finished[0] < len(isbns):
+                cancelled[0] = True # Stop polling, so the import can't finish while the question is open
+                for future in futures:
+                    future.cancel() # Skip lookups that haven't started, the running ones finish in the background
+                # The client is closed once the running lookups are done with it
+                threading.Thread(target=lambda: (wait(futures), close_import_client()), daemon=True).start()
+                if found and messagebox.askyesno("Import ISBNs",
+                        f"{len(found)} books were found so far. Add them to your collection?", parent=dialog):
+                    self._add_imported_books([found[isbn] for isbn in isbns if isbn in found])
+            dialog.destroy()
+
+        def poll():
+            if cancelled[0] or not dialog.winfo_exists():
+                return
+            while True:
+                try:
+                    isbn, info, error = results.get_nowait()
+                except queue.Empty:
+                    break
+                finished[0] += 1
+                if info:
+                    found[isbn] = info
+                    results_view.item(isbn, values=(isbn, "Found", f"{info['title']} by {info['author']}"))
+                else:
+                    results_view.item(isbn, values=(isbn, "Failed", describe_lookup_error(error)))
+            progress.config(value=finished[0])
+            if finished[0] < len(isbns):
+                status_label.config(text=f"Looked up {finished[0]} of {len(isbns)} ISBNs, {len(found)} found...")
+                dialog.after(100, poll)
+                return
+            close_import_client()
+            # Keep the order of the file
+            added = self._add_imported_books([found[isbn] for isbn in isbns if isbn in found])
+            failed = len(isbns) - added + len(invalid)
+            status_label.config(text=f"Added {added} books. {failed} ISBNs could not be imported.")
+            close_btn.config(text="Close")
+
+        close_btn.config(command=close)
+        dialog.protocol("WM_DELETE_WINDOW", close)
+        poll()
+
+    def _open_stats_window(self):
+        """
+        Opens the statistics panel: pages and chapters read, books by reading state, a completion histogram
+        and the average completion of the authors with the most books. The panel updates as books change.
+        """
+        if self.stats_window is not None:
+            self.stats_window.lift()
+            return
+        theme_colors = self.themes[self.current_theme]
+        window = tk.Toplevel(self.root)
+        window.title("Reading Statistics")
+        window.config(bg=theme_colors['dialog_bg'])
+        self.stats_window = window
+
+        stats_frame = ttk.Frame(window, padding="15", style="Themed.TFrame")
+        stats_frame.pack(fill='both', expand=True)
+
+        self.stats_summary_label = ttk.Label(stats_frame, text="Calculating...", font=('Arial', 10), justify='left')
+        self.stats_summary_label.grid(row=0, column=0, sticky='w', pady=(0, 10))
+
+        ttk.Label(stats_frame, text="Completion", font=('Arial', 10, 'bold')).grid(row=1, column=0, sticky='w')
+        self.stats_histogram = tk.Canvas(stats_frame, width=360, height=170, bg=theme_colors['canvas_bg'], highlightthickness=0)
+        self.stats_histogram.grid(row=2, column=0, sticky='w', pady=5)
+
+        ttk.Label(stats_frame, text="Average completion by author", font=('Arial', 10, 'bold')).grid(row=3, column=0, sticky='w', pady=(10, 0))
+        self.stats_authors_view = ttk.Treeview(stats_frame, columns=('author', 'books', 'completion'), show='headings', height=10)
+        self.stats_authors_view.heading('author', text="Author")
+        self.stats_authors_view.heading('books', text="Books")
+        self.stats_authors_view.heading('completion', text="Avg. complete")
+        self.stats_authors_view.column('author', width=200)
+        self.stats_authors_view.column('books', width=60, anchor='e', stretch=False)
+        self.stats_authors_view.column('completion', width=100, anchor='e', stretch=False)
+        self.stats_authors_view.grid(row=4, column=0, sticky='nsew', pady=5)
+        stats_frame.grid_rowconfigure(4, weight=1)
+        stats_frame.grid_columnconfigure(0, weight=1)
+
+        def close():
+            self.stats_window = None
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+        self._refresh_stats()
+
+    def _schedule_stats_refresh(self):
+        """
+        Recomputes the statistics shortly after a change, if the panel is open. Bursts of changes share one refresh.
+        """
+        if self.stats_window is None:
+            return
+        if self.stats_after_id is not None:
+            self.root.after_cancel(self.stats_after_id)
+        self.stats_after_id = self.root.after(STATS_DELAY_MS, self._refresh_stats)
+
+    def _refresh_stats(self):
+        """
+        Computes the statistics on a background thread from a copy of the columns, then shows them.
+        """
+        self.stats_after_id = None
+        self.stats_generation += 1
+        generation = self.stats_generation
+        if self.library_stats is None:
+            from library_stats import LibraryStats
+            self.library_stats = LibraryStats()
+            self.library_stats.add_many(self.books)
+        snapshot = self.library_stats.snapshot()
+        reading_history = self.reading_history
+
+        def compute():
+            summary = snapshot.summary()
+            summary['pace'] = reading_history.library_pace(PACE_WINDOW_DAYS) if reading_history else None
+            self.root.after(0, self._show_stats, summary, generation)
+
+        threading.Thread(target=compute, daemon=True).start()
+
+    def _show_stats(self, summary, generation):
+        """
+        Displays computed statistics in the panel, unless the panel was closed or newer statistics are coming.
+        """
+        if self.stats_window is None or generation != self.stats_generation:
+            return
+        self.stats_summary_label.config(text=(
+            f"Books: {summary['books']}\n"
+            f"Finished: {summary['finished']}    In progress: {summary['in_progress']}    Not started: {summary['not_started']}\n"
+            f"Pages read: {summary['pages_read']} of {summary['total_pages']}\n"
+            f"Chapters read: {summary['chapters_read']} of {summary['total_chapters']}"
+            + (f"\nLast {PACE_WINDOW_DAYS} days: {summary['pace']['pages']:.1f} pages and "
+                f"{summary['pace']['chapters']:.1f} chapters per day" if summary['pace'] else "")))
+        self._draw_stats_histogram(summary['histogram'])
+        self.stats_authors_view.delete(*self.stats_authors_view.get_children())
+        for author, book_count, completion in summary['authors']:
+            self.stats_authors_view.insert('', 'end', values=(author, book_count, f"{completion:.0f}%"))
+
+    def _draw_stats_histogram(self, counts):
+        """
+        Draws the completion histogram as one bar per 10% bin.
+        Args:
+            counts (list): Number of books in each bin, from 0-10% to 90-100%.
+        """
+        canvas = self.stats_histogram
+        text_color = self.themes[self.current_theme]['text_color']
+        canvas.delete('all')
+        width, height = int(canvas['width']), int(canvas['height'])
+        left, bottom, top = 10, height - 20, 15
+        bar_width = (width - 2 * left) / len(counts)
+        highest = max(counts) or 1
+        for i, count in enumerate(counts):
+            x0 = left + i * bar_width
+            bar_top = bottom - (bottom - top) * count / highest
+            canvas.create_rectangle(x0 + 2, bar_top, x0 + bar_width - 2, bottom, fill='#4a90d9', outline='')
+            if count:
+                canvas.create_text(x0 + bar_width / 2, bar_top - 2, text=str(count), anchor='s', fill=text_color, font=('Arial', 8))
+            canvas.create_text(x0 + bar_width / 2, bottom + 3, text=f"{i * 10}%", anchor='n', fill=text_color, font=('Arial', 8))
+
+    def _open_diagnostics_window(self):
+        """
+        Opens the diagnostics window, listing the longest recent stalls of the main thread.
+        Selecting a stall shows the main thread's stacks sampled during it, most sampled first.
+        """
+        if self.diagnostics_window is not None:
+            self.diagnostics_window.lift()
+            self._refresh_diagnostics()
+            return
+        theme_colors = self.themes[self.current_theme]
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.config(bg=theme_colors['dialog_bg'])
+        self.diagnostics_window = window
+
+        diagnostics_frame = ttk.Frame(window, padding="15", style="Themed.TFrame")
+        diagnostics_frame.pack(fill='both', expand=True)
+
+        ttk.Label(diagnostics_frame, text=f"Longest stalls over {STALL_THRESHOLD_MS} ms", font=('Arial', 10, 'bold')).grid(row=0, column=0, sticky='w')
+        self.stalls_view = ttk.Treeview(diagnostics_frame, columns=('when', 'duration', 'location'), show='headings', height=8)
+        self.stalls_view.heading('when', text="When")
+        self.stalls_view.heading('duration', text="Duration")
+        self.stalls_view.heading('location', text="Where")
+        self.stalls_view.column('when', width=80, stretch=False)
+        self.stalls_view.column('duration', width=80, anchor='e', stretch=False)
+        self.stalls_view.column('location', width=360)
+        self.stalls_view.grid(row=1, column=0, sticky='nsew', pady=5)
+        self.stalls_view.bind('<<TreeviewSelect>>', lambda e: self._show_stall_stacks())
+
+        ttk.Label(diagnostics_frame, text="Main thread stacks", font=('Arial', 10, 'bold')).grid(row=2, column=0, sticky='w', pady=(10, 0))
+        self.stall_stacks_text = tk.Text(diagnostics_frame, width=90, height=16, wrap='none', font=('Courier', 9),
+            bg=theme_colors['entry_bg'], fg=theme_colors['entry_fg'])
+        self.stall_stacks_text.grid(row=3, column=0, sticky='nsew', pady=5)
+        diagnostics_frame.grid_rowconfigure(3, weight=1)
+        diagnostics_frame.grid_columnconfigure(0, weight=1)
+
+        refresh_btn = ttk.Button(diagnostics_frame, text="Refresh", command=self._refresh_diagnostics, style="Themed.TButton")
+        refresh_btn.grid(row=4, column=0, sticky='e', pady=(5, 0))
+
+        def close():
+            self.diagnostics_window = None
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+        self._refresh_diagnostics()
+
+    def _refresh_diagnostics(self):
+        """
+        Lists the longest stalls in the diagnostics window.
+        """
+        self.shown_stalls = self.stall_monitor.worst(DIAGNOSTICS_STALLS)
+        self.stalls_view.delete(*self.stalls_view.get_children())
+        for i, stall in enumerate(self.shown_stalls):
+            self.stalls_view.insert('', 'end', iid=str(i), values=(
+                time.strftime('%H:%M:%S', time.localtime(stall.started)), f"{stall.duration * 1000:.0f} ms", stall.location))
+        self.stall_stacks_text.delete('1.0', tk.END)
+        if self.shown_stalls:
+            self.stalls_view.selection_set('0')
+        else:
+            self.stall_stacks_text.insert(tk.END, "No stalls recorded yet.")
+
+    def _show_stall_stacks(self):
+        """
+        Shows the stacks sampled during the selected stall.
+        """
+        selection = self.stalls_view.selection()
+        if not selection:
+            return
+        stall = self.shown_stalls[int(selection[0])]
+        samples = sum(count for stack, count in stall.stacks)
+        self.stall_stacks_text.delete('1.0', tk.END)
+        if not stall.stacks:
+            self.stall_stacks_text.insert(tk.END, "The stall ended before the main thread could be sampled.")
+            return
+        for stack, count in stall.stacks:
+            self.stall_stacks_text.insert(tk.END, f"{count} of {samples} samples:\n{format_stack(stack)}\n")
+
+    def _get_metadata_client(self):
+        """
+        Returns the Open Library client for single ISBN lookups, creating it on first use. It isn't rate limited,
+        bulk imports use a client of their own.
+        """
+        if self.metadata_client is None:
+            self.metadata_client = create_metadata_client()
+        return self.metadata_client
+
+    def _add_imported_books(self, book_infos):
+        """
+        Adds a batch of looked up books to the collection with a single save and a single display update.
+        Args:
+            book_infos (list): Dictionaries with 'title' and 'author'.
+        Returns:
+            int: The number of books added.
+        """
+        if not book_infos:
+            return 0
+        new_books = [Book(info['title'], info['author']) for info in book_infos]
+        index = self.library.add_books(new_books)
+        self._index_books(new_books)
+        if self.store.supports_record_writes:
+            # The background saver writes the whole batch at once
+            for book in new_books:
+                self.saver.upsert_book(book)
+        else:
+            self._save_data()
+        self._insert_book_cards(index, len(new_books))
+        return len(new_books)
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = BookTrackerApp(root)
@@ -0,0 +1,135 @@
+import sys
+
+# Book fields in the order they are saved
+BOOK_FIELDS = ['title', 'author', 'image_path', 'track_chapters', 'total_pages', 'current_progress', 'total_chapters', 'current_chapter', 'updated']
+
+def _progress_field(name):
+    """
+    Creates a property for a field that the derived progress values depend on.
+    Setting the field clears the cached values, so they are recalculated on next access.
+    """
+    slot = '_' + name
+
+    def get(self):
+        return getattr(self, slot)
+
+    def set(self, value):
+        setattr(self, slot, value)
+        self._percentage = None
+        self._progress_string = None
+
+    return property(get, set)
+
+
+class Book:
+    """
+    A book in the collection.
+    Uses __slots__ instead of a per-instance dict, which keeps each book several times smaller than the
+    dictionaries used before, and caches derived values (fraction, percentage, progress string) until one of
+    the progress fields changes. Books are converted to and from the original dictionary format for saving.
+    Once a book has been handed to storage, replace it with a new Book rather than changing it in place.
+    """
+    __slots__ = ('id', 'title', 'author', 'image_path', 'updated',
+        '_track_chapters', '_total_pages', '_current_progress', '_total_chapters', '_current_chapter',
+        '_percentage', '_progress_string')
+
+    track_chapters = _progress_field('track_chapters')
+    total_pages = _progress_field('total_pages')
+    current_progress = _progress_field('current_progress')
+    total_chapters = _progress_field('total_chapters')
+    current_chapter = _progress_field('current_chapter')
+
+    def __init__(self, title, author, image_path='', track_chapters=False, total_pages=None, current_progress=None,
+            total_chapters=None, current_chapter=None, updated=None, id=None):
+        """
+        Args:
+            title (str), author (str), image_path (str): Basic book details.
+            track_chapters (bool): True when tracking progress by chapters, False when tracking by pages.
+            total_pages (int), current_progress (int): Page counts, or None if unknown.
+            total_chapters (int), current_chapter (int): Chapter counts, or None if unknown.
+            updated (float): When the book was last added or edited, as a Unix timestamp, or None if unknown.
+            id (int): The stable ID of the book, or None if it hasn't been given one yet.
+        """
+        self.id = id
+        self.title = title
+        # Many books share an author, interning keeps one copy of each name
+        self.author = sys.intern(author) if isinstance(author, str) else author
+        self.image_path = image_path or ''
+        self._track_chapters = bool(track_chapters)
+        self._total_pages = total_pages
+        self._current_progress = current_progress
+        self._total_chapters = total_chapters
+        self._current_chapter = current_chapter
+        self.updated = updated
+        self._percentage = None
+        self._progress_string = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates a book from its saved dictionary form. Missing fields get their defaults.
+        Args:
+            data (dict): A dictionary with the keys in BOOK_FIELDS and optionally 'id'.
+        Returns:
+            Book: The new book.
+        """
+        return cls(
+            data.get('title', ''), data.get('author', ''), data.get('image_path', ''),
+            data.get('track_chapters', False), data.get('total_pages'), data.get('current_progress'),
+            data.get('total_chapters'), data.get('current_chapter'), data.get('updated'), data.get('id'))
+
+    def to_dict(self):
+        """
+        Returns the book in the dictionary form used by books.json.
+        """
+        data = {field: getattr(self, field) for field in BOOK_FIELDS}
+        data['id'] = self.id
+        return data
+
+    def units(self):
+        """
+        Returns the progress in the unit being tracked.
+        Returns:
+            tuple: (current units, total units, unit name), where counts may be None.
+        """
+        if self._track_chapters:
+            return self._current_chapter, self._total_chapters, "chapters"
+        return self._current_progress, self._total_pages, "pages"
+
+    @property
+    def percentage(self):
+        """
+        Completion in percent, or None if the total is unknown or zero. Cached until a progress field changes.
+        """
+        if self._percentage is None:
+            current_units, total_units, _ = self.units()
+            if not total_units or total_units < 0:
+                return None
+            self._percentage = ((current_units or 0) / total_units) * 100
+        return self._percentage
+
+    @property
+    def fraction(self):
+        """
+        Completion between 0 and 1, or None if the total is unknown or zero.
+        """
+        percentage = self.percentage
+        return None if percentage is None else percentage / 100
+
+    @property
+    def progress_string(self):
+        """
+        The formatted progress shown on the book's card, e.g. "50/200 (25%) pages". Cached until a progress field changes.
+        """
+        if self._progress_string is None:
+            current_units, total_units, unit_name = self.units()
+            # Hande cases where total_units is None or zero to avoid dividing by zero
+            if total_units is None or total_units == 0:
+                self._progress_string = "N/A"
+            else:
+                percentage = self.percentage or 0
+                self._progress_string = f"{current_units or 0}/{total_units} ({percentage:.0f}%) {unit_name}"
+        return self._progress_string
+
+    def __repr__(self):
+        return f"Book(id={self.id!r}, title={self.title!r}, author={self.author!r})"
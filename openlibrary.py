@@ -0,0 +1,279 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from tracing import tracer
+
+# HTTP status codes worth retrying: rate limiting and temporary server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class RateLimiter:
+    """
+    Spaces out requests so no more than a given number start per second, across all threads.
+    """
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic() # Earliest time the next request may start
+
+    def wait(self):
+        """
+        Blocks until the caller may send its request.
+        """
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class OpenLibraryClient:
+    """
+    Looks up book metadata from the Open Library API (https://openlibrary.org/developers/api).
+    Requests share a pooled keep-alive HTTP session, author records are fetched concurrently, transient errors
+    are retried with exponential backoff, and concurrent requests for the same resource are collapsed into one.
+    With a ResponseCache, repeat lookups are answered from disk, and previously seen books can be looked up offline.
+    Requests to the server can be rate limited, which keeps bulk imports within Open Library's usage guidelines.
+    The base URL can be pointed at a local stand-in server for testing.
+    """
+    def __init__(self, base_url='https://openlibrary.org', timeout=10, max_retries=3, backoff=0.5, max_workers=8, cache=None,
+            requests_per_second=None):
+        """
+        Args:
+            base_url (str): The Open Library server, without a trailing slash.
+            timeout (float): Seconds to wait for each request.
+            max_retries (int): Number of times a transient failure is retried.
+            backoff (float): Delay in seconds before the first retry, doubled for each further retry.
+            max_workers (int): Number of concurrent author fetches, also the size of the connection pool.
+            cache (ResponseCache): Optional persistent cache of responses.
+            requests_per_second (float): Optional limit on HTTP requests sent per second. Cached responses aren't limited.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = cache
+        self.rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='openlibrary')
+
+        self.lock = threading.Lock() # Guards in_flight
+        self.in_flight = {} # key -> Future shared by everyone requesting the same resource
+
+    def lookup_isbn(self, isbn):
+        """
+        Finds the title and author(s) of a book.
+        Args:
+            isbn (str): A 10 or 13 digit ISBN.
+        Returns:
+            dict or None: {'title': ..., 'author': ...}, or None if neither could be found.
+        Raises:
+            requests.exceptions.RequestException: If the edition or work can't be fetched.
+        """
+        return self._deduplicate(('isbn', isbn), lambda: self._lookup_isbn(isbn))
+
+    def lookup_many(self, isbns, on_result, max_workers=4):
+        """
+        Looks up many ISBNs on a bounded pool of worker threads, e.g. for a bulk import.
+        Results are reported as each lookup finishes, in no particular order.
+        Args:
+            isbns (list): 10 or 13 digit ISBNs.
+            on_result (callable): Called on a worker thread as on_result(isbn, book_info, error), where book_info is
+                the result of lookup_isbn and error is the exception raised by the lookup, or None.
+            max_workers (int): Number of ISBNs looked up at the same time.
+        Returns:
+            list: A Future per ISBN. Cancelling the futures skips the lookups that haven't started yet.
+        """
+        def lookup(isbn):
+            try:
+                book_info = self.lookup_isbn(isbn)
+            except Exception as e:
+                on_result(isbn, None, e)
+            else:
+                on_result(isbn, book_info, None)
+
+        # A separate pool from the author fetches, so lookups waiting on their authors can't starve them
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='isbn-import')
+        futures = [executor.submit(lookup, isbn) for isbn in isbns]
+        executor.shutdown(wait=False) # Queued lookups still run, the threads exit when done
+        return futures
+
+    def get_json(self, path):
+        """
+        Fetches a JSON resource, e.g. '/isbn/9780140328721.json'.
+        Fresh cached responses are used without any network I/O. Transient errors are retried, and concurrent
+        requests for the same path share one HTTP request. If the server can't be reached, a stale cached
+        response is used instead.
+        Args:
+            path (str): The resource path, starting with '/'.
+        Returns:
+            dict: The decoded JSON.
+        Raises:
+            requests.exceptions.RequestException: If the request fails, including after all retries.
+        """
+        return self._deduplicate(('path', path), lambda: self._cached_request_json(path))
+
+    def close(self):
+        """
+        Closes the HTTP session and stops the worker threads.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+    def _lookup_isbn(self, isbn):
+        edition_data = self.get_json(f"/isbn/{isbn}.json")
+        title = edition_data.get('title', 'Unknown Title')
+
+        # Extract works key and data
+        works_list = edition_data.get('works')
+        # Assuming the first work in the list is the primary one
+        work_key = works_list[0].get('key') if works_list else None
+        if work_key:
+            work_data = self.get_json(f"{work_key}.json")
+            author_keys = self._author_keys(work_data.get('authors', []))
+        else:
+            # If no key found, use the authors from edition_data
+            author_keys = self._author_keys(edition_data.get('authors', []))
+
+        # Only the authors that are used are fetched, concurrently, so rate-limited requests aren't wasted
+        author_futures = {}
+        self._fetch_authors(author_keys, author_futures)
+        # 'Unknown Author' for entries without a key or failed author lookups
+        author_names = [author_futures[key].result() if key else "Unknown Author" for key in author_keys]
+        final_author_string = ", ".join(author_names) if author_names else "Unknown Author"
+
+        if title != 'Unknown Title' or final_author_string != 'Unknown Author':
+            return {'title': title, 'author': final_author_string}
+        return None
+
+    def _author_keys(self, authors_data):
+        """
+        Extracts author keys from the 'authors' list of an edition or work. Entries without a key give None.
+        """
+        author_keys = []
+        for author_entry in authors_data:
+            author_key = author_entry.get('author', {}).get('key')
+            if not author_key:
+                author_key = author_entry.get('key')
+            author_keys.append(author_key)
+        return author_keys
+
+    def _fetch_authors(self, author_keys, author_futures):
+        """
+        Starts fetching the names of any authors that aren't being fetched yet.
+        Args:
+            author_keys (list): Author keys such as '/authors/OL34184A'. None entries are skipped.
+            author_futures (dict): Author key -> Future of the author's name, updated in place.
+        """
+        for author_key in author_keys:
+            if author_key and author_key not in author_futures:
+                author_futures[author_key] = self.executor.submit(self._author_name, author_key)
+
+    def _author_name(self, author_key):
+        """
+        Fetches an author's name, or 'Unknown Author' if the lookup fails.
+        """
+        try:
+            return self.get_json(f"{author_key}.json").get('name', 'Unknown Author')
+        except requests.exceptions.JSONDecodeError:
+            print(f"Could not parse author API response for {author_key}")
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching author data for {author_key}: {e}")
+        return "Unknown Author"
+
+    def _cached_request_json(self, path):
+        """
+        Answers a request from the cache when possible, otherwise fetches it and stores the response.
+        """
+        cached = self.cache.get(path) if self.cache else None
+        if cached and cached.fresh:
+            if not cached.found:
+                self._raise_not_found(path)
+            return cached.data
+        try:
+            data = self._request_json(path)
+        except requests.exceptions.HTTPError as e:
+            if self.cache and e.response is not None and e.response.status_code == 404:
+                self.cache.put_not_found(path)
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if cached is None:
+                raise
+            print(f"Open Library unreachable, using cached response for {path}")
+            if not cached.found:
+                self._raise_not_found(path)
+            return cached.data
+        if self.cache:
+            self.cache.put(path, data)
+        return data
+
+    def _raise_not_found(self, path):
+        """
+        Raises the same HTTPError as a 404 from the server, for a cached 'not found' answer.
+        """
+        response = requests.Response()
+        response.status_code = 404
+        response.reason = 'Not Found'
+        response.url = f"{self.base_url}{path}"
+        raise requests.exceptions.HTTPError(f"404 Client Error: Not Found (cached) for url: {response.url}", response=response)
+
+    def _request_json(self, path):
+        """
+        Sends a GET request, retrying timeouts, connection errors and transient HTTP errors with exponential backoff.
+        """
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.rate_limiter:
+                    self.rate_limiter.wait()
+                with tracer.span('GET', 'http', {'path': path, 'attempt': attempt}):
+                    response = self.session.get(url, timeout=self.timeout)
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    self._wait_before_retry(attempt, response.headers.get('Retry-After'))
+                    continue
+                response.raise_for_status() # Raise HTTPError for bad responses
+                return response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self._wait_before_retry(attempt)
+
+    def _wait_before_retry(self, attempt, retry_after=None):
+        """
+        Sleeps before a retry, honouring a numeric Retry-After header up to 30 seconds.
+        """
+        delay = self.backoff * (2 ** attempt)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(int(retry_after), 30))
+        time.sleep(delay)
+
+    def _deduplicate(self, key, fetch):
+        """
+        Runs fetch() once for concurrent callers with the same key. The other callers wait for and share its result.
+        """
+        with self.lock:
+            future = self.in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self.in_flight[key] = future
+        if not is_owner:
+            return future.result()
+        try:
+            result = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+        future.set_result(result)
+        return result
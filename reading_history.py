@@ -0,0 +1,254 @@
+import os
+import time
+import struct
+import threading
+
+# Layout of the history file: magic bytes, then fixed-width records in the order they were written
+HISTORY_MAGIC = b'BMKHIST\x01'
+# book ID, Unix time, progress, total (-1 if unknown), unit (0 pages, 1 chapters), padding to 32 bytes
+HISTORY_RECORD = struct.Struct('<QdiiB7x')
+# The same layout as a NumPy dtype, see history_dtype
+HISTORY_FIELDS = [('book_id', '<u8'), ('timestamp', '<f8'), ('progress', '<i4'), ('total', '<i4'),
+    ('unit', 'u1'), ('padding', 'V7')]
+UNIT_PAGES = 0
+UNIT_CHAPTERS = 1
+UNIT_NAMES = {UNIT_PAGES: "pages", UNIT_CHAPTERS: "chapters"}
+SECONDS_PER_DAY = 24 * 3600
+
+class ReadingHistory:
+    """
+    Every progress change of every book, kept in an append-only binary file of fixed-width records.
+    Recording a change appends one 32 byte record, so the file never needs rewriting, and a record that was only
+    partly written when the program stopped is cut off the next time the file is opened.
+    An in-memory index of record numbers per book is built with NumPy the first time it is needed and extended as
+    records are appended, so reading a book's history only touches that book's records, through a memory map.
+    Appending a change whose previous progress is known needs neither the index nor NumPy, so recording from a
+    short-lived command is quick.
+    From the history, reading pace over a rolling window and estimated finish dates are calculated.
+    The library's pace can be calculated on a background thread while changes are recorded on another.
+    """
+    def __init__(self, path='reading_history.bin'):
+        """
+        Args:
+            path (str): Path of the history file. Created if it doesn't exist.
+        """
+        self.path = path
+        self.index = None # book ID -> record numbers of the book, oldest first (array, or list once appended to), built on first use
+        self.last = {} # book ID -> (progress, total, unit) of the book's latest record, built with the index
+        self.count = 0 # Number of records in the file
+        self.view = None # Memory map of the records, recreated when records have been appended
+        self.lock = threading.RLock() # Guards the file, index and memory map
+        self._open()
+
+    def record(self, book, timestamp=None, previous=None):
+        """
+        Appends the current progress of a book, unless it is the same as its latest record.
+        Books without any progress entered aren't recorded.
+        Args:
+            book (Book): The book after the change.
+            timestamp (float): Unix time of the change, defaults to now.
+            previous (Book): The book before the change, if known. Its progress is compared instead of the
+                latest record, which doesn't need the index.
+        Returns:
+            bool: True if a record was written.
+        """
+        current, total, unit_name = book.units()
+        if current is None:
+            return False
+        unit = UNIT_CHAPTERS if unit_name == "chapters" else UNIT_PAGES
+        total = -1 if total is None else total
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            if previous is not None:
+                if previous.units() == book.units():
+                    return False
+            elif self.last_record(book.id) == (current, total, unit):
+                return False
+            self.file.write(HISTORY_RECORD.pack(book.id, timestamp, current, total, unit))
+            self.file.flush()
+
+            if self.index is not None:
+                record_numbers = self.index.get(book.id)
+                if record_numbers is None:
+                    self.index[book.id] = [self.count]
+                else:
+                    if not isinstance(record_numbers, list):
+                        record_numbers = self.index[book.id] = record_numbers.tolist()
+                    record_numbers.append(self.count)
+                self.last[book.id] = (current, total, unit)
+            self.count += 1
+        return True
+
+    def last_record(self, book_id):
+        """
+        Returns the latest (progress, total, unit) recorded for a book, or None if it has no records.
+        Builds the per-book index the first time, so prefer passing the previous progress to record.
+        """
+        with self.lock:
+            self._get_index()
+            return self.last.get(book_id)
+
+    def events(self, book_id):
+        """
+        Returns the history of one book.
+        Args:
+            book_id (int): The stable ID of the book.
+        Returns:
+            numpy.ndarray: Records with the fields 'timestamp', 'progress', 'total' and 'unit', oldest first.
+        """
+        import numpy as np
+        with self.lock:
+            record_numbers = self._get_index().get(book_id)
+            if record_numbers is None:
+                return np.zeros(0, dtype=history_dtype())
+            return self._records()[np.asarray(record_numbers)]
+
+    def pace(self, book_id, days=14, now=None):
+        """
+        Calculates how fast a book is being read over a rolling window.
+        Only progress in the unit the book is currently tracked by is counted. The window starts at the book's
+        first record if that is more recent, so a newly started book isn't measured over days before it was added.
+        Args:
+            book_id (int): The stable ID of the book.
+            days (float): Length of the window in days.
+            now (float): Unix time the window ends at, defaults to now.
+        Returns:
+            tuple or None: (units per day, unit name), or None if there is no progress in the window.
+        """
+        import numpy as np
+        events = self.events(book_id)
+        if len(events) < 2:
+            return None
+        now = time.time() if now is None else now
+        unit = events['unit'][-1]
+        events = events[events['unit'] == unit]
+        window_start = now - days * SECONDS_PER_DAY
+        # Progress at the start of the window: the last record before it, or the first record in it
+        before = np.flatnonzero(events['timestamp'] <= window_start)
+        start = before[-1] if before.size else 0
+        start_time = max(window_start, events['timestamp'][start])
+        progress = int(events['progress'][-1]) - int(events['progress'][start])
+        if progress <= 0:
+            return None
+        elapsed_days = max((now - start_time) / SECONDS_PER_DAY, 1.0) # At least a day, so a single session isn't extrapolated
+        return progress / float(elapsed_days), UNIT_NAMES[int(unit)]
+
+    def estimate_finish(self, book, days=14, now=None):
+        """
+        Estimates when a book will be finished at its current reading pace.
+        Args:
+            book (Book): The book.
+            days (float): Length of the pace window in days.
+            now (float): Unix time to estimate from, defaults to now.
+        Returns:
+            float or None: Unix time of the estimated finish, or None if the book is finished, has no total,
+            or has no recent progress.
+        """
+        current, total, _ = book.units()
+        if not total or (current or 0) >= total:
+            return None
+        pace = self.pace(book.id, days, now)
+        if pace is None:
+            return None
+        now = time.time() if now is None else now
+        return now + (total - (current or 0)) / pace[0] * SECONDS_PER_DAY
+
+    def library_pace(self, days=14, now=None):
+        """
+        Calculates how many pages and chapters were read per day across all books over a rolling window.
+        Records are appended in time order, so the records in the window are found with a binary search, and only
+        the books with records in the window are read, through the per-book index. Each record's progress is
+        compared with the previous record of the same book, and the increases inside the window are summed.
+        Returns:
+            dict: {'pages': pages per day, 'chapters': chapters per day}.
+        """
+        import numpy as np
+        now = time.time() if now is None else now
+        window_start = now - days * SECONDS_PER_DAY
+        result = {'pages': 0.0, 'chapters': 0.0}
+        with self.lock:
+            index = self._get_index()
+            records = self._records()
+            first = int(np.searchsorted(records['timestamp'], window_start, side='right'))
+            active = np.unique(records['book_id'][first:])
+            if not active.size:
+                return result
+            # The records of the active books, grouped by book and oldest first within each book
+            records = records[np.concatenate([np.asarray(index[book_id]) for book_id in active.tolist()])]
+        book_ids, timestamps, units = records['book_id'], records['timestamp'], records['unit']
+        progress = records['progress'].astype(np.int64)
+        same_book = (book_ids[1:] == book_ids[:-1]) & (units[1:] == units[:-1])
+        increase = np.maximum(progress[1:] - progress[:-1], 0)
+        counted = same_book & (timestamps[1:] > window_start) & (timestamps[1:] <= now)
+        for unit, name in UNIT_NAMES.items():
+            result[name] = float(increase[counted & (units[1:] == unit)].sum()) / days
+        return result
+
+    def close(self):
+        with self.lock:
+            self.view = None
+            self.file.close()
+
+    def _open(self):
+        """
+        Opens the history file for appending, creating it or cutting off a partly written record.
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < len(HISTORY_MAGIC):
+            with open(self.path, 'wb') as f:
+                f.write(HISTORY_MAGIC)
+        with open(self.path, 'r+b') as f:
+            if f.read(len(HISTORY_MAGIC)) != HISTORY_MAGIC:
+                raise ValueError(f"{self.path} is not a reading history file")
+            size = os.fstat(f.fileno()).st_size
+            self.count = (size - len(HISTORY_MAGIC)) // HISTORY_RECORD.size
+            complete_size = len(HISTORY_MAGIC) + self.count * HISTORY_RECORD.size
+            if size != complete_size:
+                print(f"Removing a partly written record from {self.path}")
+                f.truncate(complete_size)
+        self.file = open(self.path, 'ab')
+
+    def _get_index(self):
+        """
+        Returns the per-book index, building it the first time.
+        """
+        if self.index is None:
+            self._build_index()
+        return self.index
+
+    def _build_index(self):
+        """
+        Groups the record numbers by book with a stable sort, so each book's records stay in time order.
+        """
+        import numpy as np
+        self.index = {}
+        self.last = {}
+        records = self._records()
+        if not len(records):
+            return
+        book_ids = records['book_id']
+        order = np.argsort(book_ids, kind='stable')
+        sorted_ids = book_ids[order]
+        starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+        for book_id, record_numbers in zip(sorted_ids[starts].tolist(), np.split(order, starts[1:])):
+            self.index[book_id] = record_numbers
+            latest = records[record_numbers[-1]]
+            self.last[book_id] = (int(latest['progress']), int(latest['total']), int(latest['unit']))
+
+    def _records(self):
+        """
+        Returns a read-only memory map of every record, recreated if records were appended since the last call.
+        """
+        import numpy as np
+        if self.view is None or len(self.view) != self.count:
+            if self.count == 0:
+                return np.zeros(0, dtype=history_dtype())
+            self.view = np.memmap(self.path, dtype=history_dtype(), mode='r', offset=len(HISTORY_MAGIC), shape=(self.count,))
+        return self.view
+
+
+def history_dtype():
+    """
+    Returns the NumPy dtype of a history record. NumPy is only imported when the history is read.
+    """
+    import numpy as np
+    return np.dtype(HISTORY_FIELDS)
@@ -0,0 +1,140 @@
+import json
+import time
+import sqlite3
+import threading
+
+# How long cached responses stay fresh, in seconds, by the first part of the resource path
+DEFAULT_TTLS = {
+    'isbn': 30 * 24 * 3600, # Editions
+    'works': 30 * 24 * 3600,
+    'authors': 90 * 24 * 3600, # Author names rarely change
+}
+# How long a 'not found' answer is remembered
+NEGATIVE_TTL = 24 * 3600
+
+class CachedResponse:
+    """
+    A response read from the cache.
+    Attributes:
+        data (dict or None): The decoded JSON, or None for a cached 'not found'.
+        found (bool): False if the server answered 404.
+        fresh (bool): False if the entry is older than its time to live. Stale entries are still useful offline.
+    """
+    __slots__ = ('data', 'found', 'fresh')
+
+    def __init__(self, data, found, fresh):
+        self.data = data
+        self.found = found
+        self.fresh = fresh
+
+
+class ResponseCache:
+    """
+    Persistent cache of Open Library JSON responses in an SQLite file, keyed by resource path
+    ('/isbn/...', '/works/...', '/authors/...'). Each kind of resource has its own time to live, 404 answers are
+    cached for a shorter time, and the cache is kept under a size cap by evicting the least recently used entries.
+    Expired entries are kept until evicted, so previously seen books can still be looked up offline.
+    Safe to use from several threads.
+    """
+    def __init__(self, path='openlibrary_cache.db', ttls=None, negative_ttl=NEGATIVE_TTL, max_bytes=20 * 1024 * 1024):
+        """
+        Args:
+            path (str): Path of the cache database.
+            ttls (dict): Time to live in seconds by resource kind ('isbn', 'works', 'authors'). Defaults to DEFAULT_TTLS.
+            negative_ttl (int): Time to live in seconds of cached 'not found' answers.
+            max_bytes (int): Size cap for the cached response bodies.
+        """
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    path TEXT PRIMARY KEY,
+                    body TEXT, -- NULL for a cached 404
+                    expires REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+            self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, path):
+        """
+        Looks up a cached response and marks it as recently used.
+        Args:
+            path (str): The resource path, e.g. '/authors/OL34184A.json'.
+        Returns:
+            CachedResponse or None: The cached response, fresh or stale, or None if it isn't cached.
+        """
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT body, expires FROM responses WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE responses SET last_used = ? WHERE path = ?", (now, path))
+        body, expires = row
+        return CachedResponse(json.loads(body) if body is not None else None, body is not None, now < expires)
+
+    def put(self, path, data):
+        """
+        Stores a successful response.
+        Args:
+            path (str): The resource path.
+            data (dict): The decoded JSON.
+        """
+        self._store(path, json.dumps(data, separators=(',', ':')), self._ttl(path))
+
+    def put_not_found(self, path):
+        """
+        Remembers that the server answered 404 for a resource.
+        """
+        self._store(path, None, self.negative_ttl)
+
+    def clear(self):
+        """
+        Removes every cached response.
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+            self.total_bytes = 0
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _ttl(self, path):
+        """
+        Returns the time to live for a resource path, based on its kind.
+        """
+        kind = path.strip('/').split('/', 1)[0]
+        return self.ttls.get(kind, min(self.ttls.values()))
+
+    def _store(self, path, body, ttl):
+        now = time.time()
+        size = len(path) + (len(body) if body is not None else 0)
+        with self.lock, self.connection:
+            old = self.connection.execute("SELECT size FROM responses WHERE path = ?", (path,)).fetchone()
+            self.connection.execute("INSERT OR REPLACE INTO responses (path, body, expires, last_used, size) VALUES (?, ?, ?, ?, ?)",
+                (path, body, now + ttl, now, size))
+            self.total_bytes += size - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Deletes the least recently used entries until the cache is within 90% of its size cap.
+        Must be called with the lock held, inside a transaction.
+        """
+        target = self.max_bytes * 0.9
+        rows = self.connection.execute("SELECT path, size FROM responses ORDER BY last_used")
+        evicted = []
+        for path, size in rows:
+            if self.total_bytes <= target:
+                break
+            evicted.append((path,))
+            self.total_bytes -= size
+        self.connection.executemany("DELETE FROM responses WHERE path = ?", evicted)
@@ -0,0 +1,165 @@
+import time
+import threading
+from tracing import tracer
+
+class BackgroundSaver:
+    """
+    Writes changes to a storage backend on a background thread, so the UI never waits for the disk.
+    Changes that arrive in a burst are coalesced: the writer waits until no new change has arrived for a short
+    debounce window (or a maximum delay has passed) and then does a single write. A later full save replaces any
+    earlier pending one, and several changes to the same book only write its latest version.
+    Book lists passed to save_all are copied, but the Book objects themselves are not, so callers must replace a
+    book with a new Book when it changes rather than modify it in place.
+    """
+    def __init__(self, store, delay=0.5, max_delay=2.0):
+        """
+        Args:
+            store: The storage backend to write to, as returned by storage.open_store.
+            delay (float): Seconds without new changes to wait before writing.
+            max_delay (float): Maximum seconds a change can wait during a continuous burst of changes.
+        """
+        self.store = store
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self.condition = threading.Condition()
+        self.snapshot = None # Pending full save as (books, settings)
+        self.records = {} # Pending per-record writes: book_id -> Book, or None for a deleted book
+        self.settings = None # Pending settings
+        self.first_change = None # time.monotonic() of the oldest pending change
+        self.last_change = None # time.monotonic() of the newest pending change
+        self.writing = False
+        self.flush_requested = False
+        self.stopping = False
+        self.write_count = 0
+
+        self.thread = threading.Thread(target=self._run, name='background-saver', daemon=True)
+        self.thread.start()
+
+    def save_all(self, books, settings):
+        """
+        Queues a full save of the collection and settings, replacing any other pending changes.
+        Args:
+            books (list): List of Book objects. The list is copied, so it can keep changing afterwards.
+            settings (dict): Settings saved next to the books.
+        """
+        with self.condition:
+            self.snapshot = (list(books), dict(settings))
+            self.records = {}
+            self.settings = None
+            self._changed()
+
+    def upsert_book(self, book):
+        """
+        Queues a write of a single added or edited book. Needs a store with per-record writes.
+        """
+        with self.condition:
+            self.records[book.id] = book
+            self._changed()
+
+    def delete_book(self, book_id):
+        """
+        Queues the deletion of a single book. Needs a store with per-record writes.
+        """
+        with self.condition:
+            self.records[book_id] = None
+            self._changed()
+
+    def save_settings(self, settings):
+        """
+        Queues a write of the settings. Needs a store with per-record writes.
+        """
+        with self.condition:
+            self.settings = dict(settings)
+            self._changed()
+
+    def flush(self, timeout=None):
+        """
+        Writes pending changes right away and waits until they are on disk.
+        Args:
+            timeout (float): Optional maximum number of seconds to wait.
+        Returns:
+            bool: True if everything was written, False if the timeout passed first.
+        """
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            return self.condition.wait_for(lambda: not self._has_pending() and not self.writing, timeout)
+
+    def close(self, timeout=None):
+        """
+        Writes pending changes and stops the background thread.
+        """
+        self.flush(timeout)
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+    def _changed(self):
+        """
+        Records the time of a change and wakes the writer. Must be called with the condition held.
+        """
+        now = time.monotonic()
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+        self.condition.notify_all()
+
+    def _has_pending(self):
+        return self.snapshot is not None or bool(self.records) or self.settings is not None
+
+    def _run(self):
+        """
+        Background thread function that waits for changes, debounces them and writes them.
+        """
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self._has_pending() or self.stopping)
+                if not self._has_pending():
+                    return # Stopping with nothing left to write
+
+                # Wait for the burst of changes to end
+                while not self.flush_requested and not self.stopping:
+                    wake = min(self.last_change + self.delay, self.first_change + self.max_delay)
+                    remaining = wake - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+                snapshot, records, settings = self.snapshot, self.records, self.settings
+                self.snapshot, self.records, self.settings = None, {}, None
+                self.first_change = self.last_change = None
+                self.writing = True
+
+            self._write(snapshot, records, settings)
+
+            with self.condition:
+                self.writing = False
+                self.write_count += 1
+                if not self._has_pending():
+                    self.flush_requested = False
+                self.condition.notify_all()
+
+    def _write(self, snapshot, records, settings):
+        """
+        Writes one batch of coalesced changes to the store. Errors are reported and the batch is dropped.
+        """
+        path = self.store.path
+        try:
+            with tracer.span('BackgroundSaver._write', 'io', {'records': len(records), 'full_save': snapshot is not None}):
+                if snapshot is not None:
+                    books, snapshot_settings = snapshot
+                    self.store.save_all(books, snapshot_settings)
+                    print(f"Saved {len(books)} books and settings to {path}")
+                for book_id, book in records.items():
+                    if book is None:
+                        self.store.delete_book(book_id)
+                    else:
+                        self.store.upsert_book(book)
+                if records:
+                    print(f"Saved {len(records)} changed books to {path}")
+                if settings is not None:
+                    self.store.save_settings(settings)
+        except Exception as e:
+            print(f"Error saving books to {path}: {e}")
@@ -0,0 +1,126 @@
+import re
+import sys
+import unicodedata
+from bisect import bisect_left, insort
+
+# Words are runs of letters and digits
+WORD_PATTERN = re.compile(r'\w+')
+# Sorts after every character, used to find the end of a prefix range in the vocabulary
+MAX_CHAR = '\U0010ffff'
+
+class SearchIndex:
+    """
+    In-memory inverted index over the titles and authors of the books, for search-as-you-type.
+    Every word maps to the set of books containing it, and the vocabulary is kept sorted, so the words starting
+    with a typed prefix are a single range found with a binary search. A query only touches the books containing
+    its words instead of scanning the whole collection. Books are added, updated and removed individually,
+    so the index never needs rebuilding as the collection changes.
+    Matching ignores case and accents. A query matches a book when every query word is the start of a word in
+    its title or author, so 'har pot' finds 'Harry Potter' while it is being typed.
+    """
+    def __init__(self):
+        self.postings = {} # word -> set of book IDs
+        self.book_words = {} # book ID -> tuple of the book's distinct words, needed to update or remove it
+        self.vocabulary = [] # every indexed word, sorted
+
+    def __len__(self):
+        return len(self.book_words)
+
+    def add(self, book):
+        """
+        Indexes a book, replacing the entry of any book with the same ID.
+        Args:
+            book (Book): The book to index. It must have an ID.
+        """
+        words = set(tokenize(f"{book.title} {book.author}"))
+        old_words = self.book_words.get(book.id)
+        if old_words is not None:
+            if words == set(old_words):
+                return # Title and author didn't change
+            self.remove(book.id)
+        self.book_words[book.id] = tuple(words)
+        postings = self.postings
+        for word in words:
+            ids = postings.get(word)
+            if ids is None:
+                postings[word] = {book.id}
+                insort(self.vocabulary, word)
+            else:
+                ids.add(book.id)
+
+    def add_many(self, books):
+        """
+        Indexes several books, e.g. the collection at startup.
+        """
+        for book in books:
+            self.add(book)
+
+    def remove(self, book_id):
+        """
+        Removes a book from the index. Unknown IDs are ignored.
+        """
+        words = self.book_words.pop(book_id, None)
+        if words is None:
+            return
+        postings = self.postings
+        for word in words:
+            ids = postings[word]
+            ids.discard(book_id)
+            if not ids:
+                del postings[word]
+                del self.vocabulary[bisect_left(self.vocabulary, word)]
+
+    def clear(self):
+        self.postings.clear()
+        self.book_words.clear()
+        self.vocabulary.clear()
+
+    def search(self, query):
+        """
+        Finds the books that have a word starting with each word of a query.
+        Args:
+            query (str): The search text.
+        Returns:
+            set or None: IDs of the matching books, or None for an empty query (everything matches).
+        """
+        prefixes = set(tokenize(query))
+        if not prefixes:
+            return None
+        vocabulary, postings = self.vocabulary, self.postings
+        result = None
+        # Longer prefixes match fewer books, so start with them to keep the intermediate results small
+        for prefix in sorted(prefixes, key=len, reverse=True):
+            start = bisect_left(vocabulary, prefix)
+            end = bisect_left(vocabulary, prefix + MAX_CHAR, start)
+            if start == end:
+                return set()
+            if result is not None and len(result) < end - start:
+                # Fewer books left than words to merge, checking the books directly is cheaper
+                book_words = self.book_words
+                result = {book_id for book_id in result if any(word.startswith(prefix) for word in book_words[book_id])}
+            else:
+                matches = set().union(*[postings[word] for word in vocabulary[start:end]])
+                result = matches if result is None else result & matches
+            if not result:
+                break
+        return result
+
+
+def normalize_text(text):
+    """
+    Lower-cases text and removes accents, so 'Émile' and 'emile' are treated the same.
+    """
+    if not text:
+        return ''
+    text = text.casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """
+    Splits text into normalized words. Words are interned, since the same words appear in many books.
+    """
+    return [sys.intern(word) for word in WORD_PATTERN.findall(normalize_text(text))]
@@ -0,0 +1,182 @@
+from bisect import bisect_left
+from operator import itemgetter
+from search_index import normalize_text
+
+# Sort modes shown in the sort menu, in order. 'added' is the order books were added in, which needs no index.
+SORT_MODES = {
+    'added': "Date added",
+    'title': "Title",
+    'author': "Author",
+    'percent': "Percent complete",
+    'remaining': "Pages remaining",
+    'updated': "Recently updated",
+}
+
+def _title_key(book):
+    return normalize_text(book.title)
+
+def _author_key(book):
+    return (normalize_text(book.author), normalize_text(book.title))
+
+def _percent_key(book):
+    return book.percentage
+
+def _remaining_key(book):
+    """
+    Pages left to read, or None for books tracked by chapters or without a page count.
+    """
+    if book.track_chapters or book.total_pages is None:
+        return None
+    return max(book.total_pages - (book.current_progress or 0), 0)
+
+def _updated_key(book):
+    # Oldest first when ascending, like the other modes. The app switches to descending when this mode is chosen.
+    return book.updated
+
+# Sort key of each mode. A key of None means the value is unknown, and the book is listed last.
+SORT_KEYS = {
+    'title': _title_key,
+    'author': _author_key,
+    'percent': _percent_key,
+    'remaining': _remaining_key,
+    'updated': _updated_key,
+}
+
+
+class SortIndex:
+    """
+    The books in the order of one sort key, kept sorted as books change.
+    Entries are (key, book ID) pairs in a sorted list, so adding, updating or removing a book is a binary search
+    and a single insert or delete rather than a sort of the whole collection. A parallel list holds the Book of
+    each entry, so the sorted books can be read out with a single list copy. Ties are broken by book ID, which
+    keeps the order stable. Books whose key is unknown are kept apart and listed last in either direction.
+    """
+    def __init__(self, key):
+        """
+        Args:
+            key (callable): Returns the sort key of a book, or None if it is unknown.
+        """
+        self.key = key
+        self.entries = [] # Sorted (key, book ID) pairs
+        self.books = [] # The Book of each entry, at the same position
+        self.entry_by_id = {} # book ID -> its entry in 'entries', or None if its key is unknown
+        self.unknown = {} # book ID -> Book for books with an unknown key, in the order they were added
+
+    def add(self, book):
+        """
+        Adds a book, or moves it to its new position if it is already in the index.
+        """
+        key = self.key(book)
+        entry = None if key is None else (key, book.id)
+        if book.id in self.entry_by_id:
+            if self.entry_by_id[book.id] == entry:
+                # Still in the right place, only the Book object is new
+                if entry is None:
+                    self.unknown[book.id] = book
+                else:
+                    self.books[bisect_left(self.entries, entry)] = book
+                return
+            self.remove(book.id)
+        self.entry_by_id[book.id] = entry
+        if entry is None:
+            self.unknown[book.id] = book
+        else:
+            position = bisect_left(self.entries, entry)
+            self.entries.insert(position, entry)
+            self.books.insert(position, book)
+
+    def add_many(self, books):
+        """
+        Adds several books, e.g. to build the index. Faster than adding them one at a time.
+        """
+        new_pairs = []
+        for book in books:
+            if book.id in self.entry_by_id:
+                self.add(book)
+                continue
+            key = self.key(book)
+            entry = None if key is None else (key, book.id)
+            self.entry_by_id[book.id] = entry
+            if entry is None:
+                self.unknown[book.id] = book
+            else:
+                new_pairs.append((entry, book))
+        if len(new_pairs) < len(self.entries) // 8:
+            # A few books into a large index, e.g. a streamed chunk: insert each at its place
+            for entry, book in new_pairs:
+                position = bisect_left(self.entries, entry)
+                self.entries.insert(position, entry)
+                self.books.insert(position, book)
+        elif new_pairs:
+            # Sorting merges the new entries with the sorted run already there
+            pairs = list(zip(self.entries, self.books)) + new_pairs
+            pairs.sort(key=itemgetter(0))
+            self.entries = [entry for entry, _ in pairs]
+            self.books = [book for _, book in pairs]
+
+    def remove(self, book_id):
+        """
+        Removes a book. Unknown IDs are ignored.
+        """
+        if book_id not in self.entry_by_id:
+            return
+        entry = self.entry_by_id.pop(book_id)
+        if entry is None:
+            del self.unknown[book_id]
+        else:
+            position = bisect_left(self.entries, entry)
+            del self.entries[position]
+            del self.books[position]
+
+    def sorted_books(self, descending=False):
+        """
+        Returns the books in sorted order, followed by the books with an unknown key.
+        """
+        ordered = self.books[::-1] if descending else self.books[:]
+        ordered.extend(self.unknown.values())
+        return ordered
+
+
+class BookSorter:
+    """
+    Keeps a SortIndex for each sort mode that has been used, and gives the books in the order of any mode.
+    Indexes are built the first time their mode is needed and are then updated along with the collection.
+    """
+    def __init__(self):
+        self.books = {} # book ID -> Book
+        self.indexes = {} # sort mode -> SortIndex
+
+    def add(self, book):
+        """
+        Adds a book, or updates it after it was edited (replaced with a new Book with the same ID).
+        """
+        self.books[book.id] = book
+        for index in self.indexes.values():
+            index.add(book)
+
+    def add_many(self, books):
+        for book in books:
+            self.books[book.id] = book
+        for index in self.indexes.values():
+            index.add_many(books)
+
+    def remove(self, book_id):
+        self.books.pop(book_id, None)
+        for index in self.indexes.values():
+            index.remove(book_id)
+
+    def sorted_books(self, mode, descending=False):
+        """
+        Returns the books in the order of a sort mode.
+        Args:
+            mode (str): One of the SORT_KEYS modes.
+            descending (bool): True to reverse the order. Books with an unknown key stay last.
+        Returns:
+            list: The Book objects in order.
+        """
+        index = self.indexes.get(mode)
+        if index is None:
+            index = SortIndex(SORT_KEYS[mode])
+            index.add_many(self.books.values())
+            self.indexes[mode] = index
+        return index.sorted_books(descending)
@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import threading
+import traceback
+from collections import Counter, deque
+from tracing import tracer
+
+# Stack frames in the program's own files are preferred when describing where a stall happened
+PROGRAM_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class Stall:
+    """
+    A period during which the Tk event loop didn't run, e.g. a slow refresh or save on the main thread.
+    """
+    def __init__(self, started, duration, stacks):
+        """
+        Args:
+            started (float): Unix time the stall started.
+            duration (float): Length of the stall in seconds.
+            stacks (list): (stack, number of samples) of the main thread during the stall, most sampled first.
+                Each stack is a tuple of (file, line number, function, source line), outermost first.
+                Empty if the stall was too short to be sampled.
+        """
+        self.started = started
+        self.duration = duration
+        self.stacks = stacks
+
+    @property
+    def location(self):
+        """
+        Where the main thread spent the stall: the innermost frame of the program's own code in the most sampled
+        stack, e.g. 'main.py:712 in _refresh_book_display'.
+        """
+        if not self.stacks:
+            return "(not sampled)"
+        frames = self.stacks[0][0]
+        own_frames = [frame for frame in frames if frame[0].startswith(PROGRAM_DIR)]
+        filename, lineno, name, _ = (own_frames or frames)[-1]
+        return f"{os.path.basename(filename)}:{lineno} in {name}"
+
+
+def format_stack(stack):
+    """
+    Formats a sampled stack like a traceback, outermost call first.
+    """
+    return ''.join(traceback.format_list(traceback.StackSummary.from_list(stack)))
+
+
+class StallMonitor:
+    """
+    Watchdog for freezes of the Tk main thread.
+    A heartbeat is scheduled with root.after every 'interval' milliseconds, and the lag between when it was due and
+    when it ran is how long the event loop was blocked. A helper thread watches the heartbeat: once it is more than
+    'threshold' milliseconds late, the helper samples the main thread's Python stack with sys._current_frames until
+    the heartbeat runs again, so the stall is recorded together with the code that caused it.
+    The most recent stalls are kept in a rolling log.
+    """
+    def __init__(self, root, interval=100, threshold=200, sample_interval=0.01, max_stalls=100, max_samples=500):
+        """
+        Args:
+            root (tk.Tk): The root window, whose event loop is watched.
+            interval (int): Milliseconds between heartbeats.
+            threshold (int): Lag in milliseconds that counts as a stall.
+            sample_interval (float): Seconds between stack samples during a stall.
+            max_stalls (int): Number of stalls kept in the log, older ones are dropped.
+            max_samples (int): Stack samples taken per stall at most, so a very long stall doesn't grow without bound.
+        """
+        self.root = root
+        self.interval = interval / 1000
+        self.threshold = threshold / 1000
+        self.sample_interval = sample_interval
+        self.max_samples = max_samples
+        self.stalls = deque(maxlen=max_stalls) # Stall objects, oldest first
+        self.main_thread_id = threading.get_ident()
+
+        self.lock = threading.Lock() # Guards samples
+        self.samples = [] # Stacks sampled during the current stall, as tuples of (file, line number, function, source line)
+        self.next_beat = None # perf_counter time the next heartbeat is due
+        self.after_id = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """
+        Starts the heartbeat and the sampling thread. Must be called from the main thread.
+        """
+        self.main_thread_id = threading.get_ident()
+        self.next_beat = time.perf_counter() + self.interval
+        self.after_id = self.root.after(int(self.interval * 1000), self._beat)
+        self.thread = threading.Thread(target=self._watch, name='stall-monitor', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.after_id is not None:
+            try:
+                self.root.after_cancel(self.after_id)
+            except Exception:
+                pass # The window is already gone
+            self.after_id = None
+
+    def worst(self, count=10):
+        """
+        Returns the longest stalls in the log, longest first.
+        """
+        return sorted(self.stalls, key=lambda stall: stall.duration, reverse=True)[:count]
+
+    def _beat(self):
+        """
+        Heartbeat on the main thread. Records a stall if it ran more than the threshold late.
+        """
+        now = time.perf_counter()
+        lag = now - self.next_beat
+        if lag > self.threshold:
+            with self.lock:
+                samples, self.samples = self.samples, []
+            self._record_stall(now - lag, lag, samples)
+        elif self.samples:
+            with self.lock:
+                self.samples = [] # Sampled just before the heartbeat ran, not a stall after all
+        self.next_beat = now + self.interval
+        if not self.stopped.is_set():
+            self.after_id = self.root.after(int(self.interval * 1000), self._beat)
+
+    def _record_stall(self, started, duration, samples):
+        """
+        Adds a stall to the log, grouping identical stack samples.
+        Args:
+            started (float): perf_counter time the stall started.
+            duration (float): Length in seconds.
+            samples (list): Stacks sampled during the stall.
+        """
+        stacks = Counter(samples).most_common()
+        stall = Stall(time.time() - (time.perf_counter() - started), duration, stacks)
+        self.stalls.append(stall)
+        if tracer.enabled:
+            tracer.record('stall', 'watchdog', int(started * 1e9), int((started + duration) * 1e9))
+        print(f"Main thread stalled for {duration * 1000:.0f} ms at {stall.location}")
+
+    def _watch(self):
+        """
+        Helper thread: samples the main thread's stack while the heartbeat is overdue.
+        """
+        while not self.stopped.wait(self.sample_interval):
+            next_beat = self.next_beat
+            if next_beat is None or time.perf_counter() - next_beat <= self.threshold:
+                continue
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is None:
+                continue
+            stack = tuple((f.filename, f.lineno, f.name, f.line) for f in traceback.extract_stack(frame))
+            del frame
+            with self.lock:
+                if len(self.samples) < self.max_samples:
+                    self.samples.append(stack)
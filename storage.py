@@ -0,0 +1,630 @@
+import os
+import json
+import sqlite3
+import struct
+import sys
+import threading
+from models import Book, BOOK_FIELDS
+
+def open_store(kind, json_path='books.json', sqlite_path='books.db', indexed_path='books.bmk'):
+    """
+    Creates the storage backend for the collection.
+    Args:
+        kind (str): 'json' for the single books.json file, 'journal' for books.json plus a change journal,
+            'sqlite' for the SQLite database, 'indexed' for the fast-start indexed file.
+        json_path (str): Path of the JSON data file.
+        sqlite_path (str): Path of the SQLite database. Migrated from json_path on first use.
+        indexed_path (str): Path of the indexed file. Converted from json_path on first use.
+    Returns:
+        JsonStore, JournaledJsonStore, SqliteStore or IndexedStore: The storage backend.
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    if kind == 'json':
+        return JsonStore(json_path)
+    if kind == 'journal':
+        return JournaledJsonStore(json_path)
+    if kind == 'sqlite':
+        return SqliteStore(sqlite_path, migrate_from=json_path)
+    if kind == 'indexed':
+        return IndexedStore(indexed_path, migrate_from=json_path)
+    raise ValueError(f"Unknown storage backend '{kind}'")
+
+def number_books(books):
+    """
+    Gives books without an ID (from files saved before IDs existed) one, numbered in list order
+    after the highest existing ID.
+    Args:
+        books (list): List of Book objects.
+    """
+    next_id = max((book.id for book in books if isinstance(book.id, int)), default=0) + 1
+    for book in books:
+        if not isinstance(book.id, int):
+            book.id = next_id
+            next_id += 1
+
+def write_json_atomic(path, data, indent=4):
+    """
+    Writes JSON to a file so that readers see either the old or the new file, never a half-written one.
+    The data is written to a temporary file, flushed to disk and then renamed over the original.
+    Args:
+        path (str): The file to write.
+        data: The JSON-serializable data.
+        indent (int): Indentation passed to json.dump.
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class JsonStore:
+    """
+    Stores the whole collection and settings in a single JSON file: {'books': [...], 'theme': ...}.
+    Every save rewrites the file, so it has no per-record writes.
+    """
+    supports_record_writes = False
+    supports_lazy_load = False
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        """
+        Returns True if the data file exists.
+        """
+        return os.path.exists(self.path)
+
+    def load(self):
+        """
+        Reads the collection from the file.
+        Returns:
+            tuple: (list of Book objects, settings dict).
+        Raises:
+            json.JSONDecodeError: If the file is corrupted.
+            OSError: If the file can't be read.
+        """
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        books = [Book.from_dict(book) for book in data.pop('books', [])]
+        return books, data
+
+    def save_all(self, books, settings):
+        """
+        Writes the whole collection and settings to the file.
+        Args:
+            books (list): List of Book objects.
+            settings (dict): Settings saved next to the books, e.g. {'theme': 'dark'}.
+        """
+        data_to_save = {'books': [book.to_dict() for book in books]}
+        data_to_save.update(settings)
+        write_json_atomic(self.path, data_to_save)
+
+    def close(self):
+        pass
+
+
+class JournaledJsonStore(JsonStore):
+    """
+    Keeps books.json as a snapshot and appends each add, edit, delete or settings change to a journal
+    file next to it ('books.json.journal', one JSON record per line), so a change only writes a few hundred bytes.
+    Loading replays the journal over the snapshot. Once the journal grows past a size threshold, a background
+    thread compacts it into a new snapshot, written atomically.
+    """
+    supports_record_writes = True
+
+    def __init__(self, path, compact_threshold=256 * 1024):
+        """
+        Args:
+            path (str): Path of the snapshot file.
+            compact_threshold (int): Journal size in bytes at which a compaction is started.
+        """
+        super().__init__(path)
+        self.journal_path = path + '.journal'
+        # While compacting, the old journal is moved here so new changes can go to a fresh journal
+        self.compacting_path = path + '.journal.compacting'
+        self.compact_threshold = compact_threshold
+        self.lock = threading.Lock() # Guards journal appends and rotation
+        self.compaction_thread = None
+
+    def exists(self):
+        """
+        Returns True if the snapshot or a journal exists.
+        """
+        return any(os.path.exists(p) for p in (self.path, self.journal_path, self.compacting_path))
+
+    def load(self):
+        """
+        Reads the snapshot and replays the journal over it.
+        A snapshot saved before books had IDs is numbered and rewritten first, so that later journal records,
+        which refer to books by ID, match the books in the snapshot.
+        Returns:
+            tuple: (list of Book objects, settings dict).
+        """
+        with self.lock:
+            self._truncate_partial_record()
+            books, settings = self._replay()
+        if any(book.id is None for book in books):
+            number_books(books)
+            self.save_all(books, settings) # The journals were replayed into books, so they can be removed
+            print(f"Numbered the books in {self.path}")
+        return books, settings
+
+    def save_all(self, books, settings):
+        """
+        Writes a full snapshot atomically and starts a new, empty journal.
+        """
+        self.wait_for_compaction()
+        with self.lock:
+            super().save_all(books, settings)
+            for journal in (self.compacting_path, self.journal_path):
+                if os.path.exists(journal):
+                    os.remove(journal)
+
+    def upsert_book(self, book):
+        """
+        Records an added or edited book in the journal.
+        """
+        self._append({'op': 'upsert', 'book': book.to_dict()})
+
+    def delete_book(self, book_id):
+        """
+        Records a deleted book in the journal.
+        """
+        self._append({'op': 'delete', 'id': book_id})
+
+    def save_settings(self, settings):
+        """
+        Records changed settings in the journal.
+        """
+        self._append({'op': 'settings', 'settings': settings})
+
+    def wait_for_compaction(self):
+        """
+        Blocks until a running compaction has finished.
+        """
+        thread = self.compaction_thread
+        if thread:
+            thread.join()
+
+    def close(self):
+        self.wait_for_compaction()
+
+    def _append(self, record):
+        """
+        Appends one change record to the journal and starts a compaction if the journal is too large.
+        """
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self.lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+                journal_size = f.tell()
+            if journal_size < self.compact_threshold or self.compaction_thread is not None:
+                return
+            # Move the journal aside, new changes go to a fresh journal while the old one is compacted
+            os.replace(self.journal_path, self.compacting_path)
+            self.compaction_thread = threading.Thread(target=self._compact, name='journal-compaction', daemon=True)
+            self.compaction_thread.start()
+
+    def _compact(self):
+        """
+        Background thread function that folds the moved-aside journal into a new snapshot.
+        If the program stops part way, the next load replays the moved-aside journal again, which is harmless
+        because replaying the same changes twice gives the same result.
+        """
+        try:
+            books, settings = self._replay(include_current=False)
+            JsonStore.save_all(self, books, settings)
+            os.remove(self.compacting_path)
+            print(f"Compacted journal into {self.path}")
+        except Exception as e:
+            print(f"Error compacting journal into {self.path}: {e}")
+        finally:
+            self.compaction_thread = None
+
+    def _replay(self, include_current=True):
+        """
+        Builds the collection from the snapshot and the journals.
+        Args:
+            include_current (bool): False to leave out the current journal (used while compacting).
+        Returns:
+            tuple: (list of Book objects, settings dict).
+        """
+        books, settings = JsonStore.load(self) if os.path.exists(self.path) else ([], {})
+        books_by_id = {}
+        for book in books:
+            books_by_id[book.id if book.id is not None else ('unnumbered', len(books_by_id))] = book
+        journals = [self.compacting_path] + ([self.journal_path] if include_current else [])
+        for journal in journals:
+            for record in self._read_journal(journal):
+                if record['op'] == 'upsert':
+                    book = Book.from_dict(record['book'])
+                    books_by_id[book.id] = book # Edits keep their position
+                elif record['op'] == 'delete':
+                    books_by_id.pop(record['id'], None)
+                elif record['op'] == 'settings':
+                    settings.update(record['settings'])
+        return list(books_by_id.values()), settings
+
+    def _truncate_partial_record(self):
+        """
+        Cuts a partly written last record off the journal, so new records aren't appended to the end of it.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+                print(f"Removed incomplete journal record from {self.journal_path}")
+
+    def _read_journal(self, journal):
+        """
+        Yields the change records of a journal file.
+        A last line that was only partly written, e.g. because the program stopped during a write, is skipped.
+        """
+        if not os.path.exists(journal):
+            return
+        with open(journal, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping incomplete journal record in {journal}")
+
+
+class SqliteStore:
+    """
+    Stores the collection in an SQLite database with one row per book, so a change only writes that row.
+    Books are indexed by title, author and completion for queries, and settings go in a key/value table.
+    On first use, books and settings from an existing books.json file are migrated into the database.
+    The connection is shared between threads and guarded by a lock.
+    """
+    supports_record_writes = True
+    supports_lazy_load = False
+
+    def __init__(self, path, migrate_from=None):
+        """
+        Args:
+            path (str): Path of the database file. Created if it doesn't exist.
+            migrate_from (str): Optional path of a JSON data file to import on first use.
+        """
+        self.path = path
+        self.migrate_from = migrate_from
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        """
+        Creates the tables and indexes if they don't exist yet.
+        """
+        with self.lock, self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS books (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL COLLATE NOCASE,
+                    author TEXT NOT NULL COLLATE NOCASE,
+                    image_path TEXT,
+                    track_chapters INTEGER NOT NULL DEFAULT 0,
+                    total_pages INTEGER,
+                    current_progress INTEGER,
+                    total_chapters INTEGER,
+                    current_chapter INTEGER,
+                    updated REAL,
+                    progress REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_books_title ON books (title);
+                CREATE INDEX IF NOT EXISTS idx_books_author ON books (author);
+                CREATE INDEX IF NOT EXISTS idx_books_progress ON books (progress);
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+            # Databases created before books had an update time
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(books)")]
+            if 'updated' not in columns:
+                self.connection.execute("ALTER TABLE books ADD COLUMN updated REAL")
+
+    def exists(self):
+        """
+        Returns True if the database holds data, or there is a JSON file to migrate.
+        """
+        with self.lock:
+            has_rows = self.connection.execute("SELECT EXISTS (SELECT 1 FROM books) OR EXISTS (SELECT 1 FROM settings)").fetchone()[0]
+        return bool(has_rows) or bool(self.migrate_from and os.path.exists(self.migrate_from))
+
+    def load(self):
+        """
+        Reads the collection from the database, migrating the JSON file first if this is the first run.
+        Returns:
+            tuple: (list of Book objects in the order they were added, settings dict).
+        """
+        self._migrate_json()
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT id, {', '.join(BOOK_FIELDS)} FROM books ORDER BY id").fetchall()
+            settings = dict(self.connection.execute("SELECT key, value FROM settings").fetchall())
+        settings.pop('json_migrated', None)
+        settings = {key: json.loads(value) for key, value in settings.items()}
+        return [self._row_to_book(row) for row in rows], settings
+
+    def save_all(self, books, settings):
+        """
+        Makes the database match the given collection and settings in a single transaction.
+        Args:
+            books (list): List of Book objects, each with an ID.
+            settings (dict): Settings to store.
+        """
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id INTEGER PRIMARY KEY)")
+            self.connection.execute("DELETE FROM keep_ids")
+            self.connection.executemany("INSERT INTO keep_ids (id) VALUES (?)", ((book.id,) for book in books))
+            self.connection.execute("DELETE FROM books WHERE id NOT IN (SELECT id FROM keep_ids)")
+            self.connection.executemany(self._upsert_sql(), (self._book_to_row(book) for book in books))
+            self._write_settings(settings)
+
+    def upsert_book(self, book):
+        """
+        Inserts or updates a single book.
+        Args:
+            book (Book): The book, with an ID.
+        """
+        with self.lock, self.connection:
+            self.connection.execute(self._upsert_sql(), self._book_to_row(book))
+
+    def delete_book(self, book_id):
+        """
+        Deletes a single book.
+        Args:
+            book_id (int): The ID of the book.
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM books WHERE id = ?", (book_id,))
+
+    def save_settings(self, settings):
+        """
+        Stores the settings, e.g. {'theme': 'dark'}.
+        """
+        with self.lock, self.connection:
+            self._write_settings(settings)
+
+    def query_books(self, title=None, author=None, min_progress=None, max_progress=None, order_by='id'):
+        """
+        Finds books using the database indexes.
+        Args:
+            title (str): Optional title prefix, case-insensitive.
+            author (str): Optional author prefix, case-insensitive.
+            min_progress (float), max_progress (float): Optional completion range between 0 and 1.
+            order_by (str): 'id', 'title', 'author' or 'progress'.
+        Returns:
+            list: Matching Book objects.
+        Raises:
+            ValueError: If order_by is not a known column.
+        """
+        if order_by not in ('id', 'title', 'author', 'progress'):
+            raise ValueError(f"Can't order books by '{order_by}'")
+        conditions, params = [], []
+        if title:
+            conditions.append("title LIKE ? ESCAPE '\\'")
+            params.append(self._prefix_pattern(title))
+        if author:
+            conditions.append("author LIKE ? ESCAPE '\\'")
+            params.append(self._prefix_pattern(author))
+        if min_progress is not None:
+            conditions.append("progress >= ?")
+            params.append(min_progress)
+        if max_progress is not None:
+            conditions.append("progress <= ?")
+            params.append(max_progress)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT id, {', '.join(BOOK_FIELDS)} FROM books {where} ORDER BY {order_by}", params).fetchall()
+        return [self._row_to_book(row) for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _migrate_json(self):
+        """
+        Imports books and settings from the JSON data file once, the first time the database is loaded.
+        """
+        if not self.migrate_from or not os.path.exists(self.migrate_from):
+            return
+        with self.lock:
+            migrated = self.connection.execute("SELECT 1 FROM settings WHERE key = 'json_migrated'").fetchone()
+        if migrated:
+            return
+        books, settings = JsonStore(self.migrate_from).load()
+        number_books(books)
+        self.save_all(books, settings)
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('json_migrated', '1')")
+        print(f"Migrated {len(books)} books from {self.migrate_from} to {self.path}")
+
+    def _write_settings(self, settings):
+        self.connection.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            ((key, json.dumps(value)) for key, value in settings.items()))
+
+    def _upsert_sql(self):
+        columns = ['id'] + BOOK_FIELDS + ['progress']
+        updates = ', '.join(f"{column} = excluded.{column}" for column in columns[1:])
+        return (f"INSERT INTO books ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}")
+
+    def _book_to_row(self, book):
+        return (book.id,) + tuple(getattr(book, field) for field in BOOK_FIELDS) + (book.fraction,)
+
+    def _row_to_book(self, row):
+        return Book(*row[1:], id=row[0])
+
+    def _prefix_pattern(self, text):
+        escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped + '%'
+
+
+# First bytes of an indexed collection file, including a format version
+INDEXED_MAGIC = b'BMKPY\x00\x01\n'
+# Index entry: absolute offset (8 bytes) and length (4 bytes) of a record, little-endian
+INDEX_ENTRY = struct.Struct('<QI')
+HEADER_LENGTH = struct.Struct('<I')
+
+class IndexedStore:
+    """
+    Stores the collection in a file laid out for fast startup:
+        magic bytes | header length | header JSON (settings, count, max_id) | offset index | one JSON blob per book
+    The header and index are small, so the first screenful of books can be read without parsing the rest of the
+    file, and the remaining books can then be streamed in chunks. Every save rewrites the file atomically.
+    """
+    supports_record_writes = False
+    supports_lazy_load = True
+
+    def __init__(self, path, migrate_from=None):
+        """
+        Args:
+            path (str): Path of the indexed file.
+            migrate_from (str): Optional path of a JSON data file to convert if the indexed file doesn't exist yet.
+        """
+        self.path = path
+        self.migrate_from = migrate_from
+
+    def exists(self):
+        """
+        Returns True if the indexed file exists, or there is a JSON file to convert.
+        """
+        return os.path.exists(self.path) or bool(self.migrate_from and os.path.exists(self.migrate_from))
+
+    def load(self):
+        """
+        Reads the whole collection.
+        Returns:
+            tuple: (list of Book objects, settings dict).
+        """
+        books, settings, total, max_id = self.load_head(None)
+        return books, settings
+
+    def load_head(self, limit):
+        """
+        Reads the settings and the first books, without reading the rest of the file.
+        Args:
+            limit (int): Number of books to read, or None for all of them.
+        Returns:
+            tuple: (list of the first Book objects, settings dict, total number of books, highest book ID).
+        Raises:
+            ValueError: If the file isn't an indexed collection file.
+        """
+        self._convert_json()
+        with open(self.path, 'rb') as f:
+            header, index_start = self._read_header(f)
+            count = header['count'] if limit is None else min(limit, header['count'])
+            books = self._read_records(f, index_start, 0, count)
+        return books, header.get('settings', {}), header['count'], header.get('max_id', 0)
+
+    def iter_chunks(self, start, chunk_size=500):
+        """
+        Streams books from a position to the end of the file.
+        Args:
+            start (int): Index of the first book to read.
+            chunk_size (int): Number of books per chunk.
+        Yields:
+            list: The next chunk of Book objects.
+        """
+        with open(self.path, 'rb') as f:
+            header, index_start = self._read_header(f)
+            for chunk_start in range(start, header['count'], chunk_size):
+                count = min(chunk_size, header['count'] - chunk_start)
+                yield self._read_records(f, index_start, chunk_start, count)
+
+    def save_all(self, books, settings):
+        """
+        Writes the whole collection and settings atomically.
+        """
+        blobs = [json.dumps(book.to_dict(), separators=(',', ':')).encode('utf-8') for book in books]
+        header = json.dumps({
+            'settings': settings,
+            'count': len(books),
+            'max_id': max((book.id for book in books if isinstance(book.id, int)), default=0)
+        }).encode('utf-8')
+
+        # Records start right after the header and the index
+        offset = len(INDEXED_MAGIC) + HEADER_LENGTH.size + len(header) + INDEX_ENTRY.size * len(blobs)
+        index = bytearray()
+        for blob in blobs:
+            index += INDEX_ENTRY.pack(offset, len(blob))
+            offset += len(blob)
+
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(INDEXED_MAGIC)
+            f.write(HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            f.write(index)
+            for blob in blobs:
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        pass
+
+    def _read_header(self, f):
+        """
+        Reads the magic bytes and header.
+        Returns:
+            tuple: (header dict, file offset of the index).
+        """
+        if f.read(len(INDEXED_MAGIC)) != INDEXED_MAGIC:
+            raise ValueError(f"{self.path} is not a BookmarkPy indexed collection file")
+        (header_length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+        return header, len(INDEXED_MAGIC) + HEADER_LENGTH.size + header_length
+
+    def _read_records(self, f, index_start, start, count):
+        """
+        Reads a run of consecutive records with a single read, as records are stored back to back.
+        """
+        if count <= 0:
+            return []
+        f.seek(index_start + INDEX_ENTRY.size * start)
+        entries = list(INDEX_ENTRY.iter_unpack(f.read(INDEX_ENTRY.size * count)))
+        first_offset = entries[0][0]
+        f.seek(first_offset)
+        data = f.read(entries[-1][0] + entries[-1][1] - first_offset)
+        return [Book.from_dict(json.loads(data[offset - first_offset:offset - first_offset + length])) for offset, length in entries]
+
+    def _convert_json(self):
+        """
+        Converts the JSON data file the first time the indexed file is used.
+        """
+        if os.path.exists(self.path) or not self.migrate_from or not os.path.exists(self.migrate_from):
+            return
+        convert_json_to_indexed(self.migrate_from, self.path)
+
+def convert_json_to_indexed(json_path, indexed_path):
+    """
+    Converts a books.json file ({'books': [...], 'theme': ...}) to the indexed format.
+    Books without an ID are numbered in list order.
+    Args:
+        json_path (str): The JSON file to read.
+        indexed_path (str): The indexed file to write.
+    """
+    books, settings = JsonStore(json_path).load()
+    number_books(books)
+    IndexedStore(indexed_path).save_all(books, settings)
+    print(f"Converted {len(books)} books from {json_path} to {indexed_path}")
+
+if __name__ == "__main__":
+    # Usage: python storage.py convert books.json books.bmk
+    if len(sys.argv) == 4 and sys.argv[1] == 'convert':
+        convert_json_to_indexed(sys.argv[2], sys.argv[3])
+    else:
+        print("Usage: python storage.py convert <books.json> <books.bmk>")
+        sys.exit(1)
@@ -0,0 +1,20 @@
+from isbn import read_isbn_file
+
+
+def _read(tmp_path, text):
+    path = tmp_path / 'isbns.txt'
+    path.write_text(text, encoding='utf-8')
+    return read_isbn_file(str(path))
+
+
+def test_space_separated(tmp_path):
+    assert _read(tmp_path, "0140328726 0261103342\n") == (['0140328726', '0261103342'], [])
+
+
+def test_tab_separated(tmp_path):
+    assert _read(tmp_path, "9780140328721\t9780261103344\n") == (['9780140328721', '9780261103344'], [])
+
+
+def test_csv_with_hyphens_and_invalid_values(tmp_path):
+    text = 'title,isbn\n"Matilda","978-0-14-032872-1"\nThe Hobbit;0261103340\n'
+    assert _read(tmp_path, text) == (['9780140328721'], ['0261103340'])
@@ -0,0 +1,70 @@
+import gzip
+import json
+
+import pytest
+
+from isbn_index import IsbnIndex, build_isbn_index, open_isbn_index
+
+
+def _write_dump(path, records):
+    """
+    Writes records in the Open Library dump format: type, key, revision, last modified, JSON.
+    """
+    lines = [f"/type/x\t{key}\t1\t2024-01-01\t{json.dumps(record)}\n" for key, record in records]
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        f.writelines(lines)
+    return str(path)
+
+
+@pytest.fixture
+def index(tmp_path):
+    editions = _write_dump(tmp_path / 'editions.txt.gz', [
+        # The work's authors are used rather than the edition's, like the online lookup
+        ('/books/E1', {'title': 'Matilda', 'isbn_13': ['978-0-14-032872-1'], 'isbn_10': ['0140328726'],
+                       'works': [{'key': '/works/W1'}], 'authors': [{'key': '/authors/A9'}]}),
+        ('/books/E2', {'title': 'The Hobbit', 'isbn_10': ['0261103342'], 'authors': [{'key': '/authors/A2'}]}),
+        ('/books/E3', {'title': 'Harry Potter', 'isbn_13': ['9780747532699'], 'works': [{'key': '/works/W3'}]}),
+        ('/books/E4', {'title': 'Invalid ISBN', 'isbn_10': ['0261103340']}),
+    ])
+    works = _write_dump(tmp_path / 'works.txt', [
+        ('/works/W1', {'authors': [{'author': {'key': '/authors/A1'}}, {'author': {'key': '/authors/A3'}}]}),
+        ('/works/W3', {'authors': [{'author': {'key': '/authors/A404'}}]}),
+    ])
+    authors = _write_dump(tmp_path / 'authors.txt', [
+        ('/authors/A1', {'name': 'Roald Dahl'}),
+        ('/authors/A2', {'name': 'J. R. R. Tolkien'}),
+        ('/authors/A3', {'name': 'Quentin\x1fBlake'}),
+    ])
+    path = str(tmp_path / 'isbn_index.bin')
+    assert build_isbn_index(editions, works, authors, path, temp_dir=str(tmp_path)) == 3
+    index = IsbnIndex(path)
+    yield index
+    index.close()
+
+
+def test_lookup_by_isbn13_and_isbn10(index):
+    matilda = {'title': 'Matilda', 'author': 'Roald Dahl, Quentin Blake'}
+    assert index.lookup_isbn('9780140328721') == matilda
+    assert index.lookup_isbn('0-14-032872-6') == matilda
+
+
+def test_edition_authors_without_a_work(index):
+    assert index.lookup_isbn('9780261103344') == {'title': 'The Hobbit', 'author': 'J. R. R. Tolkien'}
+
+
+def test_unknown_authors(index):
+    assert index.lookup_isbn('9780747532699') == {'title': 'Harry Potter', 'author': 'Unknown Author'}
+
+
+def test_missing_and_invalid_isbns(index):
+    assert len(index) == 3
+    assert index.lookup_isbn('9780306406157') is None
+    assert index.lookup_isbn('0261103340') is None # Wrong check digit
+
+
+def test_open_rejects_other_files(tmp_path):
+    assert open_isbn_index(str(tmp_path / 'missing.bin')) is None
+    other = tmp_path / 'other.bin'
+    other.write_bytes(b'not an index file')
+    assert open_isbn_index(str(other)) is None
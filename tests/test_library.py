@@ -0,0 +1,29 @@
+import pytest
+from models import Book
+from storage import open_store
+from library import Library
+
+
+def _open(kind, tmp_path):
+    return Library(open_store(kind, json_path=str(tmp_path / 'books.json'), sqlite_path=str(tmp_path / 'books.db'),
+        indexed_path=str(tmp_path / 'books.bmk')))
+
+
+@pytest.mark.parametrize('kind', ['json', 'journal', 'sqlite', 'indexed'])
+def test_deleted_ids_are_not_reused(kind, tmp_path):
+    library = _open(kind, tmp_path)
+    library.load()
+    books = [Book(f'Book {n}', 'Author') for n in range(3)]
+    library.add_books(books)
+    library.save_books(books)
+    library.delete_book(3)
+    library.save_deleted_book(3)
+    library.close()
+
+    library = _open(kind, tmp_path)
+    library.load()
+    assert [book.id for book in library.books] == [1, 2]
+    book = Book('New', 'Author')
+    library.add_book(book)
+    assert book.id == 4
+    library.close()
@@ -0,0 +1,80 @@
+import numpy as np
+
+from library_stats import LibraryStats
+from models import Book
+
+
+def _stats(*books, capacity=1024):
+    stats = LibraryStats(capacity=capacity)
+    stats.add_many(books)
+    return stats
+
+
+def test_columns_hold_one_row_per_book():
+    stats = _stats(Book("A", "x", total_pages=200, current_progress=50, id=7),
+                   Book("B", "y", track_chapters=True, total_chapters=10, id=9))
+    assert len(stats) == 2
+    assert stats.ids[:2].tolist() == [7, 9]
+    assert stats.current_pages[0] == 50
+    # Unknown counts are NaN
+    assert np.isnan(stats.current_chapters[1])
+    assert stats.track_chapters[:2].tolist() == [False, True]
+
+
+def test_columns_grow_past_their_capacity():
+    stats = _stats(*[Book(str(n), "x", total_pages=10, id=n) for n in range(5)], capacity=2)
+    stats.add(Book("5", "x", total_pages=10, id=5))
+    assert len(stats) == 6
+    assert stats.ids[:6].tolist() == list(range(6))
+
+
+def test_remove_moves_the_last_row():
+    stats = _stats(*[Book(str(n), "x", total_pages=10 * (n + 1), id=n) for n in range(3)])
+    stats.remove(0)
+    stats.remove(42) # Unknown IDs are ignored
+    assert len(stats) == 2
+    assert stats.ids[:2].tolist() == [2, 1]
+    assert stats.row_by_id == {2: 0, 1: 1}
+    assert stats.total_pages[0] == 30
+
+
+def test_summary_totals_and_states():
+    summary = _stats(
+        Book("Unread", "x", total_pages=100, id=1),
+        Book("Half", "x", total_pages=100, current_progress=50, id=2),
+        Book("Done", "y", track_chapters=True, total_chapters=10, current_chapter=10, id=3),
+        Book("Unknown total", "y", current_progress=20, id=4),
+    ).snapshot().summary()
+    assert summary['books'] == 4
+    assert (summary['pages_read'], summary['total_pages']) == (70, 200)
+    assert (summary['chapters_read'], summary['total_chapters']) == (10, 10)
+    assert (summary['not_started'], summary['in_progress'], summary['finished']) == (1, 2, 1)
+
+
+def test_histogram_bins():
+    summary = _stats(
+        Book("0%", "x", total_pages=100, id=1),
+        Book("5%", "x", total_pages=100, current_progress=5, id=2),
+        Book("55%", "x", total_pages=100, current_progress=55, id=3),
+        Book("100%", "x", total_pages=100, current_progress=100, id=4),
+        Book("Over 100%", "x", total_pages=100, current_progress=150, id=5),
+        Book("No total", "x", id=6),
+    ).snapshot().summary()
+    assert summary['histogram'] == [2, 0, 0, 0, 0, 1, 0, 0, 0, 2]
+
+
+def test_authors_by_number_of_books():
+    summary = _stats(
+        Book("A", "Dahl", total_pages=100, current_progress=100, id=1),
+        Book("B", "Dahl", total_pages=100, id=2),
+        Book("C", "Austen", total_pages=100, current_progress=30, id=3),
+    ).snapshot().summary(top_authors=1)
+    assert summary['authors'] == [("Dahl", 2, 50.0)]
+
+
+def test_snapshot_is_a_copy():
+    stats = _stats(Book("A", "x", total_pages=100, id=1))
+    snapshot = stats.snapshot()
+    stats.add(Book("A", "x", total_pages=100, current_progress=100, id=1))
+    assert snapshot.summary()['finished'] == 0
+    assert stats.snapshot().summary()['finished'] == 1
@@ -0,0 +1,171 @@
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from openlibrary import OpenLibraryClient
+from response_cache import ResponseCache
+
+
+class ScriptedServer:
+    """
+    A local Open Library stand-in. Each path answers with the (status, body) pairs queued for it, in order, repeating
+    the last one; unknown paths answer 404. Requests are counted by path.
+    """
+    def __init__(self, routes, latency=0):
+        self.routes = {path: list(answers) for path, answers in routes.items()}
+        self.requests = Counter()
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.requests[self.path] += 1
+                    answers = server.routes.get(self.path) or [(404, {'error': 'notfound'})]
+                    status, body = answers.pop(0) if len(answers) > 1 else answers[0]
+                time.sleep(latency)
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        if not self.thread.is_alive():
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+MATILDA = {
+    '/isbn/9780140328721.json': [(200, {'title': 'Matilda', 'works': [{'key': '/works/W1'}],
+                                        'authors': [{'key': '/authors/A2'}]})],
+    '/works/W1.json': [(200, {'authors': [{'author': {'key': '/authors/A1'}}]})],
+    '/authors/A1.json': [(200, {'name': 'Roald Dahl'})],
+    '/authors/A2.json': [(200, {'name': 'Quentin Blake'})],
+}
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(routes, latency=0):
+        servers.append(ScriptedServer(routes, latency))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def _client(server, **kwargs):
+    kwargs.setdefault('backoff', 0)
+    kwargs.setdefault('timeout', 5)
+    return OpenLibraryClient(server.url, **kwargs)
+
+
+def test_lookup_uses_work_authors_only(serve):
+    server = serve(MATILDA)
+    client = _client(server)
+    try:
+        assert client.lookup_isbn('9780140328721') == {'title': 'Matilda', 'author': 'Roald Dahl'}
+    finally:
+        client.close()
+    # The edition's own authors are never needed, so they aren't fetched
+    assert server.requests['/authors/A2.json'] == 0
+
+
+def test_transient_errors_are_retried(serve):
+    server = serve({'/isbn/1.json': [(503, {}), (503, {}), (200, {'title': 'Retried'})]})
+    client = _client(server, max_retries=3)
+    try:
+        assert client.get_json('/isbn/1.json') == {'title': 'Retried'}
+    finally:
+        client.close()
+    assert server.requests['/isbn/1.json'] == 3
+
+
+def test_gives_up_after_max_retries(serve):
+    server = serve({'/isbn/1.json': [(503, {})]})
+    client = _client(server, max_retries=2)
+    try:
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get_json('/isbn/1.json')
+    finally:
+        client.close()
+    assert server.requests['/isbn/1.json'] == 3
+
+
+def test_backoff_doubles_between_retries(serve, monkeypatch):
+    delays = []
+    # Replaces only the client's clock, the server's threads keep the real one
+    monkeypatch.setattr('openlibrary.time', SimpleNamespace(sleep=delays.append, monotonic=time.monotonic))
+    server = serve({'/isbn/1.json': [(500, {}), (500, {}), (200, {})]})
+    client = _client(server, backoff=0.5)
+    try:
+        client.get_json('/isbn/1.json')
+    finally:
+        client.close()
+    assert delays == [0.5, 1.0]
+
+
+def test_concurrent_lookups_share_one_request(serve):
+    server = serve(MATILDA, latency=0.2)
+    client = _client(server)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(client.lookup_isbn, ['9780140328721'] * 4))
+    finally:
+        client.close()
+    assert all(result == {'title': 'Matilda', 'author': 'Roald Dahl'} for result in results)
+    assert server.requests['/isbn/9780140328721.json'] == 1
+    assert server.requests['/works/W1.json'] == 1
+
+
+def test_not_found_is_cached(serve, tmp_path):
+    server = serve({})
+    client = _client(server, cache=ResponseCache(str(tmp_path / 'cache.db')))
+    try:
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.HTTPError) as raised:
+                client.lookup_isbn('0000000000')
+            assert raised.value.response.status_code == 404
+    finally:
+        client.close()
+    assert server.requests['/isbn/0000000000.json'] == 1
+
+
+def test_offline_falls_back_to_stale_cache(serve, tmp_path):
+    server = serve(MATILDA)
+    # Entries go stale at once, so the second lookup has to try the network first
+    cache_path = str(tmp_path / 'cache.db')
+    client = _client(server, cache=ResponseCache(cache_path, ttls={'isbn': -1, 'works': -1, 'authors': -1}))
+    try:
+        assert client.lookup_isbn('9780140328721')['title'] == 'Matilda'
+    finally:
+        client.close()
+    server.close()
+
+    client = _client(server, max_retries=1,
+                     cache=ResponseCache(cache_path, ttls={'isbn': -1, 'works': -1, 'authors': -1}))
+    try:
+        assert client.lookup_isbn('9780140328721') == {'title': 'Matilda', 'author': 'Roald Dahl'}
+    finally:
+        client.close()
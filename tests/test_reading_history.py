@@ -0,0 +1,35 @@
+from models import Book
+from reading_history import ReadingHistory, SECONDS_PER_DAY
+
+
+def test_library_pace_only_counts_the_window(tmp_path):
+    history = ReadingHistory(str(tmp_path / 'history.bin'))
+    now = 100 * SECONDS_PER_DAY
+    book = Book('A', 'X', total_pages=500, current_progress=10)
+    book.id = 1
+    other = Book('B', 'Y', track_chapters=True, total_chapters=40, current_chapter=1)
+    other.id = 2
+    history.record(book, timestamp=now - 30 * SECONDS_PER_DAY)
+    history.record(other, timestamp=now - 20 * SECONDS_PER_DAY)
+    book.current_progress = 110 # Read before the window
+    history.record(book, timestamp=now - 15 * SECONDS_PER_DAY)
+    book.current_progress = 250
+    history.record(book, timestamp=now - 2 * SECONDS_PER_DAY)
+    other.current_chapter = 8
+    history.record(other, timestamp=now - SECONDS_PER_DAY)
+    assert history.library_pace(days=14, now=now) == {'pages': 140 / 14, 'chapters': 7 / 14}
+    assert history.library_pace(days=14, now=now + 30 * SECONDS_PER_DAY) == {'pages': 0.0, 'chapters': 0.0}
+    history.close()
+
+
+def test_record_skips_unchanged_progress(tmp_path):
+    history = ReadingHistory(str(tmp_path / 'history.bin'))
+    book = Book('A', 'X', total_pages=300, current_progress=20)
+    book.id = 1
+    assert history.record(book, previous=Book('A', 'X'))
+    assert not history.record(book) # Same as the latest record
+    assert not history.record(book, previous=book)
+    book.current_progress = 30
+    assert history.record(book)
+    assert history.last_record(1) == (30, 300, 0)
+    history.close()
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    A manual clock for the cache, advanced with clock.now += seconds.
+    """
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr('response_cache.time', SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def open_cache(tmp_path):
+    caches = []
+
+    def open_cache(**kwargs):
+        caches.append(ResponseCache(str(tmp_path / 'cache.db'), **kwargs))
+        return caches[-1]
+
+    yield open_cache
+    for cache in caches:
+        cache.close()
+
+
+def test_entries_expire_by_kind(clock, open_cache):
+    cache = open_cache(ttls={'isbn': 10, 'authors': 100})
+    cache.put('/isbn/1.json', {'title': 'Matilda'})
+    cache.put('/authors/A1.json', {'name': 'Roald Dahl'})
+    assert cache.get('/missing.json') is None
+    clock.now += 50
+    edition = cache.get('/isbn/1.json')
+    # Stale entries are kept for offline use
+    assert (edition.data, edition.found, edition.fresh) == ({'title': 'Matilda'}, True, False)
+    assert cache.get('/authors/A1.json').fresh
+
+
+def test_not_found_uses_the_negative_ttl(clock, open_cache):
+    cache = open_cache(negative_ttl=5)
+    cache.put_not_found('/isbn/0.json')
+    cached = cache.get('/isbn/0.json')
+    assert (cached.data, cached.found, cached.fresh) == (None, False, True)
+    clock.now += 10
+    assert not cache.get('/isbn/0.json').fresh
+
+
+def test_entries_persist_across_instances(clock, open_cache):
+    open_cache().put('/works/W1.json', {'key': '/works/W1'})
+    reopened = open_cache()
+    assert reopened.get('/works/W1.json').data == {'key': '/works/W1'}
+    assert reopened.total_bytes > 0
+
+
+def test_least_recently_used_entries_are_evicted(clock, open_cache):
+    # Every entry is len(path) + len(body) = 16 + 2 bytes, five of them fill the cap
+    cache = open_cache(max_bytes=90)
+    for n in range(5):
+        clock.now += 1
+        cache.put(f'/authors/A{n}.json', {})
+    clock.now += 1
+    cache.get('/authors/A0.json') # Now the most recently used
+    clock.now += 1
+    cache.put('/authors/A5.json', {})
+    # Evicted down to 90% of the cap: the two least recently used entries go
+    assert cache.get('/authors/A1.json') is None
+    assert cache.get('/authors/A2.json') is None
+    for n in (0, 3, 4, 5):
+        assert cache.get(f'/authors/A{n}.json') is not None
+    assert cache.total_bytes == 4 * 18
+
+
+def test_replacing_an_entry_keeps_the_size_right(clock, open_cache):
+    cache = open_cache()
+    cache.put('/isbn/1.json', {'title': 'A'})
+    size = cache.total_bytes
+    cache.put('/isbn/1.json', {'title': 'A'})
+    assert cache.total_bytes == size
+    cache.clear()
+    assert cache.total_bytes == 0
+    assert cache.get('/isbn/1.json') is None
@@ -0,0 +1,78 @@
+import time
+
+from models import Book
+from save_queue import BackgroundSaver
+
+
+class RecordingStore:
+    """
+    Stands in for a storage backend and records every write.
+    """
+    path = 'memory'
+
+    def __init__(self):
+        self.writes = []
+
+    def save_all(self, books, settings):
+        self.writes.append(('save_all', [book.title for book in books], settings))
+
+    def upsert_book(self, book):
+        self.writes.append(('upsert', book.id, book.title))
+
+    def delete_book(self, book_id):
+        self.writes.append(('delete', book_id))
+
+    def save_settings(self, settings):
+        self.writes.append(('settings', settings))
+
+
+def test_burst_is_written_once():
+    store = RecordingStore()
+    saver = BackgroundSaver(store, delay=0.2, max_delay=5)
+    try:
+        for n in range(5):
+            saver.upsert_book(Book(f"Draft {n}", "x", id=1))
+        saver.upsert_book(Book("Other", "x", id=2))
+        saver.delete_book(3)
+        time.sleep(0.05)
+        assert store.writes == [] # Still inside the debounce window
+        assert saver.flush(timeout=5)
+    finally:
+        saver.close(timeout=5)
+    # Only the latest version of each book is written, in one batch
+    assert store.writes == [('upsert', 1, "Draft 4"), ('upsert', 2, "Other"), ('delete', 3)]
+    assert saver.write_count == 1
+
+
+def test_writes_after_the_debounce_window():
+    store = RecordingStore()
+    saver = BackgroundSaver(store, delay=0.05, max_delay=1)
+    try:
+        saver.save_settings({'theme': 'dark'})
+        deadline = time.monotonic() + 5
+        while not store.writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.writes == [('settings', {'theme': 'dark'})]
+    finally:
+        saver.close(timeout=5)
+
+
+def test_full_save_replaces_pending_changes():
+    store = RecordingStore()
+    saver = BackgroundSaver(store, delay=10, max_delay=10)
+    books = [Book("Matilda", "Roald Dahl", id=1)]
+    saver.upsert_book(Book("Stale", "x", id=2))
+    saver.save_all(books, {'theme': 'light'})
+    books.append(Book("Added later", "x", id=3)) # The list was copied
+    saver.close(timeout=5)
+    assert store.writes == [('save_all', ["Matilda"], {'theme': 'light'})]
+
+
+def test_close_writes_pending_changes():
+    store = RecordingStore()
+    # Long enough that only close can have written the change
+    saver = BackgroundSaver(store, delay=10, max_delay=10)
+    saver.upsert_book(Book("Matilda", "Roald Dahl", id=1))
+    saver.close(timeout=5)
+    assert store.writes == [('upsert', 1, "Matilda")]
+    assert not saver.thread.is_alive()
@@ -0,0 +1,47 @@
+from models import Book
+from search_index import SearchIndex
+
+
+def _index(*books):
+    index = SearchIndex()
+    index.add_many(books)
+    return index
+
+
+def test_words_match_by_prefix():
+    index = _index(Book("Harry Potter", "J. K. Rowling", id=1), Book("The Hobbit", "J. R. R. Tolkien", id=2))
+    assert index.search("har pot") == {1}
+    assert index.search("j") == {1, 2}
+    assert index.search("hobbits") == set()
+
+
+def test_empty_query_matches_everything():
+    assert _index(Book("Matilda", "Roald Dahl", id=1)).search("  ") is None
+
+
+def test_case_and_accents_are_ignored():
+    index = _index(Book("Émile", "Jean-Jacques Rousseau", id=1))
+    assert index.search("EMI") == {1}
+
+
+def test_every_word_must_match():
+    index = _index(Book("Harry Potter", "J. K. Rowling", id=1), Book("Harry's Game", "Gerald Seymour", id=2))
+    assert index.search("harry") == {1, 2}
+    assert index.search("harry gam") == {2}
+
+
+def test_edit_replaces_old_words():
+    index = _index(Book("Matilda", "Roald Dahl", id=1))
+    index.add(Book("The BFG", "Roald Dahl", id=1))
+    assert index.search("mat") == set()
+    assert index.search("bfg") == {1}
+    assert "matilda" not in index.vocabulary
+
+
+def test_remove_drops_unused_words():
+    index = _index(Book("Matilda", "Roald Dahl", id=1), Book("The BFG", "Roald Dahl", id=2))
+    index.remove(1)
+    index.remove(99) # Unknown IDs are ignored
+    assert len(index) == 1
+    assert index.search("dahl") == {2}
+    assert index.vocabulary == ['bfg', 'dahl', 'roald', 'the']
@@ -0,0 +1,66 @@
+from models import Book
+from sort_index import BookSorter, SortIndex, SORT_KEYS
+
+
+def _titles(books):
+    return [book.title for book in books]
+
+
+def _sorter(*books):
+    sorter = BookSorter()
+    sorter.add_many(books)
+    return sorter
+
+
+def test_inserts_keep_the_order():
+    sorter = _sorter(Book("Matilda", "Roald Dahl", id=1), Book("Emma", "Jane Austen", id=2))
+    assert _titles(sorter.sorted_books('title')) == ["Emma", "Matilda"]
+    # Added after the index was built, so each goes in with a binary search
+    sorter.add(Book("The BFG", "Roald Dahl", id=3))
+    sorter.add(Book("Beloved", "Toni Morrison", id=4))
+    assert _titles(sorter.sorted_books('title')) == ["Beloved", "Emma", "Matilda", "The BFG"]
+    assert _titles(sorter.sorted_books('title', descending=True)) == ["The BFG", "Matilda", "Emma", "Beloved"]
+
+
+def test_edit_moves_the_book():
+    sorter = _sorter(Book("A", "x", total_pages=100, current_progress=10, id=1),
+                     Book("B", "x", total_pages=100, current_progress=50, id=2))
+    assert _titles(sorter.sorted_books('percent')) == ["A", "B"]
+    sorter.add(Book("A", "x", total_pages=100, current_progress=90, id=1))
+    assert _titles(sorter.sorted_books('percent')) == ["B", "A"]
+    sorter.remove(2)
+    assert _titles(sorter.sorted_books('percent')) == ["A"]
+
+
+def test_ties_are_broken_by_id():
+    index = SortIndex(SORT_KEYS['author'])
+    index.add(Book("Same", "Same", id=3))
+    index.add(Book("Same", "Same", id=1))
+    index.add(Book("Same", "Same", id=2))
+    assert [book.id for book in index.sorted_books()] == [1, 2, 3]
+    assert [book.id for book in index.sorted_books(descending=True)] == [3, 2, 1]
+
+
+def test_unknown_keys_are_listed_last():
+    sorter = _sorter(Book("No pages", "x", id=1),
+                     Book("Short", "x", total_pages=100, current_progress=90, id=2),
+                     Book("Long", "x", total_pages=500, id=3))
+    assert _titles(sorter.sorted_books('remaining')) == ["Short", "Long", "No pages"]
+    assert _titles(sorter.sorted_books('remaining', descending=True)) == ["Long", "Short", "No pages"]
+
+
+def test_updated_sorts_oldest_first_when_ascending():
+    sorter = _sorter(Book("New", "x", updated=300.0, id=1), Book("Old", "x", updated=100.0, id=2),
+                     Book("Never", "x", id=3))
+    assert _titles(sorter.sorted_books('updated')) == ["Old", "New", "Never"]
+    assert _titles(sorter.sorted_books('updated', descending=True)) == ["New", "Old", "Never"]
+
+
+def test_add_many_into_a_large_index():
+    index = SortIndex(SORT_KEYS['title'])
+    index.add_many([Book(f"Book {n:03}", "x", id=n) for n in range(0, 200, 2)])
+    # Few enough new books that each is inserted at its place
+    index.add_many([Book(f"Book {n:03}", "x", id=n) for n in (1, 99, 199)])
+    titles = _titles(index.sorted_books())
+    assert titles == sorted(titles)
+    assert len(titles) == 103
@@ -0,0 +1,30 @@
+import json
+from storage import JournaledJsonStore
+from library import Library
+
+
+def _titles(library):
+    return [(book.id, book.title) for book in library.books]
+
+
+def test_journal_legacy_snapshot_edit_delete_reload(tmp_path):
+    # books.json saved before books had IDs
+    path = tmp_path / 'books.json'
+    path.write_text(json.dumps({'books': [{'title': 'A', 'author': 'X'}, {'title': 'B', 'author': 'Y'}], 'theme': 'dark'}))
+
+    library = Library(JournaledJsonStore(str(path)))
+    library.load()
+    assert _titles(library) == [(1, 'A'), (2, 'B')]
+    edited = library.get_book(1)
+    edited.title = 'A2'
+    library.replace_book(1, edited)
+    library.save_books([edited])
+    library.delete_book(2)
+    library.save_deleted_book(2)
+    library.close()
+
+    reloaded = Library(JournaledJsonStore(str(path)))
+    reloaded.load()
+    assert _titles(reloaded) == [(1, 'A2')]
+    assert reloaded.settings['theme'] == 'dark'
+    reloaded.close()
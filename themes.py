@@ -0,0 +1,56 @@
+import os
+import json
+from tkinter import TclError
+
+# Folder of user-defined themes, relative to the working directory
+THEMES_DIR = 'themes'
+
+def load_theme_files(directory, base_themes, root):
+    """
+    Loads user-defined color themes from the JSON files in a folder, one theme per file, named after the file.
+    A theme file holds the colors it changes, keyed like the built-in palettes (e.g. "root_bg", "text_color").
+    Colors it leaves out are taken from the built-in theme named by an optional "base" key, or from 'light'.
+    For example, themes/sepia.json:
+        {"base": "light", "root_bg": "#f4ecd8", "frame_bg": "#e8dcc0", "label_bg": "#e8dcc0", "canvas_bg": "#fbf5e6"}
+    Files that can't be read, have unknown keys or colors Tk doesn't understand, or are named after a built-in
+    theme are skipped with a message.
+    Args:
+        directory (str): The folder to load themes from. Nothing is loaded if it doesn't exist.
+        base_themes (dict): The built-in themes, name -> {color key: color}.
+        root (tk.Tk): The root window, used to check the colors.
+    Returns:
+        dict: The loaded themes, name -> complete palette, in file name order.
+    """
+    themes = {}
+    if not os.path.isdir(directory):
+        return themes
+    for filename in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(filename)
+        if extension.lower() != '.json':
+            continue
+        path = os.path.join(directory, filename)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                colors = json.load(f)
+            if not isinstance(colors, dict):
+                raise ValueError("expected an object of colors")
+            base = colors.pop('base', 'light')
+            if base not in base_themes:
+                raise ValueError(f"unknown base theme '{base}'")
+            unknown = set(colors) - set(base_themes[base])
+            if unknown:
+                raise ValueError(f"unknown keys {', '.join(sorted(unknown))}")
+            if name in base_themes:
+                raise ValueError(f"'{name}' is a built-in theme, rename the file")
+            for key, color in colors.items():
+                if not isinstance(color, str):
+                    raise ValueError(f"{key} is not a color")
+                try:
+                    root.winfo_rgb(color)
+                except TclError:
+                    raise ValueError(f"{key} has an unknown color '{color}'")
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError, ValueError) as e:
+            print(f"Skipping theme file {path}: {e}")
+            continue
+        themes[name] = {**base_themes[base], **colors}
+    return themes
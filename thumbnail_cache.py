@@ -0,0 +1,137 @@
+import os
+import hashlib
+import threading
+
+class ThumbnailCache:
+    """
+    Stores ready-to-display cover thumbnails on disk so full-size images only have to be decoded once.
+    Entries are keyed by the source path, thumbnail size and the source file's modification time and size,
+    so a changed cover gets a new entry automatically. The cache directory is kept under a size cap by
+    deleting the least recently used thumbnails.
+    Thumbnails can be requested from several worker threads at once.
+    """
+    def __init__(self, cache_dir='thumbnail_cache', size=(100, 150), max_bytes=50 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str): Directory where thumbnails are stored. Created if it doesn't exist.
+            size (tuple): The (width, height) box thumbnails are resized to fit within.
+            max_bytes (int): The size cap for the cache directory in bytes.
+        """
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.lock = threading.Lock() # Guards total_bytes and eviction
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.total_bytes = sum(entry.stat().st_size for entry in self._entries())
+        except OSError as e:
+            print(f"Could not open thumbnail cache at {self.cache_dir}: {e}")
+
+    def get(self, image_path):
+        """
+        Returns the thumbnail of an image, creating and storing it if it isn't cached yet.
+        Args:
+            image_path (str): Path to the full-size source image.
+        Returns:
+            PIL.Image.Image: The thumbnail, resized proportionally to fit within the cache's size.
+        Raises:
+            OSError: If the source image can't be read or decoded.
+        """
+        from PIL import Image # Pillow is only loaded once the first cover is shown
+        cache_path = self._cache_path(image_path)
+        if os.path.exists(cache_path):
+            try:
+                img = Image.open(cache_path)
+                img.load() # Read now so the file is closed before it could be evicted
+                os.utime(cache_path) # Mark as recently used
+                return img
+            except OSError as e:
+                print(f"Discarding unreadable thumbnail {cache_path}: {e}")
+                self._remove(cache_path)
+
+        img = Image.open(image_path)
+        # Draft mode lets JPEGs decode directly at a reduced scale, no-op for other formats
+        img.draft(None, self.size)
+        # Thumbnail resizes image proportionally to fit within the cache size
+        img.thumbnail(self.size, Image.LANCZOS) # LANCZOS image rescale
+        self._store(img, cache_path)
+        return img
+
+    def clear(self):
+        """
+        Deletes every cached thumbnail.
+        """
+        for entry in list(self._entries()):
+            self._remove(entry.path)
+
+    def _cache_path(self, image_path):
+        """
+        Builds the cache file path for a source image from its path, the thumbnail size and its mtime/size.
+        Raises:
+            OSError: If the source image doesn't exist.
+        """
+        stat = os.stat(image_path)
+        key = f"{os.path.abspath(image_path)}|{self.size[0]}x{self.size[1]}|{stat.st_mtime_ns}|{stat.st_size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.png')
+
+    def _store(self, img, cache_path):
+        """
+        Writes a thumbnail to the cache, then evicts old entries if the cache is over its size cap.
+        Failures are reported but don't stop the thumbnail from being displayed.
+        """
+        temp_path = cache_path + '.tmp'
+        try:
+            # PNG keeps transparency and is lossless, so the cached thumbnail looks the same as a fresh one
+            img.save(temp_path, format='PNG')
+            os.replace(temp_path, cache_path) # Rename so a half-written file is never read
+            size = os.path.getsize(cache_path)
+        except OSError as e:
+            print(f"Could not write thumbnail {cache_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        with self.lock:
+            self.total_bytes += size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Deletes the least recently used thumbnails until the cache is within 90% of its size cap.
+        Must be called with the lock held.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        target = self.max_bytes * 0.9 # Leave some room so the next few writes don't evict again
+        for entry in entries:
+            if self.total_bytes <= target:
+                break
+            self._remove(entry.path, locked=True)
+
+    def _remove(self, cache_path, locked=False):
+        """
+        Deletes a single cached thumbnail and updates the cache size.
+        Args:
+            cache_path (str): Path of the cached thumbnail.
+            locked (bool): True if the caller already holds the lock.
+        """
+        try:
+            size = os.path.getsize(cache_path)
+            os.remove(cache_path)
+        except OSError as e:
+            print(f"Could not remove thumbnail {cache_path}: {e}")
+            return
+        if locked:
+            self.total_bytes = max(self.total_bytes - size, 0)
+        else:
+            with self.lock:
+                self.total_bytes = max(self.total_bytes - size, 0)
+
+    def _entries(self):
+        """
+        Yields the directory entries of the cached thumbnails.
+        """
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.png'):
+                    yield entry
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import threading
+import itertools
+import functools
+
+# Number of spans kept, older spans are overwritten by newer ones
+DEFAULT_CAPACITY = 100000
+
+class Tracer:
+    """
+    Records timed spans of the program's hot paths into a fixed-size ring buffer, and exports them in the
+    Chrome Trace Event format, which can be opened in chrome://tracing or https://ui.perfetto.dev.
+    Recording a span is a clock read at the start and end and one tuple written into a preallocated list, with
+    no locking, so tracing can stay on during a whole session. When the buffer is full the oldest spans are
+    overwritten, so memory use stays bounded however long the session is.
+    Tracing is off unless it is enabled, see the module's 'tracer' and the BOOKMARKPY_TRACE environment variable.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity (int): Number of spans kept.
+        """
+        self.enabled = False
+        self.capacity = capacity
+        self.spans = [None] * capacity # (name, category, start ns, end ns, thread ID, args), written round-robin
+        self.counter = itertools.count() # Next position to write, next() is atomic so threads never share a slot
+        self.thread_names = {} # thread ID -> thread name, for labelling the rows of the trace
+        self.start_ns = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def span(self, name, category='app', args=None):
+        """
+        Returns a context manager that records the time spent in its block.
+        When tracing is off, a shared do-nothing context manager is returned.
+        Args:
+            name (str): Name of the span, e.g. the function.
+            category (str): Group of the span, e.g. 'io', 'http' or 'image'.
+            args (dict): Extra details shown with the span, e.g. {'path': ...}.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def record(self, name, category, start_ns, end_ns, args=None):
+        """
+        Adds a finished span, timed with time.perf_counter_ns().
+        """
+        thread_id = threading.get_ident()
+        if thread_id not in self.thread_names:
+            self.thread_names[thread_id] = threading.current_thread().name
+        self.spans[next(self.counter) % self.capacity] = (name, category, start_ns, end_ns, thread_id, args)
+
+    def clear(self):
+        self.spans = [None] * self.capacity
+        self.counter = itertools.count()
+
+    def chrome_trace(self):
+        """
+        Returns the recorded spans as a Chrome Trace Event document, oldest first.
+        Returns:
+            dict: {'traceEvents': [...], 'displayTimeUnit': 'ms'}, with times in microseconds since the tracer started.
+        """
+        pid = os.getpid()
+        spans = sorted((span for span in self.spans if span is not None), key=lambda span: span[2])
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id, 'args': {'name': name}}
+            for thread_id, name in list(self.thread_names.items())]
+        for name, category, start_ns, end_ns, thread_id, args in spans:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X', # Complete event, with a start and a duration
+                'ts': (start_ns - self.start_ns) / 1000,
+                'dur': (end_ns - start_ns) / 1000,
+                'pid': pid,
+                'tid': thread_id,
+            }
+            if args:
+                event['args'] = args
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        """
+        Writes the recorded spans to a Chrome Trace Event JSON file.
+        Returns:
+            int: The number of spans written.
+        """
+        trace = self.chrome_trace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        return sum(1 for event in trace['traceEvents'] if event['ph'] == 'X')
+
+
+class _Span:
+    """
+    Times one span, see Tracer.span.
+    """
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start_ns')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, self.category, self.start_ns, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    """
+    The context manager returned while tracing is off. It does nothing.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+# The tracer used throughout the program. Setting BOOKMARKPY_TRACE to a file name before starting the program
+# turns it on, and the trace is written to that file when the program closes.
+tracer = Tracer()
+TRACE_PATH = os.environ.get('BOOKMARKPY_TRACE')
+if TRACE_PATH:
+    tracer.enable()
+
+
+def traced(name=None, category='app'):
+    """
+    Decorator that records every call of a function as a span.
+    Whether tracing is on is decided when the function is defined: with tracing off the function is returned
+    unchanged, so untraced runs pay nothing at all.
+    Args:
+        name (str): Name of the spans, defaults to the function's qualified name.
+        category (str): Group of the spans.
+    """
+    def decorate(function):
+        if not tracer.enabled:
+            return function
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start_ns = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                tracer.record(span_name, category, start_ns, time.perf_counter_ns())
+        return wrapper
+    return decorate